@@ -0,0 +1,46 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/utils/cryptography/ECDSA.sol";
+import "@openzeppelin/contracts/utils/cryptography/draft-EIP712.sol";
+import "./VestingStaking.sol";
+
+// Checks EIP-712 signatures of stake intents for one VestingStaking (or its clone) and submits them to its stakeFor(),
+// the owner of the VestingStaking registers the relay with setStakeRelay(). Nonces and the checks of stake() stay
+// in VestingStaking, the relay holds no state
+contract StakeRelay is EIP712 {
+    bytes32 public constant STAKE_INTENT_TYPEHASH =
+        keccak256("StakeIntent(address account,uint256 amount,uint256 strategyNumber,uint256 nonce,uint256 deadline)");
+
+    VestingStaking public immutable vestingStaking;
+
+    constructor(address _vestingStaking) EIP712("VestingStaking", "1") {
+        vestingStaking = VestingStaking(_vestingStaking);
+    }
+
+    // Submitting a batch of signed intents by an operator of the VestingStaking. Expired intents and intents with
+    // wrong signatures are passed on as not signed, so they are skipped in order with the ones which can't be applied
+    function stakeFor(VestingStaking.StakeIntent[] calldata _intents, bytes[] calldata _signatures) external {
+        require(vestingStaking.isOperator(msg.sender) || msg.sender == vestingStaking.owner(), "Caller is not an operator");
+        require(_intents.length == _signatures.length, "Arrays are not the same size");
+
+        bool[] memory signed = new bool[](_intents.length);
+        for (uint256 i=0; i<_intents.length; i++) {
+            signed[i] = block.timestamp <= _intents[i].deadline && _isSigned(_intents[i], _signatures[i]);
+        }
+        vestingStaking.stakeFor(_intents, signed);
+    }
+
+    function DOMAIN_SEPARATOR() external view returns (bytes32) {
+        return _domainSeparatorV4();
+    }
+
+    function _isSigned(VestingStaking.StakeIntent calldata _intent, bytes calldata _signature) internal view returns (bool) {
+        bytes32 digest = _hashTypedDataV4(keccak256(abi.encode(
+            STAKE_INTENT_TYPEHASH, _intent.account, _intent.amount, _intent.strategyNumber, _intent.nonce, _intent.deadline
+        )));
+        (address signer, ECDSA.RecoverError error) = ECDSA.tryRecover(digest, _signature);
+        return error == ECDSA.RecoverError.NoError && signer == _intent.account;
+    }
+}
@@ -3,12 +3,17 @@
 pragma solidity ^0.8.0;
 
 import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
+import "@openzeppelin/contracts/utils/cryptography/MerkleProof.sol";
+import "@openzeppelin/contracts/utils/structs/BitMaps.sol";
 import "./Token.sol";
 
-contract VestingStaking is Ownable{
+contract VestingStaking is Ownable, Initializable {
+    using BitMaps for BitMaps.BitMap;
 
+    // Set once in initialize(), clones of VestingStakingFactory can't have immutables of their own
     address public contractOwner;
-    address public tokenAddress;
 
     uint256 public startingTimestamp;
 
@@ -17,8 +22,13 @@ contract VestingStaking is Ownable{
 
     uint256 public rewardPerHour;
 
+    // Token, status and escrow flag share one slot, transfers read them together
+    address public tokenAddress;
     Status public status;
 
+    // Escrow mode: tokens for TVL and reward pool are held by this contract instead of the owner's wallet
+    bool public escrowEnabled;
+
     enum Status {
         NotStarted,
         Started
@@ -26,187 +36,509 @@ contract VestingStaking is Ownable{
 
     // Linear - linear withdrawing after cliff time
     // Stepped - 50% withdrawing in the 1st half of vesting time, 50% - in the 2nd half
+    // Piecewise - unlocked share is defined by checkpoints, see createPiecewiseStrategy()
     enum VestingStrategies {
         Linear,
-        Stepped
+        Stepped,
+        Piecewise
     }
 
+    // Packed into a single slot, times are in seconds
     struct VestingInfo {
-        uint256 cliffTime;
-        uint256 vestingTime;
+        uint32 cliffTime;
+        uint32 vestingTime;
         VestingStrategies vestingStrategy;
     }
 
+    // Cumulative unlocked share (FULL_SHARE = 100%) of a piecewise strategy at offset seconds after the vesting start
+    struct Checkpoint {
+        uint32 offset;
+        uint224 share;
+    }
+
+    // Synthetix-staking bookkeeping of an account, shared by all of its positions, so a reward update reads and writes
+    // the same slots whatever the number of positions. Packed into two slots
     struct StakeInfo {
+        // slot 0
+        uint96 tokensStaked;  // of all positions
+        uint128 rewardPerTokenPaid;
+        uint8 positionsCount;  // up to MAX_POSITIONS
+        uint24 stakeNonce;  // of the next signed stake intent, see stakeFor()
+        // slot 1
+        uint256 reward;  // a full slot, so an account's reward can't overflow and lock its withdrawals
+    }
+
+    // An allocation or a stake with its own strategy and start, packed into two slots.
+    // Unlock times are fixed when the position is created after start(), or on its first withdrawal otherwise,
+    // so withdrawals don't read the strategy and the staking start again
+    struct Position {
+        // slot 0
+        uint96 tokensStaked;
+        uint96 vestingWithdrawed;
+        uint32 startingTimestamp;
+        uint24 vestingStrategyNumber;
+        VestingStrategies vestingStrategy;
+        // slot 1
+        uint32 cliffEnd;
+        uint32 vestingEnd;  // 0 until unlock times are fixed
+    }
+
+    // Positions of an account summed up, returned by getPositions(). Start and strategy are of its first position
+    struct PositionView {
+        uint256 tokensStaked;
+        uint256 vestingWithdrawed;
+        uint256 startingTimestamp;
+        uint256 vestingStrategyNumber;
+        uint256 claimableVesting;
+        uint256 pendingReward;
+    }
+
+    // Stake signed by a whitelisted account (EIP-712 typed data) and submitted by an operator through the stake relay.
+    // Nonces of an account are sequential and share the slot of its positions count, so they cost no extra storage
+    struct StakeIntent {
+        address account;
+        uint256 amount;
+        uint256 strategyNumber;
+        uint256 nonce;
+        uint256 deadline;
+    }
+
+    // One position of an account returned by getAccountPositions()
+    struct PositionInfo {
         uint256 tokensStaked;
         uint256 vestingWithdrawed;
         uint256 startingTimestamp;
         uint256 vestingStrategyNumber;
-        uint256 rewardPerTokenPaid;
-        uint256 reward;
+        uint256 cliffEnd;
+        uint256 vestingEnd;
+        uint256 claimableVesting;
     }
 
     // Synthetix-staking
-    uint256 public rewardPerTokenStored;
-    uint256 public lastUpdateTime;
+    // Reward accumulator, both values share one slot
+    uint128 public rewardPerTokenStored;
+    uint64 public lastUpdateTime;
 
     // The pool from which the admin pays rewards 
     // Always: balanceOf(contractOwner) >= TVL + rewardPool
+    // In escrow mode: balanceOf(this) == TVL + rewardPool + escrowSurplus
     uint256 public rewardPool;
 
-    // Stakeholders and stakes
-    mapping (address => StakeInfo) public stakes;
-    mapping (address => bool) public isStakeholder;
+    // Escrowed tokens which are not reserved for TVL or reward pool yet
+    uint256 public escrowSurplus;
+
+    // Stakeholders (every stakeholder has at least one position) and their positions numbered from 0.
+    // Withdrawals go through all positions of an account, so their number is limited
+    mapping (address => StakeInfo) internal _stakes;
+    mapping (address => mapping (uint256 => Position)) internal _positions;
+    uint256 public constant MAX_POSITIONS = 20;
+
+    // Every stakeholder once, in the order of their first positions. Accounts never lose their positions,
+    // so the list is append-only and positionsCount != 0 is the membership check
+    address[] internal _stakeholders;
 
     // Vestings
-    uint256 public vestingStrategiesAmount = 0;
-    mapping (uint256 => VestingInfo) public vestingStrategies;
+    uint256 public vestingStrategiesAmount;
+    mapping (uint256 => VestingInfo) internal _vestingStrategies;
+    mapping (uint256 => Checkpoint[]) internal _checkpoints;  // of piecewise strategies, sorted by offset
+
+    uint256 public constant FULL_SHARE = 1e18;
 
     // Whitelisted accounts can stake tokens after calling start() by the owner
     mapping (address => bool) public isWhitelisted;
 
+    // Operators can settle positions of other accounts with claimFor(), tokens still go to the accounts
+    mapping (address => bool) public isOperator;
+
+    // Checks signatures of stake intents and passes them to stakeFor() (see StakeRelay.sol), so that signature
+    // verification doesn't take the code size of this contract (EIP-170)
+    address public stakeRelay;
+
+    // Merkle onboarding: leaves are keccak256(abi.encodePacked(index, account, amount, strategyNumber)),
+    // amount == 0 means whitelist entry, otherwise initial allocation (see scripts/merkle.py)
+    bytes32 public merkleRoot;
+    uint256 public merkleRootTimestamp;
+    BitMaps.BitMap internal _activatedMerkleEntries;
+
+    //-------------------------------------------------------------------------
+    // EVENTS
+    //-------------------------------------------------------------------------
+
+    event StrategyCreated(uint256 indexed strategyNumber, uint256 cliffTime, uint256 vestingTime, VestingStrategies vestingStrategy);
+    event WhitelistUpdated(address indexed account, bool isWhitelisted);
+    event OperatorUpdated(address indexed account, bool isOperator);
+    event StakeRelaySet(address stakeRelay);
+    event Allocated(address indexed account, uint256 amount, uint256 strategyNumber);
+    event AllocationEdited(address indexed account, uint256 amount);
+    event MerkleRootSet(bytes32 merkleRoot);
+    event Started(uint256 rewardPerHour, uint256 rewardPool);
+    event Staked(address indexed account, uint256 amount, uint256 strategyNumber);
+    event RewardPaid(address indexed account, uint256 reward);
+    event VestingWithdrawn(address indexed account, uint256 amount);
+    event RewardAdded(uint256 extraReward);
+    event EscrowDeposited(uint256 amount);
+    event EscrowWithdrawn(uint256 amount);
+    event StakeIntentSkipped(address indexed account, uint256 nonce);
+    event StakeIntentCancelled(address indexed account, uint256 nonce);
+
     //-------------------------------------------------------------------------
     // STATE MODIFYING FUNCTIONS
     //-------------------------------------------------------------------------
 
     // Initializing token for vesting-staking
-    constructor(address _tokenAddress) {
-        tokenAddress = _tokenAddress;
-        contractOwner = msg.sender;
-        status = Status.NotStarted;
+    constructor(address _tokenAddress) initializer {
+        _initialize(_tokenAddress, msg.sender);
+    }
+
+    // Initializing a clone made by VestingStakingFactory: its token, owner and strategies
+    function initialize(
+        address _tokenAddress,
+        address _owner,
+        uint256[] calldata _cliffTimesInDays,
+        uint256[] calldata _vestingTimesInDays,
+        VestingStrategies[] calldata _vestingStrategyTypes
+    ) external initializer {
+        _initialize(_tokenAddress, _owner);
+        _createWestingStrategies(_cliffTimesInDays, _vestingTimesInDays, _vestingStrategyTypes);
     }
 
     // Creating linear or stepped (50% tokens in each half of vesting time) westing strategy by the contract owner
     function createWestingStrategy(uint256 _cliffTimeInDays, uint256 _vestingTimeInDays, VestingStrategies _vestingStrategy) external onlyOwner() {
-        require(_cliffTimeInDays >= 1);
-        require(_vestingTimeInDays > 1);
-        require(_vestingStrategy == VestingStrategies.Linear || _vestingStrategy == VestingStrategies.Stepped);
         vestingStrategiesAmount += 1;
-        VestingInfo memory newVestingStrat = VestingInfo(
-            _cliffTimeInDays * 1 days, _vestingTimeInDays * 1 days, _vestingStrategy
-        );
-        vestingStrategies[vestingStrategiesAmount] = newVestingStrat; 
+        _createWestingStrategy(vestingStrategiesAmount, _cliffTimeInDays, _vestingTimeInDays, _vestingStrategy);
+    }
+
+    // Creating several westing strategies in one transaction, they get consecutive numbers
+    function createWestingStrategies(
+        uint256[] calldata _cliffTimesInDays,
+        uint256[] calldata _vestingTimesInDays,
+        VestingStrategies[] calldata _vestingStrategyTypes
+    ) external onlyOwner() {
+        _createWestingStrategies(_cliffTimesInDays, _vestingTimesInDays, _vestingStrategyTypes);
+    }
+
+    // Creating piecewise westing strategy: the unlocked share grows linearly between checkpoints (and from 0 at offset 0
+    // to the 1st checkpoint), checkpoints with the same offset make a step, e.g. monthly tranches or an unlock at the start.
+    // Offsets are in seconds after the vesting start, the last checkpoint must unlock FULL_SHARE
+    function createPiecewiseStrategy(uint256[] calldata _offsets, uint256[] calldata _shares) external onlyOwner() {
+        require(_offsets.length == _shares.length && _offsets.length != 0, "Arrays are not the same size");
+        require(_shares[_shares.length - 1] == FULL_SHARE, "The last checkpoint must unlock everything");
+        require(_offsets[_offsets.length - 1] != 0);
+
+        vestingStrategiesAmount += 1;
+        uint256 strategyNumber = vestingStrategiesAmount;
+        require(strategyNumber <= type(uint24).max);  // Position.vestingStrategyNumber
+        Checkpoint[] storage checkpoints = _checkpoints[strategyNumber];
+        for (uint256 i=0; i<_offsets.length; i++) {
+            if (i != 0) {
+                require(_offsets[i] >= _offsets[i - 1] && _shares[i] >= _shares[i - 1], "Checkpoints are not sorted");
+            }
+            checkpoints.push(Checkpoint(SafeCast.toUint32(_offsets[i]), uint224(_shares[i])));
+        }
+
+        uint32 vestingTime = uint32(_offsets[_offsets.length - 1]);
+        _vestingStrategies[strategyNumber] = VestingInfo(0, vestingTime, VestingStrategies.Piecewise);
+        emit StrategyCreated(strategyNumber, 0, vestingTime, VestingStrategies.Piecewise);
     }
 
     // Adding accounts to the whitelist
-    function addToWhitelist(address[] memory _accounts) external onlyOwner() {
+    function addToWhitelist(address[] calldata _accounts) external onlyOwner() {
         require(_accounts.length < 10, "It's allowed to add up to 10 accounts at a time");
-        for (uint256 i=0; i<_accounts.length; i++) {
-            isWhitelisted[_accounts[i]] = true;
-        }
+        _addToWhitelist(_accounts);
+    }
+
+    // Adding accounts to the whitelist, batch size is limited only by the block gas limit
+    function addToWhitelistBulk(address[] calldata _accounts) external onlyOwner() {
+        _addToWhitelist(_accounts);
     }
 
     // Deleting account from the whitelist
     function deleteFromWhitelist(address _account) external onlyOwner() {
         require(isWhitelisted[_account], "This account is not in the whitelist");
         isWhitelisted[_account] = false;
+        emit WhitelistUpdated(_account, false);
     }
 
     // Defining initial allocations which will be immediately stacked and start to vest after calling start()
-    function initAllocations(address[] memory _accounts, uint256[] memory _stake, uint256[] memory _strategies) external onlyOwner() {
+    function initAllocations(address[] calldata _accounts, uint256[] calldata _stake, uint256[] calldata _strategies) external onlyOwner() {
         require(_accounts.length == _stake.length &&_accounts.length == _strategies.length, "Arrays are not the same size");
         require(_accounts.length < 10, "It's allowed to add up to 10 accounts at a time");
-        uint256 startTimestamp = block.timestamp;
-
-        for (uint i=0; i<_accounts.length; i++) {
-            address account = _accounts[i];
-            uint256 accStake = _stake[i];
-            uint256 strategyNum = _strategies[i];
-            require(account != address(0));
-            require(Token(tokenAddress).balanceOf(contractOwner) >= accStake + totalValueLocked);
-            require(accStake > 0 && accStake < 50_000);
-            require(strategyNum != 0 && strategyNum <= vestingStrategiesAmount);
+        _initAllocations(_accounts, _stake, _strategies);
+    }
 
-            StakeInfo memory newStake = StakeInfo(
-                accStake, 0, startTimestamp, strategyNum, 0, 0
-            );
-            stakes[account] = newStake;
-            isStakeholder[account] = true;
+    // Same as initAllocations(), batch size is limited only by the block gas limit
+    function initAllocationsBulk(address[] calldata _accounts, uint256[] calldata _stake, uint256[] calldata _strategies) external onlyOwner() {
+        require(_accounts.length == _stake.length &&_accounts.length == _strategies.length, "Arrays are not the same size");
+        _initAllocations(_accounts, _stake, _strategies);
+    }
 
-            totalValueLocked += accStake;
-        }
+    // Publishing the Merkle root of allocations and whitelist entries, users activate their own entries.
+    // Indexes of activated entries are kept, so entries of a new root must use new indexes
+    function setMerkleRoot(bytes32 _merkleRoot) external onlyOwner() {
+        merkleRoot = _merkleRoot;
+        merkleRootTimestamp = block.timestamp;
+        emit MerkleRootSet(_merkleRoot);
     }
 
     // Start of vesting-staking and initializing rewards by the contract owner
     function start(uint256 _rewardPerHour, uint256 _rewardPool) external onlyOwner() {
-        require(Token(tokenAddress).balanceOf(contractOwner) >= _rewardPool + totalValueLocked);
+        require(status == Status.NotStarted, "Vesting-staking has started already");  // fixed unlock times depend on the start
+        _reserveFunds(rewardPool + totalValueLocked, _rewardPool + totalValueLocked, "");
         rewardPerHour = _rewardPerHour;
         status = Status.Started;
         startingTimestamp = block.timestamp;
-        lastUpdateTime = startingTimestamp;
+        lastUpdateTime = uint64(block.timestamp);
         rewardPool = _rewardPool;
+        emit Started(_rewardPerHour, _rewardPool);
     }
 
-    // Staking and choosing vesting strategy by whitelisted account
+    // Staking and choosing vesting strategy by whitelisted account, every stake is a new position of the account
     function stake(uint256 _stake, uint256 _strategyNum) external updateReward {
         require(status == Status.Started, "Vesting-staking hasn't started yet");
-        require(!isStakeholder[msg.sender], "You are stakeholder already");
         require(isWhitelisted[msg.sender], "You are not in the whitelist, ask admin to add you");
         require(_strategyNum != 0 && _strategyNum <= vestingStrategiesAmount, "Wrong strategy number");
-        require(Token(tokenAddress).balanceOf(contractOwner) >= rewardPool + totalValueLocked + _stake, "Contract owner doesn't have that many tokens");
+        _reserveFunds(rewardPool + totalValueLocked, rewardPool + totalValueLocked + _stake, "Contract owner doesn't have that many tokens");
 
-        stakes[msg.sender].tokensStaked = _stake;
-        stakes[msg.sender].vestingWithdrawed = 0;
-        stakes[msg.sender].startingTimestamp = block.timestamp;
-        stakes[msg.sender].vestingStrategyNumber = _strategyNum;
-
-        isStakeholder[msg.sender] = true;
+        _addPosition(msg.sender, _stake, block.timestamp, _strategyNum, startingTimestamp);
 
         totalValueLocked += _stake;
+        emit Staked(msg.sender, _stake, _strategyNum);
+    }
+
+    // stake() of many accounts with their signed intents in one operator transaction sent through the stake relay,
+    // which checks deadlines and signatures (_signed). The accumulator is updated once (see claimFor()) and funds are
+    // reserved once for the whole batch. Intents which can't be applied (expired, wrong signature, wrong nonce,
+    // not whitelisted, wrong strategy, too many positions) are skipped, so a stale intent doesn't fail the batch.
+    // Intents of one account are applied in the order of their nonces
+    function stakeFor(StakeIntent[] calldata _intents, bool[] calldata _signed) external {
+        require(msg.sender == stakeRelay, "Caller is not the stake relay");
+        require(status == Status.Started, "Vesting-staking hasn't started yet");
+        require(_intents.length == _signed.length);
+        uint256 rewardPerToken = _updateRewardPerToken();
+        uint256 stakingStart = startingTimestamp;
+        uint256 strategiesAmount = vestingStrategiesAmount;
+
+        uint256 totalStake = 0;
+        for (uint256 i=0; i<_intents.length; i++) {
+            StakeIntent calldata intent = _intents[i];
+            if (!_signed[i] || !_isValidStakeIntent(intent, strategiesAmount)) {
+                emit StakeIntentSkipped(intent.account, intent.nonce);
+                continue;
+            }
+            _updateReward(intent.account, rewardPerToken);
+            _addPosition(intent.account, intent.amount, block.timestamp, intent.strategyNumber, stakingStart);
+            _stakes[intent.account].stakeNonce += 1;  // same slot as positionsCount written by _addPosition()
+            totalStake += intent.amount;
+            emit Staked(intent.account, intent.amount, intent.strategyNumber);
+        }
+        _reserveFunds(rewardPool + totalValueLocked, rewardPool + totalValueLocked + totalStake, "Contract owner doesn't have that many tokens");
+        totalValueLocked += totalStake;
+    }
+
+    // Cancelling own stake intent with the current nonce which isn't submitted yet, intents with later nonces can't be applied
+    // before they are signed again with the next nonces
+    function cancelStakeIntent() external {
+        uint256 nonce = _stakes[msg.sender].stakeNonce;
+        require(nonce < type(uint24).max);
+        _stakes[msg.sender].stakeNonce = uint24(nonce + 1);
+        emit StakeIntentCancelled(msg.sender, nonce);
+    }
+
+    // Activating own allocation (same as initAllocations() at the time the root was published) or whitelist entry
+    function activateMerkleEntry(uint256 _index, uint256 _amount, uint256 _strategyNum, bytes32[] calldata _proof) external updateReward {
+        require(!_activatedMerkleEntries.get(_index), "Entry is activated already");
+        bytes32 leaf = keccak256(abi.encodePacked(_index, msg.sender, _amount, _strategyNum));
+        require(MerkleProof.verify(_proof, merkleRoot, leaf), "Invalid Merkle proof");
+        _activatedMerkleEntries.set(_index);
+
+        if (_amount == 0) {
+            isWhitelisted[msg.sender] = true;
+            emit WhitelistUpdated(msg.sender, true);
+            return;
+        }
+
+        require(_amount < 50_000);
+        require(_strategyNum != 0 && _strategyNum <= vestingStrategiesAmount, "Wrong strategy number");
+        _reserveFunds(rewardPool + totalValueLocked, rewardPool + totalValueLocked + _amount, "Contract owner doesn't have that many tokens");
+
+        _addPosition(msg.sender, _amount, merkleRootTimestamp, _strategyNum, startingTimestamp);
+
+        totalValueLocked += _amount;
+        emit Allocated(msg.sender, _amount, _strategyNum);
     }
 
     // Getting stake reward to the balance of ERC20 token according to account's stake share to TVL
     function getReward() external updateReward {
-        uint256 tokensReward = stakes[msg.sender].reward;
+        uint256 tokensReward = _stakes[msg.sender].reward;
         require(tokensReward != 0);
         require(rewardPool >= tokensReward, "Not enough tokens in reward pool");
 
-        Token(tokenAddress).transferFrom(contractOwner, msg.sender, tokensReward);
+        _payOut(msg.sender, tokensReward);
         rewardPool -= tokensReward;
-        stakes[msg.sender].reward = 0;
+        _stakes[msg.sender].reward = 0;
+        emit RewardPaid(msg.sender, tokensReward);
     }
 
-    // Withdraw staked tokens according to the vesting strategy. Decreases your share in TVL.
+    // Withdraw staked tokens of all your positions according to their vesting strategies. Decreases your share in TVL.
     function vestingWithdraw() external updateReward {
-        uint256 withdraw = calculateVestingSchedule(msg.sender);
+        _requireVesting(msg.sender);
+        StakeInfo storage stakeholder = _stakes[msg.sender];
+        uint256 withdraw = _withdrawVesting(msg.sender, stakeholder.positionsCount, startingTimestamp);
         require(withdraw != 0);
 
-        Token(tokenAddress).transferFrom(contractOwner, msg.sender, withdraw);
-        stakes[msg.sender].tokensStaked -= withdraw;
-        stakes[msg.sender].vestingWithdrawed += withdraw;
+        _payOut(msg.sender, withdraw);
+        stakeholder.tokensStaked -= uint96(withdraw);
         totalValueLocked -= withdraw;
+        emit VestingWithdrawn(msg.sender, withdraw);
+    }
+
+    // getReward() and vestingWithdraw() in one transaction with a single reward update and a single token transfer
+    function claimAll() external updateReward {
+        _requireVesting(msg.sender);
+        StakeInfo storage stakeholder = _stakes[msg.sender];
+        uint256 withdraw = _withdrawVesting(msg.sender, stakeholder.positionsCount, startingTimestamp);
+        uint256 tokensReward = stakeholder.reward;
+        require(withdraw + tokensReward != 0);
+        require(rewardPool >= tokensReward, "Not enough tokens in reward pool");
+
+        _payOut(msg.sender, withdraw + tokensReward);
+        if (tokensReward != 0) {
+            rewardPool -= tokensReward;
+            stakeholder.reward = 0;
+            emit RewardPaid(msg.sender, tokensReward);
+        }
+        if (withdraw != 0) {
+            stakeholder.tokensStaked -= uint96(withdraw);
+            totalValueLocked -= withdraw;
+            emit VestingWithdrawn(msg.sender, withdraw);
+        }
+    }
+
+    // claimAll() for many accounts: reward and claimable vesting are paid to every account itself.
+    // The accumulator is updated once, TVL doesn't change reward per token within the block, so the result
+    // is the same as claimAll() of every account. Non-stakeholders and accounts with nothing to claim are skipped
+    function claimFor(address[] calldata _accounts) external onlyOperator() {
+        require(status == Status.Started, "Vesting-staking hasn't started yet");
+        uint256 rewardPerToken = _updateRewardPerToken();
+        uint256 stakingStart = startingTimestamp;
+
+        uint256 totalReward = 0;
+        uint256 totalWithdraw = 0;
+        for (uint256 i=0; i<_accounts.length; i++) {
+            address account = _accounts[i];
+            StakeInfo memory stakeholder = _stakes[account];
+            if (stakeholder.positionsCount == 0) {
+                continue;
+            }
+            uint256 tokensReward = _earned(stakeholder, rewardPerToken);
+            uint256 withdraw = _withdrawVesting(account, stakeholder.positionsCount, stakingStart);
+            if (tokensReward + withdraw == 0) {
+                continue;
+            }
+
+            stakeholder.rewardPerTokenPaid = uint128(rewardPerToken);
+            stakeholder.reward = 0;
+            stakeholder.tokensStaked -= uint96(withdraw);
+            _stakes[account] = stakeholder;
+
+            _payOut(account, withdraw + tokensReward);
+            if (tokensReward != 0) {
+                emit RewardPaid(account, tokensReward);
+            }
+            if (withdraw != 0) {
+                emit VestingWithdrawn(account, withdraw);
+            }
+            totalReward += tokensReward;
+            totalWithdraw += withdraw;
+        }
+        require(rewardPool >= totalReward, "Not enough tokens in reward pool");
+        rewardPool -= totalReward;
+        totalValueLocked -= totalWithdraw;
+    }
+
+    function setOperator(address _account, bool _isOperator) external onlyOwner() {
+        isOperator[_account] = _isOperator;
+        emit OperatorUpdated(_account, _isOperator);
+    }
+
+    function setStakeRelay(address _stakeRelay) external onlyOwner() {
+        stakeRelay = _stakeRelay;
+        emit StakeRelaySet(_stakeRelay);
     }
 
-    // Admin function for editing the amount of staked token for account before start() is called
+    // Admin function for editing the amount of the account's first position (its allocation) before start() is called
     function editAmountPerWallet(address _account, uint256 _amount) external onlyOwner() {
         require(status == Status.NotStarted, "Staking is started already");
-        require(isStakeholder[_account], "This account is not a stakeholder");
-        require(_amount > 0);
-        
-        uint256 prevAmount = stakes[_account].tokensStaked;
-        require(Token(tokenAddress).balanceOf(contractOwner) >= rewardPool + totalValueLocked + _amount - prevAmount, "Contract owner doesn't have that many tokens");
 
-        stakes[_account].tokensStaked = _amount;
+        uint256 prevAmount = _editAllocation(_account, _amount);
+        _reserveFunds(rewardPool + totalValueLocked, rewardPool + totalValueLocked + _amount - prevAmount, "Contract owner doesn't have that many tokens");
 
         totalValueLocked = totalValueLocked - prevAmount + _amount;
     }
 
+    // Batched editAmountPerWallet(), batch size is limited only by the block gas limit
+    function editAmountsPerWallet(address[] calldata _accounts, uint256[] calldata _amounts) external onlyOwner() {
+        require(status == Status.NotStarted, "Staking is started already");
+        require(_accounts.length == _amounts.length, "Arrays are not the same size");
+
+        uint256 tvl = totalValueLocked;
+        for (uint256 i=0; i<_accounts.length; i++) {
+            tvl = tvl - _editAllocation(_accounts[i], _amounts[i]) + _amounts[i];
+        }
+        _reserveFunds(rewardPool + totalValueLocked, rewardPool + tvl, "Contract owner doesn't have that many tokens");
+
+        totalValueLocked = tvl;
+    }
+
     // Replenishment of the reward pool by the contract owner
     function addAditionalReward(uint256 _extraReward) external onlyOwner() {
-        require(Token(tokenAddress).balanceOf(contractOwner) >= rewardPool + totalValueLocked + _extraReward);
+        _reserveFunds(rewardPool + totalValueLocked, rewardPool + totalValueLocked + _extraReward, "");
         rewardPool += _extraReward;
+        emit RewardAdded(_extraReward);
+    }
+
+    // Switching to escrow mode: _amount tokens (at least TVL + reward pool) are moved from the owner to this contract
+    function enableEscrow(uint256 _amount) external onlyOwner() {
+        require(!escrowEnabled, "Escrow is enabled already");
+        uint256 reserved = rewardPool + totalValueLocked;
+        require(_amount >= reserved, "Not enough tokens for TVL and reward pool");
+
+        Token(tokenAddress).transferFrom(contractOwner, address(this), _amount);
+        escrowEnabled = true;
+        escrowSurplus = _amount - reserved;
+        emit EscrowDeposited(_amount);
+    }
+
+    // Adding tokens to the escrow for future stakes and rewards
+    function depositToEscrow(uint256 _amount) external onlyOwner() {
+        require(escrowEnabled, "Escrow is not enabled");
+
+        Token(tokenAddress).transferFrom(contractOwner, address(this), _amount);
+        escrowSurplus += _amount;
+        emit EscrowDeposited(_amount);
+    }
+
+    // Returning escrowed tokens which are not reserved for TVL or reward pool to the owner
+    function withdrawEscrowSurplus(uint256 _amount) external onlyOwner() {
+        require(escrowSurplus >= _amount, "Not enough surplus tokens in escrow");
+
+        escrowSurplus -= _amount;
+        Token(tokenAddress).transfer(contractOwner, _amount);
+        emit EscrowWithdrawn(_amount);
     }
 
     //-------------------------------------------------------------------------
     // MODIFIERS
     //-------------------------------------------------------------------------
 
+    modifier onlyOperator() {
+        require(isOperator[msg.sender] || msg.sender == owner(), "Caller is not an operator");
+        _;
+    }
+
     // Called when someone stakes, withdraws or receives tokens (synthetix-staking algorithm)
     modifier updateReward() {
-        rewardPerTokenStored = _rewardPerToken();
-        lastUpdateTime = block.timestamp;
-        stakes[msg.sender].reward = _earned();
-        stakes[msg.sender].rewardPerTokenPaid = rewardPerTokenStored;
+        _updateReward(msg.sender, _updateRewardPerToken());
         _;
     }
 
@@ -214,57 +546,251 @@ contract VestingStaking is Ownable{
     // INTERNAL FUNCTIONS
     //-------------------------------------------------------------------------
 
-    // Calculates not paid current reward per staked token
-    function _rewardPerToken() internal view returns (uint256) {
-        if (totalValueLocked == 0) {
-            return 0;
+    // Checks that there are tokens for TVL and reward pool when they change from _reservedBefore to _reservedAfter:
+    // the owner's balance, or the escrow surplus which the difference is taken from (returned to) in escrow mode
+    function _reserveFunds(uint256 _reservedBefore, uint256 _reservedAfter, string memory _message) internal {
+        if (!escrowEnabled) {
+            require(Token(tokenAddress).balanceOf(contractOwner) >= _reservedAfter, _message);
+            return;
+        }
+        uint256 available = escrowSurplus + _reservedBefore;
+        require(available >= _reservedAfter, _message);
+        escrowSurplus = available - _reservedAfter;
+    }
+
+    // Paying rewards and vested tokens from the escrow or from the owner's wallet
+    function _payOut(address _to, uint256 _amount) internal {
+        if (escrowEnabled) {
+            Token(tokenAddress).transfer(_to, _amount);
+        }
+        else {
+            Token(tokenAddress).transferFrom(contractOwner, _to, _amount);
+        }
+    }
+
+    function _initialize(address _tokenAddress, address _owner) internal {
+        tokenAddress = _tokenAddress;
+        contractOwner = _owner;
+        _transferOwnership(_owner);
+    }
+
+    function _createWestingStrategies(
+        uint256[] calldata _cliffTimesInDays,
+        uint256[] calldata _vestingTimesInDays,
+        VestingStrategies[] calldata _vestingStrategyTypes
+    ) internal {
+        require(_cliffTimesInDays.length == _vestingTimesInDays.length && _cliffTimesInDays.length == _vestingStrategyTypes.length, "Arrays are not the same size");
+        uint256 strategiesAmount = vestingStrategiesAmount;
+        for (uint256 i=0; i<_cliffTimesInDays.length; i++) {
+            strategiesAmount += 1;
+            _createWestingStrategy(strategiesAmount, _cliffTimesInDays[i], _vestingTimesInDays[i], _vestingStrategyTypes[i]);
         }
-        return rewardPerTokenStored + (
-            rewardPerHour * (block.timestamp - lastUpdateTime) * 1e18 / totalValueLocked / 1 hours
+        vestingStrategiesAmount = strategiesAmount;
+    }
+
+    function _createWestingStrategy(uint256 _strategyNumber, uint256 _cliffTimeInDays, uint256 _vestingTimeInDays, VestingStrategies _vestingStrategy) internal {
+        require(_cliffTimeInDays >= 1);
+        require(_vestingTimeInDays > 1);
+        require(_vestingStrategy == VestingStrategies.Linear || _vestingStrategy == VestingStrategies.Stepped);
+        require(_strategyNumber <= type(uint24).max);  // Position.vestingStrategyNumber
+        VestingInfo memory newVestingStrat = VestingInfo(
+            SafeCast.toUint32(_cliffTimeInDays * 1 days), SafeCast.toUint32(_vestingTimeInDays * 1 days), _vestingStrategy
         );
+        _vestingStrategies[_strategyNumber] = newVestingStrat;
+        emit StrategyCreated(_strategyNumber, newVestingStrat.cliffTime, newVestingStrat.vestingTime, _vestingStrategy);
     }
 
-    // Calculates reward for stakeholder
-    function _earned() internal view returns (uint256) {
-        return (stakes[msg.sender].tokensStaked * (_rewardPerToken() - stakes[msg.sender].rewardPerTokenPaid) / 1e18) + stakes[msg.sender].reward;
+    function _addToWhitelist(address[] calldata _accounts) internal {
+        for (uint256 i=0; i<_accounts.length; i++) {
+            isWhitelisted[_accounts[i]] = true;
+            emit WhitelistUpdated(_accounts[i], true);
+        }
     }
 
-    //-------------------------------------------------------------------------
-    // VIEW FUNCTIONS
-    //-------------------------------------------------------------------------
+    // Owner balance is read once and TVL is summed in memory, so the check is done against the final TVL.
+    // Every allocation is a new position, unlock times of allocations made before start() are fixed later
+    function _initAllocations(address[] calldata _accounts, uint256[] calldata _stake, uint256[] calldata _strategies) internal {
+        uint256 strategiesAmount = vestingStrategiesAmount;
+        uint256 stakingStart = startingTimestamp;
+        uint256 tvl = totalValueLocked;
+        // Nothing is earned before start(), afterwards rewards of the accounts are brought up to date first
+        uint256 rewardPerToken = stakingStart != 0 ? _updateRewardPerToken() : 0;
 
-    // Calculates the amount of vesting schedule tokens for withdrawing
-    function calculateVestingSchedule(address _account) public view returns (uint256) {
-        require(status == Status.Started, "Vesting-staking hasn't started yet");
-        require(isStakeholder[_account], "User is not a stakeholder");
+        for (uint i=0; i<_accounts.length; i++) {
+            address account = _accounts[i];
+            uint256 accStake = _stake[i];
+            uint256 strategyNum = _strategies[i];
+            require(account != address(0));
+            require(accStake > 0 && accStake < 50_000);
+            require(strategyNum != 0 && strategyNum <= strategiesAmount);
 
-        VestingInfo memory accountStrategy = vestingStrategies[stakes[_account].vestingStrategyNumber];
+            if (stakingStart != 0) {
+                _updateReward(account, rewardPerToken);
+            }
+            _addPosition(account, accStake, block.timestamp, strategyNum, stakingStart);
 
-        uint256 startVesting = stakes[_account].startingTimestamp;
-        if (startVesting < startingTimestamp) {
-            startVesting = startingTimestamp;
+            tvl += accStake;
+            emit Allocated(account, accStake, strategyNum);
         }
+        _reserveFunds(totalValueLocked, tvl, "");
+
+        totalValueLocked = tvl;
+    }
+
+    // Appends a position to the account and adds it to the account's total, the reward of the account is updated
+    // by the caller. Unlock times are fixed right away when _stakingStart is set (after start())
+    function _addPosition(address _account, uint256 _amount, uint256 _startingTimestamp, uint256 _strategyNum, uint256 _stakingStart) internal {
+        StakeInfo storage stakeholder = _stakes[_account];
+        uint256 index = stakeholder.positionsCount;
+        require(index < MAX_POSITIONS, "Too many positions");
+
+        Position memory created = Position(
+            SafeCast.toUint96(_amount), 0, SafeCast.toUint32(_startingTimestamp), uint24(_strategyNum),
+            _vestingStrategies[_strategyNum].vestingStrategy, 0, 0
+        );
+        Position storage position = _positions[_account][index];
+        position.tokensStaked = created.tokensStaked;
+        position.startingTimestamp = created.startingTimestamp;
+        position.vestingStrategyNumber = created.vestingStrategyNumber;
+        position.vestingStrategy = created.vestingStrategy;
+        if (_stakingStart != 0) {  // the 2nd slot stays empty otherwise
+            (position.cliffEnd, position.vestingEnd) = _unlockTimes(created, _stakingStart);
+        }
+
+        stakeholder.tokensStaked += created.tokensStaked;
+        stakeholder.positionsCount = uint8(index + 1);
+        if (index == 0) {
+            _stakeholders.push(_account);
+        }
+    }
+
+    // Checks of stake() for a signed intent, its deadline and signature are checked by the stake relay
+    function _isValidStakeIntent(StakeIntent calldata _intent, uint256 _strategiesAmount) internal view returns (bool) {
+        StakeInfo storage stakeholder = _stakes[_intent.account];
+        if (_intent.nonce != stakeholder.stakeNonce || stakeholder.positionsCount >= MAX_POSITIONS) {
+            return false;
+        }
+        if (!isWhitelisted[_intent.account] || _intent.strategyNumber == 0 || _intent.strategyNumber > _strategiesAmount) {
+            return false;
+        }
+        return _intent.amount <= type(uint96).max && _intent.nonce != type(uint24).max;  // else the nonce can't be incremented
+    }
 
+    // Sets the amount of the account's first position before start(), returns the previous one
+    function _editAllocation(address _account, uint256 _amount) internal returns (uint256 prevAmount) {
+        require(isStakeholder(_account), "This account is not a stakeholder");
+        require(_amount > 0);
+
+        Position storage allocation = _positions[_account][0];
+        StakeInfo storage stakeholder = _stakes[_account];
+        prevAmount = allocation.tokensStaked;
+        allocation.tokensStaked = SafeCast.toUint96(_amount);
+        stakeholder.tokensStaked = SafeCast.toUint96(stakeholder.tokensStaked - prevAmount + _amount);
+        emit AllocationEdited(_account, _amount);
+    }
+
+    // Moves claimable tokens of every position of the account to withdrawn and returns their sum, which the caller
+    // subtracts from the account's total and TVL. Only positions with claimable tokens are written
+    function _withdrawVesting(address _account, uint256 _positionsCount, uint256 _stakingStart) internal returns (uint256 withdraw) {
+        mapping (uint256 => Position) storage positions = _positions[_account];
+        for (uint256 i=0; i<_positionsCount; i++) {
+            Position memory position = positions[i];
+            if (position.vestingEnd == 0) {
+                (position.cliffEnd, position.vestingEnd) = _unlockTimes(position, _stakingStart);
+            }
+            uint256 amount = _vestingSchedule(position);
+            if (amount != 0) {
+                position.tokensStaked -= uint96(amount);
+                position.vestingWithdrawed += uint96(amount);
+                positions[i] = position;
+                withdraw += amount;
+            }
+        }
+    }
+
+    // Adds the reward earned since the last update to the account, each slot is written only when it changes
+    function _updateReward(address _account, uint256 _rewardPerToken) internal {
+        StakeInfo storage stakeholder = _stakes[_account];
+        StakeInfo memory current = stakeholder;
+        uint256 reward = _earned(current, _rewardPerToken);
+        if (_rewardPerToken != current.rewardPerTokenPaid) {
+            stakeholder.rewardPerTokenPaid = uint128(_rewardPerToken);
+        }
+        if (reward != current.reward) {
+            stakeholder.reward = reward;
+        }
+    }
+
+    // Calculates not paid current reward per staked token. It saturates at type(uint128).max instead of overflowing:
+    // a dust TVL (e.g. 1 token unit) makes it grow by ~1e36 an hour for 1e18 reward per hour, then stakers stop earning
+    // but every reward update keeps working. It stays as it is while TVL is 0, so it never goes below the paid ones
+    function _rewardPerToken() internal view returns (uint256) {
+        uint256 tvl = totalValueLocked;
+        if (tvl == 0) {
+            return rewardPerTokenStored;
+        }
+        uint256 elapsed = block.timestamp - lastUpdateTime;
+        if (elapsed == 0) {
+            return rewardPerTokenStored;
+        }
+        uint256 rewardPerToken = rewardPerTokenStored + rewardPerHour * elapsed * 1e18 / tvl / 1 hours;
+        return rewardPerToken < type(uint128).max ? rewardPerToken : type(uint128).max;
+    }
+
+    // Brings the accumulator up to the current block, the slot is written only when something changes
+    function _updateRewardPerToken() internal returns (uint256 rewardPerToken) {
+        rewardPerToken = _rewardPerToken();
+        if (rewardPerToken != rewardPerTokenStored || block.timestamp != lastUpdateTime) {
+            rewardPerTokenStored = uint128(rewardPerToken);
+            lastUpdateTime = uint64(block.timestamp);
+        }
+    }
+
+    // Calculates reward for stakeholder
+    function _earned(StakeInfo memory _stakeholder, uint256 _currentRewardPerToken) internal pure returns (uint256) {
+        return (_stakeholder.tokensStaked * (_currentRewardPerToken - _stakeholder.rewardPerTokenPaid) / 1e18) + _stakeholder.reward;
+    }
+
+    // Cliff end and vesting end of the position, vesting starts not earlier than _stakingStart
+    function _unlockTimes(Position memory _position, uint256 _stakingStart) internal view returns (uint32, uint32) {
+        VestingInfo memory accountStrategy = _vestingStrategies[_position.vestingStrategyNumber];
+
+        uint256 startVesting = _position.startingTimestamp;
+        if (startVesting < _stakingStart) {
+            startVesting = _stakingStart;
+        }
+        uint256 cliffEnd = startVesting + accountStrategy.cliffTime;
+        return (SafeCast.toUint32(cliffEnd), SafeCast.toUint32(cliffEnd + accountStrategy.vestingTime));
+    }
+
+    // Calculates the amount of vesting schedule tokens for withdrawing, unlock times of the position must be set
+    function _vestingSchedule(Position memory _position) internal view returns (uint256) {
         // Vesting time is over, account can withdraw 100% tokens
-        if (block.timestamp > startVesting + accountStrategy.cliffTime + accountStrategy.vestingTime) {
-            return stakes[_account].tokensStaked;
+        if (block.timestamp > _position.vestingEnd) {
+            return _position.tokensStaked;
         }
         // Withdraw according to the strategy
         else {
-            if (block.timestamp > startVesting + accountStrategy.cliffTime) {  // it is possible to withdraw some tokens
+            if (block.timestamp > _position.cliffEnd) {  // it is possible to withdraw some tokens
                 uint256 withdraw = 0;
-                if (accountStrategy.vestingStrategy == VestingStrategies.Linear) {
-                    withdraw = (block.timestamp - startVesting - accountStrategy.cliffTime) *
-                        (stakes[msg.sender].tokensStaked + stakes[msg.sender].vestingWithdrawed) / accountStrategy.vestingTime;
-                    withdraw = withdraw - stakes[msg.sender].vestingWithdrawed;
+                uint256 vestingTime = _position.vestingEnd - _position.cliffEnd;
+                if (_position.vestingStrategy == VestingStrategies.Linear) {
+                    withdraw = (block.timestamp - _position.cliffEnd) *
+                        (uint256(_position.tokensStaked) + _position.vestingWithdrawed) / vestingTime;
+                    withdraw = withdraw - _position.vestingWithdrawed;
+                }
+                else if (_position.vestingStrategy == VestingStrategies.Piecewise) {
+                    withdraw = (uint256(_position.tokensStaked) + _position.vestingWithdrawed) *
+                        _unlockedShare(_position.vestingStrategyNumber, block.timestamp - _position.cliffEnd) / FULL_SHARE;
+                    withdraw = withdraw - _position.vestingWithdrawed;
                 }
                 else {  // 50% in 1st half, 50% in 2nd half
 
-                    if ((block.timestamp - startVesting - accountStrategy.cliffTime) < accountStrategy.vestingTime / 2) {  // 1st half
-                        withdraw = (stakes[msg.sender].tokensStaked + stakes[msg.sender].vestingWithdrawed) / 2 - stakes[msg.sender].vestingWithdrawed;
+                    if ((block.timestamp - _position.cliffEnd) < vestingTime / 2) {  // 1st half
+                        withdraw = (uint256(_position.tokensStaked) + _position.vestingWithdrawed) / 2 - _position.vestingWithdrawed;
                     }
                     else {
-                        withdraw = stakes[msg.sender].tokensStaked;
+                        withdraw = _position.tokensStaked;
                     }
                 }
 
@@ -274,6 +800,168 @@ contract VestingStaking is Ownable{
         }
     }
 
+    // Vesting of the account's positions can be calculated: unlock times are known after start()
+    function _requireVesting(address _account) internal view {
+        require(status == Status.Started, "Vesting-staking hasn't started yet");
+        require(isStakeholder(_account), "User is not a stakeholder");
+    }
+
+    // Claimable tokens of a position after start(), unlock times are calculated in memory if they aren't fixed yet
+    function _claimable(Position memory _position, uint256 _stakingStart) internal view returns (uint256) {
+        if (_position.vestingEnd == 0) {
+            (_position.cliffEnd, _position.vestingEnd) = _unlockTimes(_position, _stakingStart);
+        }
+        return _vestingSchedule(_position);
+    }
+
+    // Sum of withdrawn tokens of all positions of the account
+    function _vestingWithdrawed(address _account) internal view returns (uint256 withdrawed) {
+        uint256 count = _stakes[_account].positionsCount;
+        for (uint256 i=0; i<count; i++) {
+            withdrawed += _positions[_account][i].vestingWithdrawed;
+        }
+    }
+
+    // Unlocked share of a piecewise strategy _elapsed seconds after the vesting start, checkpoints are found by binary search
+    function _unlockedShare(uint256 _strategyNumber, uint256 _elapsed) internal view returns (uint256) {
+        Checkpoint[] storage checkpoints = _checkpoints[_strategyNumber];
+
+        // Number of checkpoints with offset <= _elapsed
+        uint256 low = 0;
+        uint256 high = checkpoints.length;
+        while (low < high) {
+            uint256 middle = (low + high) / 2;
+            if (checkpoints[middle].offset > _elapsed) {
+                high = middle;
+            }
+            else {
+                low = middle + 1;
+            }
+        }
+
+        if (low == checkpoints.length) {
+            return checkpoints[low - 1].share;
+        }
+        Checkpoint memory next = checkpoints[low];
+        Checkpoint memory previous;  // (0, 0) before the 1st checkpoint
+        if (low != 0) {
+            previous = checkpoints[low - 1];
+        }
+        return previous.share + (next.share - previous.share) * (_elapsed - previous.offset) / (next.offset - previous.offset);
+    }
+
+    //-------------------------------------------------------------------------
+    // VIEW FUNCTIONS
+    //-------------------------------------------------------------------------
+
+    // Calculates the amount of vesting schedule tokens for withdrawing from all positions of the account
+    function calculateVestingSchedule(address _account) public view returns (uint256 withdraw) {
+        _requireVesting(_account);
+        uint256 count = _stakes[_account].positionsCount;
+        uint256 stakingStart = startingTimestamp;
+        for (uint256 i=0; i<count; i++) {
+            withdraw += _claimable(_positions[_account][i], stakingStart);
+        }
+    }
+
+    // Reward which account can get right now with getReward()
+    function earned(address _account) public view returns (uint256) {
+        StakeInfo memory stakeholder = _stakes[_account];
+        uint256 currentRewardPerToken = _rewardPerToken();
+        return currentRewardPerToken >= stakeholder.rewardPerTokenPaid ? _earned(stakeholder, currentRewardPerToken) : stakeholder.reward;
+    }
+
+    // Positions of every account summed up in one call, claimable vesting is 0 before start() and for non-stakeholders
+    function getPositions(address[] calldata _accounts) external view returns (PositionView[] memory positions) {
+        positions = new PositionView[](_accounts.length);
+        uint256 currentRewardPerToken = _rewardPerToken();
+        bool started = status == Status.Started;
+        uint256 stakingStart = startingTimestamp;
+
+        for (uint256 i=0; i<_accounts.length; i++) {
+            positions[i] = _positionView(_accounts[i], currentRewardPerToken, started, stakingStart);
+        }
+    }
+
+    // Stakeholders from _offset up to _limit of them with their positions summed up like in getPositions(),
+    // a snapshot pages through all of them at one block (see scripts/snapshot.py)
+    function getPositionsPage(uint256 _offset, uint256 _limit) external view returns (address[] memory accounts, PositionView[] memory positions) {
+        accounts = getStakeholders(_offset, _limit);
+        positions = new PositionView[](accounts.length);
+        uint256 currentRewardPerToken = _rewardPerToken();
+        bool started = status == Status.Started;
+        uint256 stakingStart = startingTimestamp;
+
+        for (uint256 i=0; i<accounts.length; i++) {
+            positions[i] = _positionView(accounts[i], currentRewardPerToken, started, stakingStart);
+        }
+    }
+
+    function _positionView(address _account, uint256 _rewardPerToken, bool _started, uint256 _stakingStart) internal view returns (PositionView memory info) {
+        StakeInfo memory stakeholder = _stakes[_account];
+        info.tokensStaked = stakeholder.tokensStaked;
+        for (uint256 j=0; j<stakeholder.positionsCount; j++) {
+            Position memory position = _positions[_account][j];
+            if (j == 0) {
+                info.startingTimestamp = position.startingTimestamp;
+                info.vestingStrategyNumber = position.vestingStrategyNumber;
+            }
+            info.vestingWithdrawed += position.vestingWithdrawed;
+            if (_started) {
+                info.claimableVesting += _claimable(position, _stakingStart);
+            }
+        }
+        // _rewardPerToken() doesn't go below the paid one, the stored reward is returned if it ever did
+        info.pendingReward = _rewardPerToken >= stakeholder.rewardPerTokenPaid ? _earned(stakeholder, _rewardPerToken) : stakeholder.reward;
+    }
+
+    function stakeholdersCount() public view returns (uint256) {
+        return _stakeholders.length;
+    }
+
+    // Stakeholders from _offset up to _limit of them, fewer (or none) at the end of the list
+    function getStakeholders(uint256 _offset, uint256 _limit) public view returns (address[] memory accounts) {
+        uint256 count = _stakeholders.length;
+        uint256 end = _offset < count && _limit < count - _offset ? _offset + _limit : count;
+        accounts = new address[](end > _offset ? end - _offset : 0);
+        for (uint256 i=0; i<accounts.length; i++) {
+            accounts[i] = _stakeholders[_offset + i];
+        }
+    }
+
+    // All positions of the account in one call, unlock times and claimable vesting are 0 before start()
+    function getAccountPositions(address _account) external view returns (PositionInfo[] memory positions) {
+        positions = new PositionInfo[](_stakes[_account].positionsCount);
+        bool started = status == Status.Started;
+        uint256 stakingStart = startingTimestamp;
+
+        for (uint256 i=0; i<positions.length; i++) {
+            Position memory position = _positions[_account][i];
+            PositionInfo memory info = positions[i];
+            info.tokensStaked = position.tokensStaked;
+            info.vestingWithdrawed = position.vestingWithdrawed;
+            info.startingTimestamp = position.startingTimestamp;
+            info.vestingStrategyNumber = position.vestingStrategyNumber;
+            if (started) {
+                if (position.vestingEnd == 0) {
+                    (position.cliffEnd, position.vestingEnd) = _unlockTimes(position, stakingStart);
+                }
+                info.cliffEnd = position.cliffEnd;
+                info.vestingEnd = position.vestingEnd;
+                info.claimableVesting = _vestingSchedule(position);
+            }
+        }
+    }
+
+    // Nonce of the account's next signed stake intent
+    function stakeNonces(address _account) external view returns (uint256) {
+        return _stakes[_account].stakeNonce;
+    }
+
+    function positionsCount(address _account) public view returns (uint256) {
+        return _stakes[_account].positionsCount;
+    }
+
     function getTVLAmount() public view returns (uint256) {
         return totalValueLocked;
     }
@@ -290,39 +978,79 @@ contract VestingStaking is Ownable{
         return Token(tokenAddress).totalSupply();
     }
 
+    // Totals of the account's positions and its reward, start and strategy are of its first position
+    function stakes(address _account) public view returns (uint256, uint256, uint256, uint256, uint256, uint256) {
+        StakeInfo memory stakeholder = _stakes[_account];
+        Position memory first = _positions[_account][0];
+        return (
+            stakeholder.tokensStaked,
+            _vestingWithdrawed(_account),
+            first.startingTimestamp,
+            first.vestingStrategyNumber,
+            stakeholder.rewardPerTokenPaid,
+            stakeholder.reward
+        );
+    }
+
+    // Cliff end and vesting end timestamps of the account's first position, 0 until they are fixed
+    function unlockTimes(address _account) public view returns (uint256, uint256) {
+        Position memory first = _positions[_account][0];
+        return (first.cliffEnd, first.vestingEnd);
+    }
+
+    function isStakeholder(address _account) public view returns (bool) {
+        return _stakes[_account].positionsCount != 0;
+    }
+
+    function isMerkleEntryActivated(uint256 _index) public view returns (bool) {
+        return _activatedMerkleEntries.get(_index);
+    }
+
+    function vestingStrategies(uint256 _strategyNumber) public view returns (uint256, uint256, VestingStrategies) {
+        VestingInfo memory strategy = _vestingStrategies[_strategyNumber];
+        return (strategy.cliffTime, strategy.vestingTime, strategy.vestingStrategy);
+    }
+
     function getStackedTokens(address _account) public view returns (uint256) {
-        return stakes[_account].tokensStaked;
+        return _stakes[_account].tokensStaked;
     }
 
     function getWithdrawedVestingTokens(address _account) public view returns (uint256) {
-        return stakes[_account].vestingWithdrawed;
+        return _vestingWithdrawed(_account);
     }
 
     function getsStartingTimestampOfStacking(address _account) public view returns (uint256) {
-        return stakes[_account].startingTimestamp;
+        return _positions[_account][0].startingTimestamp;
     }
 
     function getVestingStrategyNumber(address _account) public view returns (uint256) {
-        return stakes[_account].vestingStrategyNumber;
+        return _positions[_account][0].vestingStrategyNumber;
     }
 
     function getAllUserInfo(address _account) public view returns (uint256, uint256, uint256, uint256) {
-        uint256 stakecount = getStackedTokens(_account);
-        uint256 withdraw = getWithdrawedVestingTokens(_account);
-        uint256 starttime = getsStartingTimestampOfStacking(_account);
-        uint256 strategy = getVestingStrategyNumber(_account);
-        return (stakecount, withdraw, starttime, strategy);
+        (uint256 tokensStaked, uint256 vestingWithdrawed, uint256 start, uint256 strategyNumber, , ) = stakes(_account);
+        return (tokensStaked, vestingWithdrawed, start, strategyNumber);
     }
 
     function getStrategyCliffTime(uint256 _strategyNumber) public view returns (uint256) {
-        return vestingStrategies[_strategyNumber].cliffTime;
+        return _vestingStrategies[_strategyNumber].cliffTime;
     }
 
     function getStrategyVestingTime(uint256 _strategyNumber) public view returns (uint256) {
-        return vestingStrategies[_strategyNumber].vestingTime;
+        return _vestingStrategies[_strategyNumber].vestingTime;
     }
 
     function getStrategyType(uint256 _strategyNumber) public view returns (VestingStrategies) {
-        return vestingStrategies[_strategyNumber].vestingStrategy;
+        return _vestingStrategies[_strategyNumber].vestingStrategy;
+    }
+
+    function getStrategyCheckpoints(uint256 _strategyNumber) public view returns (uint256[] memory offsets, uint256[] memory shares) {
+        Checkpoint[] storage checkpoints = _checkpoints[_strategyNumber];
+        offsets = new uint256[](checkpoints.length);
+        shares = new uint256[](checkpoints.length);
+        for (uint256 i=0; i<checkpoints.length; i++) {
+            offsets[i] = checkpoints[i].offset;
+            shares[i] = checkpoints[i].share;
+        }
     }
 }
\ No newline at end of file
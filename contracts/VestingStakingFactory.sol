@@ -0,0 +1,64 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/proxy/Clones.sol";
+import "./VestingStaking.sol";
+
+// Deploys vesting programs (e.g. one per token sale round) as EIP-1167 minimal-proxy clones of one VestingStaking
+contract VestingStakingFactory is Ownable {
+    // Initialized at deployment, only its code is used by the clones
+    address public immutable implementation;
+
+    // Registry of all created programs, in creation order
+    address[] internal _programs;
+    mapping (address => bool) public isProgram;
+
+    event ProgramCreated(uint256 indexed index, address indexed program, address indexed token, address owner);
+
+    constructor(address _implementation) {
+        implementation = _implementation;
+    }
+
+    // Creating a program with its own token, owner and strategies, the owner goes on with allocations and start()
+    function createProgram(
+        address _tokenAddress,
+        address _owner,
+        uint256[] calldata _cliffTimesInDays,
+        uint256[] calldata _vestingTimesInDays,
+        VestingStaking.VestingStrategies[] calldata _vestingStrategyTypes
+    ) external onlyOwner() returns (address program) {
+        require(_tokenAddress != address(0) && _owner != address(0));
+        program = Clones.clone(implementation);
+        VestingStaking(program).initialize(_tokenAddress, _owner, _cliffTimesInDays, _vestingTimesInDays, _vestingStrategyTypes);
+
+        _programs.push(program);
+        isProgram[program] = true;
+        emit ProgramCreated(_programs.length - 1, program, _tokenAddress, _owner);
+    }
+
+    //-------------------------------------------------------------------------
+    // VIEW FUNCTIONS
+    //-------------------------------------------------------------------------
+
+    function programsCount() external view returns (uint256) {
+        return _programs.length;
+    }
+
+    function programAt(uint256 _index) external view returns (address) {
+        return _programs[_index];
+    }
+
+    // Up to _limit programs starting with _offset, fewer at the end of the registry
+    function getPrograms(uint256 _offset, uint256 _limit) external view returns (address[] memory programs) {
+        uint256 count = _offset < _programs.length ? _programs.length - _offset : 0;
+        if (count > _limit) {
+            count = _limit;
+        }
+        programs = new address[](count);
+        for (uint256 i=0; i<programs.length; i++) {
+            programs[i] = _programs[_offset + i];
+        }
+    }
+}
@@ -0,0 +1,398 @@
+#!/usr/bin/python3
+
+"""
+asyncio client of VestingStaking and Token for services which read many positions at once.
+
+Brownie's contract objects send one blocking request at a time. This client keeps a pool of HTTP
+(keep-alive) or WebSocket connections, bounds the requests in flight and packs concurrent requests
+into JSON-RPC batches: calls issued within BATCH_DELAY of each other (or BATCH_SIZE of them) go to
+the node as one HTTP request. Every function of the ABI is available as a coroutine, view functions
+are read with eth_call, the others send a transaction (signed by the node for its unlocked accounts
+or locally with a private key) and wait for the receipt.
+
+ABIs are read from brownie's build/contracts artifacts, brownie itself is not needed at runtime.
+getPositions() chunks are sized like in scripts/positions.py, a chunk which fails is split in half.
+
+    async with RpcClient("http://127.0.0.1:8545") as client:
+        vesting = AsyncVestingStaking(client, address)
+        tvl, pool = await asyncio.gather(vesting.totalValueLocked(), vesting.rewardPool())
+        positions = await vesting.get_positions(accounts)
+        await vesting.stake(100, 1, sender=account, private_key=key)
+
+Usage:
+    brownie run async_client main <VestingStaking address> addresses.txt            # async sweep of all positions
+    brownie run async_client main <VestingStaking address> addresses.txt true       # and the sequential one to compare
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from pathlib import Path
+
+import aiohttp
+import websockets
+from eth_account import Account
+from eth_utils import function_abi_to_4byte_selector, to_checksum_address
+from eth_utils.abi import collapse_if_tuple
+
+try:  # eth-abi >= 4
+    from eth_abi import decode as decode_abi, encode as encode_abi
+except ImportError:
+    from eth_abi import decode_abi, encode_abi
+
+from scripts.positions import GAS_CAP, chunk_size as _chunk_size
+
+BUILD_DIR = Path(__file__).resolve().parent.parent / "build" / "contracts"
+
+CONNECTIONS = 8
+CONCURRENCY = 32  # JSON-RPC requests (batches) in flight
+BATCH_SIZE = 100
+BATCH_DELAY = 0.002
+
+RECEIPT_TIMEOUT = 120
+RECEIPT_POLL = 0.2
+
+
+class RpcError(Exception):
+    def __init__(self, error):
+        self.code = error.get("code")
+        self.data = error.get("data")
+        super().__init__(error.get("message", error))
+
+
+class TransactionFailed(Exception):
+    def __init__(self, receipt):
+        self.receipt = receipt
+        super().__init__("Transaction {} reverted".format(receipt["transactionHash"]))
+
+
+def load_abi(name, build_dir=BUILD_DIR):
+    with open(Path(build_dir) / "{}.json".format(name)) as f:
+        return json.load(f)["abi"]
+
+
+def _block(block):
+    return hex(block) if isinstance(block, int) else block
+
+
+def _batch_ids(payload):
+    return [item["id"] for item in payload] if isinstance(payload, list) else [payload["id"]]
+
+
+class _HttpTransport:
+    def __init__(self, url, connections):
+        self.url = url
+        self._connections = connections
+        self._session = None
+
+    async def open(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self._connections),
+            headers={"Content-Type": "application/json"},
+        )
+
+    async def send(self, payload):
+        async with self._session.post(self.url, data=json.dumps(payload)) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def close(self):
+        await self._session.close()
+
+
+class _WebSocketTransport:
+    """Requests are spread over the sockets, responses are matched to requests by id"""
+
+    def __init__(self, url, connections):
+        self.url = url
+        self._connections = connections
+        self._sockets = []
+        self._readers = []
+        self._waiting = {}  # request id: future of its response (one future for all ids of a batch)
+
+    async def open(self):
+        self._sockets = [await websockets.connect(self.url, max_size=None) for _ in range(self._connections)]
+        self._readers = [asyncio.ensure_future(self._read(socket)) for socket in self._sockets]
+        self._next = itertools.cycle(self._sockets)
+
+    async def send(self, payload):
+        future = asyncio.get_event_loop().create_future()
+        for id_ in _batch_ids(payload):
+            self._waiting[id_] = future
+        await next(self._next).send(json.dumps(payload))
+        return await future
+
+    async def _read(self, socket):
+        try:
+            async for message in socket:
+                response = json.loads(message)
+                future = None
+                for id_ in _batch_ids(response):  # batch responses may come in any order
+                    future = self._waiting.pop(id_, future)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except websockets.ConnectionClosed:
+            pass
+        for future in set(self._waiting.values()):
+            if not future.done():
+                future.set_exception(ConnectionError("WebSocket connection to {} closed".format(self.url)))
+
+    async def close(self):
+        for socket in self._sockets:
+            await socket.close()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+
+
+class RpcClient:
+    """JSON-RPC client with pooled connections, bounded concurrency and automatic batching"""
+
+    def __init__(self, url, connections=CONNECTIONS, concurrency=CONCURRENCY, batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY):
+        transport = _WebSocketTransport if url.startswith(("ws://", "wss://")) else _HttpTransport
+        self._transport = transport(url, connections)
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._ids = itertools.count(1)
+        self._pending = []  # (request, future) waiting for the next batch
+        self._flush_handle = None
+        self._sending = set()
+        self._semaphore = None
+        self._nonce_lock = None
+        self._nonces = {}
+        self.requests = 0
+        self.batches = 0
+
+    async def open(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._nonce_lock = asyncio.Lock()
+        await self._transport.open()
+        return self
+
+    async def close(self):
+        self._flush()
+        await asyncio.gather(*self._sending, return_exceptions=True)
+        await self._transport.close()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def request(self, method, params=()):
+        future = asyncio.get_event_loop().create_future()
+        request = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)}
+        self._pending.append((request, future))
+        self.requests += 1
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_later(self.batch_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch):
+        async with self._semaphore:
+            self.batches += 1
+            try:
+                responses = await self._transport.send([request for request, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+
+        if isinstance(responses, dict):  # the whole batch was rejected
+            responses = [dict(responses, id=request["id"]) for request, _ in batch]
+        by_id = {response.get("id"): response for response in responses}
+        for request, future in batch:
+            response = by_id.get(request["id"])
+            if future.done():
+                continue
+            if response is None:
+                future.set_exception(RpcError({"code": -32603, "message": "No response to {}".format(request["method"])}))
+            elif "error" in response:
+                future.set_exception(RpcError(response["error"]))
+            else:
+                future.set_result(response["result"])
+
+    async def block_number(self):
+        return int(await self.request("eth_blockNumber"), 16)
+
+    async def chain_id(self):
+        return int(await self.request("eth_chainId"), 16)
+
+    async def next_nonce(self, sender):
+        """Nonces of locally signed transactions, concurrent sends of one sender don't reuse a nonce"""
+        async with self._nonce_lock:
+            if sender not in self._nonces:
+                self._nonces[sender] = int(await self.request("eth_getTransactionCount", [sender, "pending"]), 16)
+            self._nonces[sender] += 1
+            return self._nonces[sender] - 1
+
+    async def wait_for_receipt(self, txid, timeout=RECEIPT_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while True:
+            receipt = await self.request("eth_getTransactionReceipt", [txid])
+            if receipt is not None:
+                if int(receipt["status"], 16) == 0:
+                    raise TransactionFailed(receipt)
+                return receipt
+            if time.monotonic() > deadline:
+                raise TimeoutError("Transaction {} is not mined after {}s".format(txid, timeout))
+            await asyncio.sleep(RECEIPT_POLL)
+
+
+class AsyncContract:
+    """Functions of the ABI as coroutines: view functions return decoded values, the others send transactions"""
+
+    def __init__(self, client, address, abi):
+        self.client = client
+        self.address = to_checksum_address(address)
+        self.abi = abi
+        self._functions = {}
+        for item in abi:
+            if item["type"] == "function":
+                self._functions.setdefault(item["name"], []).append(item)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._functions:
+            raise AttributeError("{} is not a function of {}".format(name, type(self).__name__))
+        if self._functions[name][0]["stateMutability"] in ("view", "pure"):
+            return lambda *args, block="latest": self.call(name, *args, block=block)
+        return lambda *args, **tx: self.transact(name, *args, **tx)
+
+    def _function(self, name, args):
+        for item in self._functions.get(name, ()):
+            if len(item["inputs"]) == len(args):
+                return item
+        raise ValueError("{} has no function {} with {} arguments".format(type(self).__name__, name, len(args)))
+
+    def encode(self, name, args):
+        item = self._function(name, args)
+        types = [collapse_if_tuple(arg) for arg in item["inputs"]]
+        return "0x" + (function_abi_to_4byte_selector(item) + encode_abi(types, list(args))).hex()
+
+    async def call(self, name, *args, block="latest", gas=None):
+        item = self._function(name, args)
+        tx = {"to": self.address, "data": self.encode(name, args)}
+        if gas is not None:
+            tx["gas"] = hex(gas)
+        result = await self.client.request("eth_call", [tx, _block(block)])
+        values = decode_abi([collapse_if_tuple(arg) for arg in item["outputs"]], bytes.fromhex(result[2:]))
+        return values[0] if len(values) == 1 else tuple(values)
+
+    async def transact(self, name, *args, sender, private_key=None, gas=None, value=0, wait=True):
+        """Sends name(*args) from sender, signed with private_key or by the node, returns the receipt (the hash without wait)"""
+        sender = to_checksum_address(sender)
+        tx = {"from": sender, "to": self.address, "data": self.encode(name, args), "value": hex(value)}
+        if gas is None:
+            gas = int(await self.client.request("eth_estimateGas", [tx]), 16)  # reverting calls fail here
+
+        if private_key is None:
+            txid = await self.client.request("eth_sendTransaction", [dict(tx, gas=hex(gas))])
+        else:
+            gas_price, chain_id, nonce = await asyncio.gather(
+                self.client.request("eth_gasPrice"), self.client.chain_id(), self.client.next_nonce(sender)
+            )
+            signed = Account.sign_transaction({
+                "to": self.address, "data": tx["data"], "value": value, "gas": gas,
+                "gasPrice": int(gas_price, 16), "nonce": nonce, "chainId": chain_id,
+            }, private_key)
+            raw = getattr(signed, "raw_transaction", None) or signed.rawTransaction  # renamed in eth-account 0.13
+            txid = await self.client.request("eth_sendRawTransaction", ["0x" + bytes(raw).hex()])
+
+        if not wait:
+            return txid
+        return await self.client.wait_for_receipt(txid)
+
+
+class AsyncToken(AsyncContract):
+    def __init__(self, client, address, abi=None):
+        super().__init__(client, address, abi or load_abi("Token"))
+
+
+class AsyncVestingStaking(AsyncContract):
+    def __init__(self, client, address, abi=None):
+        super().__init__(client, address, abi or load_abi("VestingStaking"))
+
+    def _fields(self, name):
+        return [field["name"] for field in self._functions[name][0]["outputs"][0]["components"]]
+
+    async def _read_chunk(self, accounts, block, gas):
+        try:
+            return list(await self.call("getPositions", accounts, block=block, gas=gas))
+        except RpcError:  # out of gas or response too large
+            if len(accounts) == 1:
+                raise
+            middle = len(accounts) // 2
+            first, second = await asyncio.gather(
+                self._read_chunk(accounts[:middle], block, gas), self._read_chunk(accounts[middle:], block, gas)
+            )
+            return first + second
+
+    async def get_positions(self, accounts, block=None, chunk_size=None, gas_cap=GAS_CAP):
+        """Returns {account: {field: value}} of getPositions(), all chunks are read concurrently at the same block
+        with the gas cap, chunks fit under it even if every account has MAX_POSITIONS positions"""
+        if block is None:
+            block = await self.client.block_number()
+        if chunk_size is None:
+            chunk_size = _chunk_size(gas_cap)
+        accounts = list(accounts)
+        chunks = [accounts[i:i + chunk_size] for i in range(0, len(accounts), chunk_size)]
+        results = await asyncio.gather(*(self._read_chunk(chunk, block, gas_cap) for chunk in chunks))
+
+        fields = self._fields("getPositions")
+        return {
+            account: dict(zip(fields, position))
+            for chunk, result in zip(chunks, results) for account, position in zip(chunk, result)
+        }
+
+    async def get_account_positions(self, accounts, block=None):
+        """Returns {account: [{field: value} of every position]} of getAccountPositions() read at the same block"""
+        if block is None:
+            block = await self.client.block_number()
+        accounts = list(accounts)
+        results = await asyncio.gather(*(self.call("getAccountPositions", account, block=block) for account in accounts))
+
+        fields = self._fields("getAccountPositions")
+        return {account: [dict(zip(fields, position)) for position in result] for account, result in zip(accounts, results)}
+
+
+async def sweep(url, address, accounts):
+    async with RpcClient(url) as client:
+        vesting = AsyncVestingStaking(client, address)
+        positions = await vesting.get_account_positions(accounts)
+        return positions, client.requests, client.batches
+
+
+def main(address, addresses_file, compare=False):
+    from brownie import VestingStaking, web3
+
+    with open(addresses_file) as f:
+        accounts = [line.strip() for line in f if line.strip()]
+
+    started = time.perf_counter()
+    positions, requests, batches = asyncio.run(sweep(web3.provider.endpoint_uri, address, accounts))
+    elapsed = time.perf_counter() - started
+    print("{} accounts, {} positions: {} eth_calls in {} batches, {:.2f}s".format(
+        len(accounts), sum(len(items) for items in positions.values()), requests, batches, elapsed
+    ))
+
+    if compare in (True, "true", "True", "1"):
+        vesting = VestingStaking.at(address)
+        started = time.perf_counter()
+        for account in accounts:
+            vesting.getAccountPositions(account)
+        print("sequential brownie calls: {:.2f}s".format(time.perf_counter() - started))
+    return positions
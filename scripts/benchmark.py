@@ -0,0 +1,232 @@
+#!/usr/bin/python3
+
+"""
+Gas benchmark for every VestingStaking entry point, scaled by stakeholder count.
+
+Usage:
+    brownie run benchmark                                   # all scales, writes reports/gas-benchmark.json
+    brownie run benchmark main "10,100"                     # selected scales
+    brownie run benchmark main "10,100" out.json base.json  # also prints a diff against a previous baseline
+    brownie run benchmark main "10,100" escrow.json base.json true  # escrow mode
+"""
+
+import json
+import statistics
+from pathlib import Path
+
+from brownie import VestingStaking, Token, accounts, chain, web3
+from brownie.convert import to_address
+
+from scripts.onboarding import batch_size, GAS_PER_ALLOCATION, GAS_PER_WHITELIST
+from scripts.relayer import deploy_relay, sign_intent, submit
+
+SCALES = (10, 100, 1_000, 10_000)
+DEFAULT_OUTPUT = "reports/gas-benchmark.json"
+
+# initAllocations / addToWhitelist accept less than 10 accounts per transaction
+BATCH_SIZE = 9
+
+# Number of real (signing) accounts used to measure per-user entry points
+SAMPLES = 5
+
+# Accounts per claimFor() transaction
+CLAIM_FOR_SIZE = 100
+
+LINEAR = 0
+STEPPED = 1
+FULL_SHARE = 10**18
+PIECEWISE_CHECKPOINTS = 30  # daily tranches, vestingWithdraw of the stakers searches through them
+CLIFF_TIME_IN_DAYS = 1
+VESTING_TIME_IN_DAYS = 30
+REWARD_PER_HOUR = 10_000_000  # large enough for non-zero rewards with 10k stakeholders after an hour
+REWARD_POOL = 1_000_000_000_000
+STAKE = 1_000
+
+
+def _synthetic_addresses(count, offset):
+    # Stakeholders which never sign anything, only the allocation/whitelist write matters for them
+    return [to_address("0x{:040x}".format(offset + i)) for i in range(count)]
+
+
+def _signers(count, seed):
+    signers = []
+    for i in range(count):
+        signer = accounts.add("0x{:064x}".format(seed + i))
+        accounts[0].transfer(signer, "1 ether")
+        signers.append(signer)
+    return signers
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _summary(gas):
+    return {
+        "samples": len(gas),
+        "min": min(gas),
+        "median": int(statistics.median(gas)),
+        "max": max(gas),
+    }
+
+
+def bulk_sizes():
+    """Accounts per transaction of the *Bulk variants, the largest batches which fit into a block of the chain"""
+    gas_limit = web3.eth.get_block("latest").gasLimit
+    return {
+        "initAllocationsBulk": batch_size(GAS_PER_ALLOCATION, gas_limit),
+        "addToWhitelistBulk": batch_size(GAS_PER_WHITELIST, gas_limit),
+    }
+
+
+def run_scale(stakeholders, escrow=False):
+    owner = accounts[0]
+    gas = {}
+
+    def record(name, tx):
+        gas.setdefault(name, []).append(tx.gas_used)
+
+    token = Token.deploy({'from': owner})
+    vesting = VestingStaking.deploy(token, {'from': owner})
+    token.approve(vesting, token.balanceOf(owner), {'from': owner})
+
+    record("createWestingStrategy", vesting.createWestingStrategy(CLIFF_TIME_IN_DAYS, VESTING_TIME_IN_DAYS, LINEAR, {'from': owner}))
+    record("createWestingStrategy", vesting.createWestingStrategy(CLIFF_TIME_IN_DAYS, VESTING_TIME_IN_DAYS, STEPPED, {'from': owner}))
+    record("createWestingStrategies", vesting.createWestingStrategies(
+        [CLIFF_TIME_IN_DAYS] * BATCH_SIZE, [VESTING_TIME_IN_DAYS] * BATCH_SIZE, [LINEAR, STEPPED] * (BATCH_SIZE // 2) + [LINEAR], {'from': owner}
+    ))
+    tx = vesting.createPiecewiseStrategy(
+        [(i + 1) * 24 * 3600 for i in range(PIECEWISE_CHECKPOINTS)],
+        [FULL_SHARE * (i + 1) // PIECEWISE_CHECKPOINTS for i in range(PIECEWISE_CHECKPOINTS)],
+        {'from': owner}
+    )
+    record("createPiecewiseStrategy", tx)
+    piecewise = tx.events["StrategyCreated"]["strategyNumber"]
+
+    # The first accounts go through the capped entry points, the rest through the bulk ones
+    capped = BATCH_SIZE * SAMPLES
+    bulk = bulk_sizes()
+
+    holders = _signers(min(SAMPLES, stakeholders), seed=1)
+    allocated = [h.address for h in holders] + _synthetic_addresses(stakeholders - len(holders), offset=0x10000)
+    for name, size, batches in (
+        ("initAllocations", BATCH_SIZE, _chunks(allocated[:capped], BATCH_SIZE)),
+        ("initAllocationsBulk", bulk["initAllocationsBulk"], _chunks(allocated[capped:], bulk["initAllocationsBulk"])),
+    ):
+        for batch in batches:
+            tx = getattr(vesting, name)(batch, [STAKE] * len(batch), [1 + i % 2 for i in range(len(batch))], {'from': owner})
+            if len(batch) == size:
+                record(name, tx)
+
+    for holder in holders:
+        record("editAmountPerWallet", vesting.editAmountPerWallet(holder, STAKE * 2, {'from': owner}))
+    record("editAmountsPerWallet", vesting.editAmountsPerWallet(holders, [STAKE * 2] * len(holders), {'from': owner}))
+
+    # stake stays on strategy 1 like in earlier baselines, first positions on the piecewise strategy are measured apart
+    stakers = _signers(min(SAMPLES, stakeholders), seed=0x1000)
+    piecewise_stakers = _signers(min(SAMPLES, stakeholders), seed=0x2000)
+    signing = [s.address for s in stakers + piecewise_stakers]
+    whitelisted = signing + _synthetic_addresses(stakeholders - len(signing), offset=0x20000)
+    for name, size, batches in (
+        ("addToWhitelist", BATCH_SIZE, _chunks(whitelisted[:capped], BATCH_SIZE)),
+        ("addToWhitelistBulk", bulk["addToWhitelistBulk"], _chunks(whitelisted[capped:], bulk["addToWhitelistBulk"])),
+    ):
+        for batch in batches:
+            tx = getattr(vesting, name)(batch, {'from': owner})
+            if len(batch) == size:
+                record(name, tx)
+
+    record("start", vesting.start(REWARD_PER_HOUR, REWARD_POOL, {'from': owner}))
+
+    if escrow:
+        deposit = vesting.rewardPool() + vesting.totalValueLocked() + STAKE * (3 * len(stakers) + len(piecewise_stakers)) + REWARD_POOL // 100 * SAMPLES
+        record("enableEscrow", vesting.enableEscrow(deposit, {'from': owner}))
+
+    for staker in stakers:
+        record("stake", vesting.stake(STAKE, 1, {'from': staker}))
+    for staker in piecewise_stakers:
+        record("stake_piecewise", vesting.stake(STAKE, piecewise, {'from': staker}))
+    for staker in stakers:
+        record("stakeAnotherPosition", vesting.stake(STAKE, piecewise, {'from': staker}))
+
+    # The stakers' third positions signed off-chain and submitted by the owner in one transaction
+    relay = deploy_relay(vesting, owner)
+    intents = [sign_intent(relay, staker.private_key, STAKE, piecewise) for staker in stakers]
+    tx = submit(relay, intents, owner)[0]
+    record("stakeFor", tx)
+    gas.setdefault("stakeForPerAccount", []).append(tx.gas_used // len(intents))
+
+    chain.sleep(3600)
+    for holder in holders:
+        record("getReward", vesting.getReward({'from': holder}))
+
+    chain.sleep((CLIFF_TIME_IN_DAYS + 1) * 24 * 3600)
+    for holder in holders:
+        record("vestingWithdraw", vesting.vestingWithdraw({'from': holder}))
+
+    chain.sleep(24 * 3600)
+    for holder in holders:
+        record("claimAll", vesting.claimAll({'from': holder}))
+    for staker in piecewise_stakers:
+        record("vestingWithdrawPiecewise", vesting.vestingWithdraw({'from': staker}))
+
+    # Accounts which never signed anything, settled by the owner
+    for batch in _chunks(allocated[len(holders):len(holders) + CLAIM_FOR_SIZE * SAMPLES], CLAIM_FOR_SIZE):
+        tx = vesting.claimFor(batch, {'from': owner})
+        if len(batch) == CLAIM_FOR_SIZE:
+            record("claimFor", tx)
+            gas.setdefault("claimForPerAccount", []).append(tx.gas_used // len(batch))
+
+    for _ in range(SAMPLES):
+        record("addAditionalReward", vesting.addAditionalReward(REWARD_POOL // 100, {'from': owner}))
+
+    return {name: _summary(values) for name, values in gas.items()}
+
+
+def diff(previous, current):
+    """Returns report lines comparing median gas of two benchmark results"""
+    lines = ["{:<8} {:<24} {:>10} {:>10} {:>10} {:>8}".format("scale", "function", "baseline", "current", "delta", "%")]
+    for scale, functions in current["results"].items():
+        for name, stats in functions.items():
+            old = previous["results"].get(scale, {}).get(name)
+            new = stats["median"]
+            if old is None:
+                lines.append("{:<8} {:<24} {:>10} {:>10} {:>10} {:>8}".format(scale, name, "-", new, "-", "-"))
+                continue
+            delta = new - old["median"]
+            percent = 100 * delta / old["median"]
+            lines.append("{:<8} {:<24} {:>10} {:>10} {:>+10} {:>+7.1f}%".format(scale, name, old["median"], new, delta, percent))
+    return lines
+
+
+def main(scales=None, output=DEFAULT_OUTPUT, baseline=None, escrow=False):
+    if scales is None:
+        scales = SCALES
+    else:
+        scales = [int(s) for s in str(scales).split(",")]
+    escrow = str(escrow).lower() in ("1", "true", "yes")
+
+    result = {
+        "batchSize": BATCH_SIZE,
+        "bulkSizes": bulk_sizes(),
+        "escrow": escrow,
+        "samples": SAMPLES,
+        "results": {},
+    }
+    for stakeholders in scales:
+        print("Benchmarking {} stakeholders...".format(stakeholders))
+        chain.snapshot()
+        result["results"][str(stakeholders)] = run_scale(stakeholders, escrow)
+        chain.revert()
+
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2, sort_keys=True))
+    print("Gas baseline written to {}".format(path))
+
+    if baseline is not None:
+        previous = json.loads(Path(baseline).read_text())
+        print("\n".join(diff(previous, result)))
+
+    return result
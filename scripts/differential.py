@@ -0,0 +1,283 @@
+#!/usr/bin/python3
+
+"""
+Differential testing of VestingStaking against the reference model (scripts/reference_model.py).
+
+Random operation sequences are sent both to the deployed contract and to the model, after every
+operation the outcome (success or revert) and the whole observable state must be the same.
+Users are local accounts, so they can sign the stake intents which the owner submits via StakeRelay.
+
+Usage:
+    brownie run differential                 # 1000 sequences of 30 operations
+    brownie run differential main 5000 50    # 5000 sequences of 50 operations
+"""
+
+import random
+
+from brownie import VestingStaking, Token, accounts, chain, history, web3
+from brownie.exceptions import VirtualMachineError
+
+from scripts.merkle import build
+from scripts.reference_model import VestingStakingModel, Revert, DAY, HOUR, FULL_SHARE
+from scripts.relayer import deploy_relay, sign_intent
+
+USERS = 6
+MAX_UINT256 = 2**256 - 1
+
+
+class Mismatch(AssertionError):
+    pass
+
+
+def local_users(owner, count=USERS):
+    """Local accounts with private keys, funded by the owner to pay for gas"""
+    users = [accounts.add("0x{:064x}".format(0xD1FF + i)) for i in range(count)]
+    for user in users:
+        owner.transfer(user, "10 ether")
+    return users
+
+
+def random_operation(rng, owner, users, model, trees):
+    """Returns (name, sender, args) of a random operation, some of them are expected to revert.
+    Merkle trees of setMerkleRoot() are added to trees by root, activateMerkleEntry() takes entries of the model's root"""
+    user = rng.choice(users)
+    kind = rng.choices(
+        ("sleep", "createWestingStrategy", "createWestingStrategies", "createPiecewiseStrategy", "addToWhitelist",
+         "addToWhitelistBulk", "deleteFromWhitelist", "initAllocations", "initAllocationsBulk", "editAmountPerWallet",
+         "editAmountsPerWallet", "setMerkleRoot", "activateMerkleEntry", "start", "stake", "stakeFor", "cancelStakeIntent",
+         "getReward", "vestingWithdraw", "claimAll", "claimFor", "setOperator", "addAditionalReward", "enableEscrow",
+         "depositToEscrow", "withdrawEscrowSurplus"),
+        weights=(12, 2, 1, 2, 3, 1, 1, 3, 1, 1, 1, 1, 3, 1, 5, 3, 1, 8, 8, 4, 3, 1, 1, 1, 1, 1),
+    )[0]
+    if kind == "sleep":
+        return kind, None, (rng.choice((1, 60, HOUR, DAY, 7 * DAY, 30 * DAY)) * rng.randint(1, 5),)
+    if kind == "createWestingStrategy":
+        return kind, owner, (rng.randint(0, 40), rng.randint(0, 60), rng.randint(0, 2))
+    if kind == "createWestingStrategies":
+        count = rng.randint(0, 3)
+        return kind, owner, ([rng.randint(0, 40) for _ in range(count)], [rng.randint(0, 60) for _ in range(count)], [rng.randint(0, 2) for _ in range(count)])
+    if kind == "createPiecewiseStrategy":
+        # sorted most of the time, equal offsets make steps, the last share is FULL_SHARE most of the time
+        count = rng.randint(1, 6)
+        offsets = sorted(rng.choice((0, DAY, 7 * DAY, 30 * DAY)) * rng.randint(0, 12) for _ in range(count))
+        shares = sorted(rng.randint(0, FULL_SHARE) for _ in range(count - 1)) + [FULL_SHARE]
+        if rng.random() < 0.1:
+            rng.shuffle(offsets if rng.random() < 0.5 else shares)
+        return kind, owner, (offsets, shares)
+    if kind in ("addToWhitelist", "addToWhitelistBulk"):
+        return kind, owner, (rng.sample(users, rng.randint(1, len(users))),)
+    if kind == "deleteFromWhitelist":
+        return kind, owner, (user,)
+    if kind in ("initAllocations", "initAllocationsBulk"):
+        chosen = rng.sample(users, rng.randint(1, 3 if kind == "initAllocations" else len(users)))
+        return kind, owner, (chosen, [rng.randint(1, 50_000) for _ in chosen], [rng.randint(0, 3) for _ in chosen])
+    if kind == "editAmountPerWallet":
+        return kind, owner, (user, rng.randint(0, 49_999))
+    if kind == "editAmountsPerWallet":
+        # repeated accounts, the last amount is the one which is set
+        chosen = [rng.choice(users) for _ in range(rng.randint(0, 4))]
+        return kind, owner, (chosen, [rng.randint(0, 49_999) for _ in chosen])
+    if kind == "setMerkleRoot":
+        # whitelist entries have amount 0, indexes of an earlier root are reused sometimes
+        chosen = rng.sample(users, rng.randint(1, len(users)))
+        amounts = [0 if rng.random() < 0.3 else rng.randint(1, 50_000) for _ in chosen]
+        entries = [(u.address, amount, rng.randint(1, 3) if amount else 0) for u, amount in zip(chosen, amounts)]
+        tree = build(entries, rng.randrange(4) * len(users))
+        trees[tree["root"]] = tree
+        return kind, owner, (tree["root"],)
+    if kind == "activateMerkleEntry":
+        # an entry of another account has a proof which doesn't match the sender
+        entries = trees.get("0x" + model.merkle_root.hex(), {"entries": {}})["entries"]
+        entry = entries.get(user.address.lower())
+        if entry is None or rng.random() < 0.1:
+            entry = rng.choice(list(entries.values())) if entries else {"index": 0, "amount": 0, "strategy": 0, "proof": []}
+        return kind, user, (entry["index"], entry["amount"], entry["strategy"], entry["proof"])
+    if kind == "start":
+        return kind, owner, (rng.choice((0, 1, 100, 10_000, 10**9)), rng.choice((0, 10**6, 10**12)))
+    if kind == "stake":
+        return kind, user, (rng.randint(0, 10**6), rng.randint(0, 3))
+    if kind == "stakeFor":
+        # intents are (account, amount, strategy, nonce, deadline, signer), some are expired, replayed or signed by another user
+        intents = []
+        for _ in range(rng.randint(0, 4)):
+            account = rng.choice(users)
+            nonce = max(0, model.stake_nonces.get(account.address, 0) + rng.choice((0, 0, 0, 1, -1)))
+            signer = account if rng.random() < 0.9 else rng.choice(users)
+            intents.append((account, rng.randint(0, 10**6), rng.randint(0, 3), nonce, rng.choice((0, MAX_UINT256, MAX_UINT256)), signer))
+        return kind, rng.choice((owner, owner, user)), (intents,)
+    if kind == "claimFor":
+        # duplicates and the owner (not a stakeholder) are skipped, users are operators only after setOperator
+        chosen = [rng.choice(users + [owner]) for _ in range(rng.randint(0, 5))]
+        return kind, rng.choice((owner, owner, user)), (chosen,)
+    if kind == "setOperator":
+        return kind, owner, (user, rng.random() < 0.7)
+    if kind in ("addAditionalReward", "depositToEscrow", "withdrawEscrowSurplus"):
+        return kind, owner, (rng.choice((1, 10**6, 10**12)),)
+    if kind == "enableEscrow":
+        return kind, owner, (rng.choice((0, 10**6, 10**12, 10**13)),)
+    return kind, user, ()
+
+
+def apply_to_model(model, name, sender, args, now):
+    """Accounts are brownie accounts, the model is keyed by their addresses"""
+    if name == "createWestingStrategy":
+        model.create_westing_strategy(*args)
+    elif name == "createWestingStrategies":
+        model.create_westing_strategies(*args)
+    elif name == "createPiecewiseStrategy":
+        model.create_piecewise_strategy(*args)
+    elif name == "addToWhitelist":
+        model.add_to_whitelist([a.address for a in args[0]])
+    elif name == "addToWhitelistBulk":
+        model.add_to_whitelist([a.address for a in args[0]], bulk=True)
+    elif name == "deleteFromWhitelist":
+        model.delete_from_whitelist(args[0].address)
+    elif name == "initAllocations":
+        model.init_allocations([a.address for a in args[0]], args[1], args[2], now)
+    elif name == "initAllocationsBulk":
+        model.init_allocations([a.address for a in args[0]], args[1], args[2], now, bulk=True)
+    elif name == "editAmountPerWallet":
+        model.edit_amount_per_wallet(args[0].address, args[1])
+    elif name == "editAmountsPerWallet":
+        model.edit_amounts_per_wallet([a.address for a in args[0]], args[1])
+    elif name == "setMerkleRoot":
+        model.set_merkle_root(args[0], now)
+    elif name == "activateMerkleEntry":
+        model.activate_merkle_entry(sender.address, *args, now)
+    elif name == "start":
+        model.start(*args, now)
+    elif name == "stake":
+        model.stake(sender.address, *args, now)
+    elif name == "stakeFor":
+        intents = [(a.address, amount, strategy, nonce, deadline, signer.address) for a, amount, strategy, nonce, deadline, signer in args[0]]
+        model.stake_for(sender.address, intents, now)
+    elif name == "cancelStakeIntent":
+        model.cancel_stake_intent(sender.address)
+    elif name == "getReward":
+        model.get_reward(sender.address, now)
+    elif name == "vestingWithdraw":
+        model.vesting_withdraw(sender.address, now)
+    elif name == "claimAll":
+        model.claim_all(sender.address, now)
+    elif name == "claimFor":
+        model.claim_for(sender.address, [a.address for a in args[0]], now)
+    elif name == "setOperator":
+        model.set_operator(args[0].address, args[1])
+    elif name == "addAditionalReward":
+        model.add_aditional_reward(*args)
+    elif name == "enableEscrow":
+        model.enable_escrow(*args)
+    elif name == "depositToEscrow":
+        model.deposit_to_escrow(*args)
+    elif name == "withdrawEscrowSurplus":
+        model.withdraw_escrow_surplus(*args)
+    else:
+        raise ValueError("Unknown operation {}".format(name))
+
+
+def send(vesting, relay, name, sender, args):
+    """Sends the operation to the contract, stakeFor() intents are signed and submitted via the relay"""
+    if name != "stakeFor":
+        return getattr(vesting, name)(*args, {'from': sender})
+    intents, signatures = [], []
+    for account, amount, strategy, nonce, deadline, signer in args[0]:
+        intents.append((account.address, amount, strategy, nonce, deadline))
+        signatures.append(sign_intent(relay, signer.private_key, amount, strategy, nonce, deadline)["signature"])
+    return relay.stakeFor(intents, signatures, {'from': sender})
+
+
+def compare(vesting, token, model, signers):
+    expected = {
+        "totalValueLocked": model.total_value_locked,
+        "rewardPerTokenStored": model.reward_per_token_stored,
+        "lastUpdateTime": model.last_update_time,
+        "rewardPool": model.reward_pool,
+        "status": model.status,
+        "vestingStrategiesAmount": len(model.strategies) - 1,
+        "escrowEnabled": model.escrow_enabled,
+        "escrowSurplus": model.escrow_surplus,
+        "merkleRoot": "0x" + model.merkle_root.hex(),
+        "merkleRootTimestamp": model.merkle_root_timestamp,
+    }
+    for name, value in expected.items():
+        actual = getattr(vesting, name)()
+        if actual != value:
+            raise Mismatch("{}: contract {} != model {}".format(name, actual, value))
+    if token.balanceOf(vesting) != model.balances.get(model.address, 0):
+        raise Mismatch("balanceOf(VestingStaking): contract {} != model {}".format(token.balanceOf(vesting), model.balances.get(model.address, 0)))
+    count = model.stakeholders_count()
+    if list(vesting.getStakeholders(0, count + 1)) != model.get_stakeholders(0, count + 1):
+        raise Mismatch("getStakeholders: contract {} != model {}".format(vesting.getStakeholders(0, count + 1), model.get_stakeholders(0, count + 1)))
+
+    # calls run in the context of the latest block, so claimable tokens are compared at its timestamp
+    block = web3.eth.get_block("latest")
+    for signer in signers:
+        address = signer.address
+        if vesting.stakes(address) != model.get_stakes(address):
+            raise Mismatch("stakes({}): contract {} != model {}".format(address, vesting.stakes(address), model.get_stakes(address)))
+        if vesting.unlockTimes(address) != model.unlock_times(address):
+            raise Mismatch("unlockTimes({}): contract {} != model {}".format(address, vesting.unlockTimes(address), model.unlock_times(address)))
+        positions = [tuple(position) for position in vesting.getAccountPositions(address, block_identifier=block.number)]
+        expected_positions = model.get_account_positions(address, block.timestamp)
+        if positions != expected_positions:
+            raise Mismatch("getAccountPositions({}): contract {} != model {}".format(address, positions, expected_positions))
+        if vesting.stakeNonces(address) != model.stake_nonces.get(address, 0):
+            raise Mismatch("stakeNonces({}): contract {} != model {}".format(address, vesting.stakeNonces(address), model.stake_nonces.get(address, 0)))
+        if vesting.isWhitelisted(address) != (address in model.whitelist):
+            raise Mismatch("isWhitelisted({})".format(address))
+        if vesting.isOperator(address) != (address in model.operators):
+            raise Mismatch("isOperator({})".format(address))
+        if token.balanceOf(address) != model.balances.get(address, 0):
+            raise Mismatch("balanceOf({}): contract {} != model {}".format(address, token.balanceOf(address), model.balances.get(address, 0)))
+
+
+def run_sequence(vesting, token, owner, users, operations, rng, relay=None):
+    """Users must be local accounts, a StakeRelay is deployed if none is given"""
+    if relay is None:
+        relay = deploy_relay(vesting, owner)
+    model = VestingStakingModel(owner.address, token.balanceOf(owner), vesting.address)
+    trees = {}
+    log = []
+
+    for _ in range(operations):
+        name, sender, args = random_operation(rng, owner, users, model, trees)
+        log.append((name, sender, args))
+
+        if name == "sleep":
+            chain.sleep(args[0])
+            continue
+
+        try:
+            send(vesting, relay, name, sender, args)
+            reverted = False
+        except VirtualMachineError:
+            reverted = True
+        now = history[-1].timestamp
+
+        try:
+            apply_to_model(model, name, sender, args, now)
+            model_reverted = False
+        except Revert:
+            model_reverted = True
+
+        if reverted != model_reverted:
+            raise Mismatch("{}{} reverted on {} only, operations: {}".format(name, args, "contract" if reverted else "model", log))
+        compare(vesting, token, model, [owner] + users)
+
+
+def main(sequences=1000, operations=30, seed=0):
+    rng = random.Random(int(seed))
+    owner = accounts[0]
+    users = local_users(owner)
+
+    token = Token.deploy({'from': owner})
+    vesting = VestingStaking.deploy(token, {'from': owner})
+    relay = deploy_relay(vesting, owner)
+    token.approve(vesting, MAX_UINT256, {'from': owner})
+    chain.snapshot()
+
+    for i in range(int(sequences)):
+        run_sequence(vesting, token, owner, users, int(operations), rng, relay)
+        chain.revert()
+        if (i + 1) % 100 == 0:
+            print("{} sequences match".format(i + 1))
@@ -0,0 +1,278 @@
+#!/usr/bin/python3
+
+"""
+Treasury liquidity forecast of VestingStaking: the balance the owner has to hold on every future day.
+
+The contract pays vested tokens and rewards from the owner's wallet (from the contract itself in
+escrow mode), so that wallet must keep balanceOf >= TVL + rewardPool. Every position of every account
+is read with getAccountPositions() at one block, strategies are read in bulk, every unlock curve (Linear, Stepped, Piecewise) and the rewardPerHour emission
+are evaluated as NumPy arrays over a daily time grid. Curves are summed piece by piece with
+difference arrays, so 1M positions over 3 years take a few seconds.
+
+The forecast assumes every user claims as soon as tokens unlock. Then TVL on a day is the sum
+of what is still locked, the reward pool shrinks by rewardPerHour while TVL is not 0, and the
+required balance is their sum. Amounts are float64 and unlocked amounts aren't rounded down
+like in the contract, so totals may differ from the chain by up to a token per position.
+
+Usage:
+    brownie run forecast main <VestingStaking address> addresses.txt            # reads positions
+    brownie run forecast export <VestingStaking address> addresses.txt positions.csv
+    brownie run forecast main <VestingStaking address> positions.csv 1095       # positions exported before
+    brownie run forecast benchmark 1000000 1095                                 # synthetic positions
+"""
+
+import csv
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from brownie import VestingStaking, Token, chain, web3
+
+DEFAULT_OUTPUT = "reports/forecast.json"
+
+DAY = 86400
+HOUR = 3600
+FULL_SHARE = 10**18
+
+LINEAR = 0
+STEPPED = 1
+PIECEWISE = 2
+
+# VestingStaking.PositionInfo, rows are (account,) + POSITION_FIELDS
+POSITION_FIELDS = (
+    "tokensStaked", "vestingWithdrawed", "startingTimestamp", "vestingStrategyNumber", "cliffEnd", "vestingEnd", "claimableVesting"
+)
+
+
+def strategy_curve(cliff_time, vesting_time, kind, checkpoints=None):
+    """Unlocked share of a strategy after the cliff end as (offsets, shares) checkpoints of a piecewise strategy"""
+    if kind == LINEAR:
+        return np.array([vesting_time]), np.array([1.0])
+    if kind == STEPPED:  # 50% while less than half of the vesting time has passed
+        half = vesting_time // 2
+        return np.array([0, half, half]), np.array([0.5, 0.5, 1.0])
+    return checkpoints
+
+
+def load_strategies(vesting):
+    """Returns cliff times indexed by strategy number and {number: (offsets, shares)} unlock curves"""
+    count = vesting.vestingStrategiesAmount()
+    cliff = np.zeros(count + 1, dtype=np.int64)
+    curves = {}
+    for number in range(1, count + 1):
+        cliff[number], vesting_time, kind = vesting.vestingStrategies(number)
+        checkpoints = None
+        if kind == PIECEWISE:
+            offsets, shares = vesting.getStrategyCheckpoints(number)
+            checkpoints = (np.array(offsets, dtype=np.int64), np.array(shares, dtype=np.float64) / FULL_SHARE)
+        curves[number] = strategy_curve(cliff[number], vesting_time, kind, checkpoints)
+    return cliff, curves
+
+
+def read_account_positions(vesting, accounts, block=None):
+    """Every position of the accounts at the same block (latest by default), one {"account", field: value} row each"""
+    if block is None:
+        block = web3.eth.block_number
+    rows = []
+    for account in accounts:
+        for position in vesting.getAccountPositions(account, block_identifier=block):
+            rows.append(dict(zip(POSITION_FIELDS, position), account=str(account)))
+    return rows
+
+
+def write_positions_csv(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("account",) + POSITION_FIELDS)
+        writer.writerows([row["account"]] + [row[field] for field in POSITION_FIELDS] for row in rows)
+
+
+def read_positions_csv(path):
+    """Positions written by export()"""
+    with open(path, newline="") as f:
+        return [dict({field: int(row[field]) for field in POSITION_FIELDS}, account=row["account"]) for row in csv.DictReader(f)]
+
+
+def position_arrays(positions, cliff, staking_start):
+    """Columns of the positions with their cliff end, same as VestingStaking._unlockTimes()"""
+    rows = [p for p in positions if p["startingTimestamp"] != 0]
+    staked = np.array([p["tokensStaked"] for p in rows], dtype=np.float64)
+    withdrawed = np.array([p["vestingWithdrawed"] for p in rows], dtype=np.float64)
+    start = np.array([p["startingTimestamp"] for p in rows], dtype=np.int64)
+    strategy = np.array([p["vestingStrategyNumber"] for p in rows], dtype=np.int64)
+    return {
+        "staked": staked,
+        "total": staked + withdrawed,
+        "strategy": strategy,
+        "cliffEnd": np.maximum(start, staking_start) + cliff[strategy],
+    }
+
+
+def _first_day_from(seconds, days):
+    # First day of the grid at or after the time, days + 1 if it's beyond the grid
+    return np.clip(-(-seconds // DAY), 0, days + 1)
+
+
+def _first_day_after(seconds, days):
+    return np.clip(seconds // DAY + 1, 0, days + 1)
+
+
+def _add_range(diff, start, end, values):
+    # values are added to the days [start, end) of the grid once diff is summed up
+    diff += np.bincount(start, values, minlength=len(diff)) - np.bincount(end, values, minlength=len(diff))
+
+
+def unlocked_by_day(positions, curves, now, days):
+    """Tokens unlocked (withdrawn ones included) of all positions together on every day of the grid.
+
+    Every unlock curve is linear between its checkpoints, so each piece of every position is added
+    to difference arrays of the slope and the base, which makes it O(positions * checkpoints + days)
+    instead of evaluating positions * days points.
+    """
+    slope = np.zeros(days + 2)
+    base = np.zeros(days + 2)
+    for number, (offsets, shares) in curves.items():
+        rows = positions["strategy"] == number
+        if not rows.any():
+            continue
+        total = positions["total"][rows]
+        cliff_end = positions["cliffEnd"][rows] - now  # seconds from the 1st day of the grid
+        vesting_started = _first_day_after(cliff_end, days)
+
+        # Interpolation from the previous checkpoint as in VestingStaking._unlockedShare(), steps have no pieces
+        previous_offset, previous_share = 0, 0.0
+        for offset, share in zip(offsets, shares):
+            if offset > previous_offset:
+                rate = (share - previous_share) / (offset - previous_offset)
+                start = np.maximum(vesting_started, _first_day_from(cliff_end + previous_offset, days))
+                end = np.maximum(start, _first_day_from(cliff_end + offset, days))
+                _add_range(slope, start, end, total * rate)
+                _add_range(base, start, end, total * (previous_share - rate * (cliff_end + previous_offset)))
+            previous_offset, previous_share = offset, share
+        start = np.maximum(vesting_started, _first_day_from(cliff_end + previous_offset, days))
+        _add_range(base, start, np.full_like(start, days + 1), total)
+
+    grid = np.arange(days + 1) * DAY
+    return np.cumsum(base)[:-1] + np.cumsum(slope)[:-1] * grid
+
+
+def reward_pool_by_day(tvl, times, reward_pool, reward_per_hour, last_update_time):
+    """Reward pool at every time, rewards accrue only while TVL is not 0 (daily resolution)"""
+    intervals = np.diff(times, prepend=last_update_time)
+    accruing = np.concatenate(([tvl[0] > 0], tvl[:-1] > 0))
+    emitted = np.cumsum(reward_per_hour * intervals * accruing / HOUR)
+    return np.maximum(reward_pool - emitted, 0.0)
+
+
+def forecast(positions, curves, reward_pool, reward_per_hour, last_update_time, now, days):
+    # Nobody can have withdrawn more than is unlocked now, so TVL is what is still locked
+    times = now + np.arange(days + 1, dtype=np.int64) * DAY
+    tvl = np.maximum(positions["total"].sum() - unlocked_by_day(positions, curves, now, days), 0.0)
+    pool = reward_pool_by_day(tvl, times, reward_pool, reward_per_hour, last_update_time)
+    required = tvl + pool
+
+    depleted = np.flatnonzero(pool == 0)
+    return {
+        "times": times,
+        "totalValueLocked": tvl,
+        "rewardPool": pool,
+        "requiredBalance": required,
+        "dailyOutflow": np.concatenate(([0.0], -np.diff(required))),
+        "rewardPoolDepletedDay": int(depleted[0]) if len(depleted) else None,
+        "rewardRunwayDays": reward_pool / (reward_per_hour * 24) if reward_per_hour else None,
+    }
+
+
+def _report(result, balance, holder):
+    days = {name: result[name].tolist() for name in ("times", "totalValueLocked", "rewardPool", "requiredBalance", "dailyOutflow")}
+    return {
+        "holder": holder,
+        "balance": balance,
+        "surplus": balance - float(result["requiredBalance"][0]),
+        "peakDailyOutflow": float(result["dailyOutflow"].max()),
+        "rewardPoolDepletedDay": result["rewardPoolDepletedDay"],
+        "rewardRunwayDays": result["rewardRunwayDays"],
+        "days": days,
+    }
+
+
+def _read_accounts(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def export(address, accounts_file, output):
+    rows = read_account_positions(VestingStaking.at(address), _read_accounts(accounts_file))
+    write_positions_csv(rows, output)
+    print("{} positions written to {}".format(len(rows), output))
+    return rows
+
+
+def main(address, accounts_file, days=1095, output=DEFAULT_OUTPUT):
+    started = time.perf_counter()
+    vesting = VestingStaking.at(address)
+    now = chain.time()
+
+    if accounts_file.endswith(".csv"):
+        positions = read_positions_csv(accounts_file)
+    else:
+        positions = read_account_positions(vesting, _read_accounts(accounts_file))
+    cliff, curves = load_strategies(vesting)
+    # Before start() allocations vest from now on
+    staking_start = vesting.startingTimestamp() if vesting.status() == 1 else now
+    columns = position_arrays(positions, cliff, staking_start)
+    loaded = time.perf_counter() - started
+
+    result = forecast(
+        columns, curves, vesting.rewardPool(), vesting.rewardPerHour(),
+        max(vesting.lastUpdateTime(), staking_start), now, int(days),
+    )
+    escrow = vesting.escrowEnabled()
+    holder = vesting.address if escrow else vesting.contractOwner()
+    report = _report(result, Token.at(vesting.tokenAddress()).balanceOf(holder), "contract" if escrow else "owner")
+    report["positions"] = len(columns["staked"])
+    report["loadSeconds"] = round(loaded, 1)
+    report["forecastSeconds"] = round(time.perf_counter() - started - loaded, 1)
+
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    print("Forecast of {} positions over {} days written to {}, surplus now {}, reward pool runs out on day {}".format(
+        report["positions"], days, path, report["surplus"], report["rewardPoolDepletedDay"]
+    ))
+    return report
+
+
+def benchmark(positions=1_000_000, days=1095, seed=0):
+    """Forecast of random positions on 24 strategies, nothing is read from the chain"""
+    rng = np.random.default_rng(int(seed))
+    positions, days = int(positions), int(days)
+    now = 1_700_000_000
+
+    cliff = np.concatenate(([0], rng.integers(1, 180, 24) * DAY))
+    curves = {}
+    for number in range(1, 25):
+        vesting_time = int(rng.integers(30, 540)) * DAY
+        checkpoints = (
+            np.append(np.sort(rng.integers(0, vesting_time, 12)), vesting_time),
+            np.append(np.sort(rng.random(12)), 1.0),
+        )
+        curves[number] = strategy_curve(cliff[number], vesting_time, number % 3, checkpoints)
+
+    # Allocations of the last year which haven't been withdrawn from
+    strategy = rng.integers(1, 25, positions)
+    staked = rng.integers(1_000, 50_000, positions).astype(np.float64)
+    columns = {
+        "staked": staked,
+        "total": staked,
+        "strategy": strategy,
+        "cliffEnd": now - rng.integers(0, 365 * DAY, positions) + cliff[strategy],
+    }
+
+    started = time.perf_counter()
+    result = forecast(columns, curves, 10**12, 10**7, now, now, days)
+    seconds = time.perf_counter() - started
+    print("{} positions x {} days in {:.1f}s, required balance now {:.0f}".format(positions, days, seconds, result["requiredBalance"][0]))
+    return seconds
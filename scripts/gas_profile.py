@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+
+"""
+Opcode-level gas profile of a transaction: which source lines of VestingStaking.sol (and of the
+token's inherited ERC20.sol) the gas goes to, broken down by storage access, external calls and
+memory expansion.
+
+The transaction is replayed by the node with debug_traceTransaction, every step is mapped to its
+source line with the compiler source maps (brownie's pcMap). Gas of a step is split into:
+
+    SLOAD cold / SLOAD warm / SSTORE cold / SSTORE warm   EIP-2929 access, tracked over the transaction
+    CALL                                                  call overhead without the callee's own steps,
+                                                          EXTCODESIZE/BALANCE checks included
+    memory expansion                                      growth of the memory of the current frame
+    other                                                 everything else
+
+Steps of called contracts are attributed to their own lines under the call line, so the token's
+ERC20.transferFrom (Token.sol only has a constructor) shows up below `_payOut`. Intrinsic gas
+(21000 + calldata) less the refund is reported as one frame.
+
+The output is in the collapsed stacks format ("frame;frame;frame gas" per line) read by flamegraph.pl,
+inferno and speedscope, the top lines and categories are printed.
+
+Usage:
+    brownie run gas_profile main <tx hash>                              # writes reports/gas-profile-<hash>.folded
+    brownie run gas_profile main <tx hash> profile.folded 30            # output file, top lines printed
+    flamegraph.pl --countname gas reports/gas-profile-<hash>.folded > profile.svg
+"""
+
+from collections import defaultdict
+from pathlib import Path
+
+from brownie import chain
+
+DEFAULT_OUTPUT = "reports/gas-profile-{}.folded"
+
+CALL_OPS = {"CALL", "CALLCODE", "DELEGATECALL", "STATICCALL", "CREATE", "CREATE2"}
+ACCOUNT_OPS = {"BALANCE", "EXTCODESIZE", "EXTCODEHASH", "EXTCODECOPY"}
+
+INTRINSIC = "[intrinsic gas - refund]"
+NO_SOURCE = "<no source>"
+
+
+def _memory_cost(words):
+    return 3 * words + words * words // 512
+
+
+def _word(value):
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+class SourceLines:
+    """Line numbers and text of source offsets, files are read once"""
+
+    def __init__(self):
+        self._sources = {}
+        self._labels = {}
+
+    def _text(self, path):
+        if path not in self._sources:
+            try:
+                self._sources[path] = Path(path).read_text()
+            except OSError:
+                self._sources[path] = None
+        return self._sources[path]
+
+    def text(self, label):
+        """Source text of a "File.sol:123" label returned by line()"""
+        return self._labels.get(label, "")
+
+    def line(self, source):
+        """Returns ("File.sol:123", "source text") of a trace step's source"""
+        if not source or not source.get("filename"):
+            return NO_SOURCE, ""
+        path, offset = source["filename"], source["offset"][0]
+        text = self._text(path)
+        if text is None:
+            return "{}@{}".format(Path(path).name, offset), ""
+        number = text.count("\n", 0, offset) + 1
+        label = "{}:{}".format(Path(path).name, number)
+        if label not in self._labels:
+            self._labels[label] = text.splitlines()[number - 1].strip()
+        return label, self._labels[label]
+
+
+def step_costs(trace):
+    """
+    Gas of every step without the gas of called contracts (which is attributed to their own steps)
+    and the index of the next step of the same frame, None when the frame ends with the step
+    """
+    costs = [0] * len(trace)
+    following = [None] * len(trace)
+    open_calls = []  # [index, depth, gas of the callee's steps]
+
+    for i, step in enumerate(trace):
+        while open_calls and step["depth"] <= open_calls[-1][1]:
+            index, _, callee = open_calls.pop()
+            costs[index] = trace[index]["gas"] - step["gas"] - callee
+            following[index] = i
+            if open_calls:
+                open_calls[-1][2] += costs[index] + callee
+        if i + 1 < len(trace) and trace[i + 1]["depth"] == step["depth"]:
+            following[i] = i + 1
+
+        if step["op"] in CALL_OPS and i + 1 < len(trace) and trace[i + 1]["depth"] > step["depth"]:
+            open_calls.append([i, step["depth"], 0])
+            continue
+        if step["op"] in CALL_OPS and following[i] is not None:  # no code to run, e.g. a precompile
+            costs[i] = step["gas"] - trace[i + 1]["gas"]
+        else:
+            costs[i] = step["gasCost"]
+        if open_calls:
+            open_calls[-1][2] += costs[i]
+
+    for index, _, _ in open_calls:  # the transaction ran out of gas in a callee
+        costs[index] = trace[index]["gasCost"]
+    return costs, following
+
+
+def profile(tx, lines=None):
+    """Returns {(frame, ...): gas} of a transaction, frames are call lines of the callers, the function,
+    the source line and the category"""
+    trace = tx.trace
+    costs, following = step_costs(trace)
+    lines = lines or SourceLines()
+
+    warm_slots = set()
+    stacks = defaultdict(int)
+    callers = []  # (function, line) of the call step of every frame below the current one
+    for i, step in enumerate(trace):
+        del callers[step["depth"] - trace[0]["depth"]:]
+        line, _ = lines.line(step.get("source"))
+        current = (step.get("fn") or step.get("contractName") or NO_SOURCE, line)
+        prefix = tuple(frame for caller in callers for frame in caller) + current
+        op, cost = step["op"], costs[i]
+
+        if following[i] is not None:
+            words_before, words_after = len(step["memory"]), len(trace[following[i]]["memory"])
+            expansion = min(max(0, _memory_cost(words_after) - _memory_cost(words_before)), cost)
+            if expansion:
+                stacks[prefix + ("memory expansion",)] += expansion
+                cost -= expansion
+
+        if op in ("SLOAD", "SSTORE"):
+            slot = (str(step["address"]).lower(), _word(step["stack"][-1]))
+            category = "{} {}".format(op, "warm" if slot in warm_slots else "cold")
+            warm_slots.add(slot)
+        elif op in CALL_OPS or op in ACCOUNT_OPS:
+            category = "CALL"
+        else:
+            category = "other"
+        stacks[prefix + (category,)] += cost
+
+        if op in CALL_OPS and i + 1 < len(trace) and trace[i + 1]["depth"] > step["depth"]:
+            callers.append(current)
+
+    stacks[(INTRINSIC,)] += tx.gas_used - sum(costs)
+    return dict(stacks)
+
+
+def by_line(stacks):
+    """{source line: gas} of the lines themselves, callees excluded"""
+    totals = defaultdict(int)
+    for frames, gas in stacks.items():
+        totals[frames[-2] if len(frames) > 1 else frames[0]] += gas
+    return totals
+
+
+def by_category(stacks):
+    totals = defaultdict(int)
+    for frames, gas in stacks.items():
+        totals[frames[-1]] += gas
+    return totals
+
+
+def write_folded(stacks, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as f:
+        for frames, gas in sorted(stacks.items()):
+            if gas > 0:
+                f.write("{} {}\n".format(";".join(frame.replace(";", ",") for frame in frames), gas))
+    return path
+
+
+def main(txid, output=None, top=20):
+    tx = chain.get_transaction(txid)
+    lines = SourceLines()
+    stacks = profile(tx, lines)
+    path = write_folded(stacks, output or DEFAULT_OUTPUT.format(tx.txid[:10]))
+
+    print("{} {} gas {}".format(tx.txid, tx.fn_name or "", tx.gas_used))
+    for category, gas in sorted(by_category(stacks).items(), key=lambda item: -item[1]):
+        print("  {:<20} {:>10}".format(category, gas))
+    print("Top lines:")
+    for line, gas in sorted(by_line(stacks).items(), key=lambda item: -item[1])[:int(top)]:
+        print("  {:<28} {:>10}  {}".format(line, gas, lines.text(line)))
+    print("Collapsed stacks written to {}".format(path))
+    return stacks
@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+
+"""
+Streaming, resumable indexer of VestingStaking events into a local SQLite database.
+
+Logs are fetched in block ranges, every range is written in one SQLite transaction together
+with the block cursor, so a crash never leaves half of a range behind. Hashes of indexed blocks
+are kept for the last REORG_DEPTH blocks; when the chain doesn't have them anymore the indexer
+rewinds to the last common block and indexes the new branch again.
+
+Usage:
+    brownie run indexer main <VestingStaking address> [db] [from_block] [confirmations] [follow]
+
+Dashboards query the `events` table, e.g. stakes of an account:
+    SELECT args FROM events WHERE event = 'Staked' AND account = ?
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from brownie import VestingStaking, web3
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+
+DEFAULT_DB = "reports/events.sqlite"
+BATCH_SIZE = 2_000
+REORG_DEPTH = 128
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    account TEXT,
+    args TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_account ON events (account, event);
+CREATE INDEX IF NOT EXISTS events_event ON events (event, block_number);
+CREATE TABLE IF NOT EXISTS blocks (
+    address TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (address, number)
+);
+CREATE TABLE IF NOT EXISTS cursor (
+    address TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL
+);
+"""
+
+
+def _json_value(value):
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    if isinstance(value, int) and not isinstance(value, bool) and abs(value) >= 2**53:
+        return str(value)  # not representable by JSON numbers of most dashboards
+    return value
+
+
+class Indexer:
+    def __init__(self, address, db=DEFAULT_DB, from_block=0, confirmations=0, batch_size=BATCH_SIZE, abi=None):
+        self.address = to_checksum_address(str(address))
+        self.confirmations = confirmations
+        self.batch_size = batch_size
+        self.contract = web3.eth.contract(address=self.address, abi=abi or VestingStaking.abi)
+        self.topics = {
+            event_abi_to_log_topic(item): item["name"] for item in self.contract.abi if item["type"] == "event"
+        }
+
+        if db != ":memory:":
+            Path(db).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(db)
+        self.db.executescript(SCHEMA)
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO cursor (address, block_number) VALUES (?, ?)", (self.address, int(from_block) - 1)
+            )
+
+    @property
+    def cursor(self):
+        return self.db.execute("SELECT block_number FROM cursor WHERE address = ?", (self.address,)).fetchone()[0]
+
+    def _block_hash(self, number):
+        return web3.eth.get_block(number)["hash"].hex()
+
+    def _rewind(self):
+        """Drops everything indexed after the last block which is still on the chain"""
+        stored = self.db.execute(
+            "SELECT number, hash FROM blocks WHERE address = ? ORDER BY number DESC", (self.address,)
+        ).fetchall()
+        if not stored:
+            return
+        head = web3.eth.block_number
+        ancestor = None
+        for number, block_hash in stored:
+            if number <= head and self._block_hash(number) == block_hash:
+                ancestor = number
+                break
+        if ancestor == stored[0][0]:
+            return
+
+        if ancestor is None:
+            ancestor = stored[-1][0] - 1
+        with self.db:
+            self.db.execute("DELETE FROM events WHERE address = ? AND block_number > ?", (self.address, ancestor))
+            self.db.execute("DELETE FROM blocks WHERE address = ? AND number > ?", (self.address, ancestor))
+            self.db.execute("UPDATE cursor SET block_number = ? WHERE address = ?", (ancestor, self.address))
+
+    def _decode(self, log):
+        name = self.topics.get(bytes(log["topics"][0]))
+        if name is None:
+            return None
+        args = dict(self.contract.events[name]().processLog(log)["args"])
+        return (
+            self.address,
+            log["blockNumber"],
+            log["blockHash"].hex(),
+            log["logIndex"],
+            log["transactionHash"].hex(),
+            name,
+            args.get("account"),
+            json.dumps({key: _json_value(value) for key, value in args.items()}),
+        )
+
+    def _index_range(self, from_block, to_block):
+        logs = web3.eth.get_logs({"address": self.address, "fromBlock": from_block, "toBlock": to_block})
+        rows = [row for row in map(self._decode, logs) if row is not None]
+        blocks = {(row[1], row[2]) for row in rows}
+        blocks.add((to_block, self._block_hash(to_block)))
+
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO blocks (address, number, hash) VALUES (?, ?, ?)",
+                [(self.address, number, block_hash) for number, block_hash in blocks],
+            )
+            self.db.execute(
+                "DELETE FROM blocks WHERE address = ? AND number < ?", (self.address, to_block - REORG_DEPTH)
+            )
+            self.db.execute("UPDATE cursor SET block_number = ? WHERE address = ?", (to_block, self.address))
+        return len(rows)
+
+    def sync(self):
+        """Indexes everything up to the confirmed head, returns the number of new events"""
+        self._rewind()
+        head = web3.eth.block_number - self.confirmations
+        indexed = 0
+        while self.cursor < head:
+            from_block = self.cursor + 1
+            indexed += self._index_range(from_block, min(from_block + self.batch_size - 1, head))
+        return indexed
+
+    def follow(self, poll_interval=2):
+        while True:
+            indexed = self.sync()
+            if indexed:
+                print("Indexed {} events up to block {}".format(indexed, self.cursor))
+            time.sleep(poll_interval)
+
+
+def main(address, db=DEFAULT_DB, from_block=0, confirmations=0, follow=False):
+    indexer = Indexer(address, db, int(from_block), int(confirmations))
+    if follow and str(follow).lower() not in ("0", "false"):
+        indexer.follow()
+    else:
+        print("Indexed {} events up to block {}".format(indexer.sync(), indexer.cursor))
+    return indexer
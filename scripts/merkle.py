@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+
+"""
+Merkle tree of allocations and whitelist entries for VestingStaking.setMerkleRoot().
+
+Input CSV rows are `account,amount,strategy`, whitelist entries have amount 0 and strategy 0.
+The output JSON holds the root and index, amount, strategy and proof of every account,
+which is what VestingStaking.activateMerkleEntry() expects.
+
+Usage:
+    brownie run merkle main entries.csv merkle.json
+    python scripts/merkle.py entries.csv merkle.json [first_index]
+"""
+
+import csv
+import json
+import sys
+from pathlib import Path
+
+from eth_hash.auto import keccak
+
+
+def _address_bytes(account):
+    account = str(account)
+    if len(account) != 42 or not account.startswith("0x"):
+        raise ValueError("Invalid address: {}".format(account))
+    return bytes.fromhex(account[2:])
+
+
+def leaf(index, account, amount, strategy):
+    # keccak256(abi.encodePacked(uint256 index, address account, uint256 amount, uint256 strategyNumber))
+    return keccak(
+        index.to_bytes(32, "big") + _address_bytes(account) + amount.to_bytes(32, "big") + strategy.to_bytes(32, "big")
+    )
+
+
+def _hash_pair(a, b):
+    # OpenZeppelin MerkleProof hashes sorted pairs
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+class MerkleTree:
+    def __init__(self, leaves):
+        if not leaves:
+            raise ValueError("Merkle tree needs at least one leaf")
+        self.levels = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            nodes = self.levels[-1]
+            parents = [_hash_pair(nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+            if len(nodes) % 2:
+                parents.append(nodes[-1])  # odd node is promoted to the next level as it is
+            self.levels.append(parents)
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    def proof(self, position):
+        proof = []
+        for nodes in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(nodes):
+                proof.append(nodes[sibling])
+            position //= 2
+        return proof
+
+
+def verify(proof, root, node):
+    for sibling in proof:
+        node = _hash_pair(node, sibling)
+    return node == root
+
+
+def build(entries, first_index=0):
+    """
+    Builds the tree of (account, amount, strategy) entries, accounts in the output are lowercase.
+    Indexes start with first_index, entries of a new root must not reuse indexes of the previous one.
+    """
+    entries = [(str(account).lower(), int(amount), int(strategy)) for account, amount, strategy in entries]
+    if len({account for account, _, _ in entries}) != len(entries):
+        raise ValueError("Every account can have only one entry")
+
+    indexes = range(first_index, first_index + len(entries))
+    tree = MerkleTree([leaf(index, *entry) for index, entry in zip(indexes, entries)])
+    return {
+        "root": "0x" + tree.root.hex(),
+        "entries": {
+            account: {
+                "index": index,
+                "amount": amount,
+                "strategy": strategy,
+                "proof": ["0x" + node.hex() for node in tree.proof(position)],
+            }
+            for position, (index, (account, amount, strategy)) in enumerate(zip(indexes, entries))
+        },
+    }
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return [(row[0], row[1], row[2]) for row in csv.reader(f) if row and not row[0].startswith("#")]
+
+
+def main(entries_csv, output="merkle.json", first_index=0):
+    result = build(read_csv(entries_csv), int(first_index))
+    Path(output).write_text(json.dumps(result))
+    print("Merkle root {} of {} entries written to {}".format(result["root"], len(result["entries"]), output))
+    return result
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
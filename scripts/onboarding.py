@@ -0,0 +1,324 @@
+#!/usr/bin/python3
+
+"""
+Resumable bulk onboarding of VestingStaking: strategies, whitelist, allocations, approve and start().
+
+Input CSVs (lines starting with # are skipped):
+    strategies:  cliff_days,vesting_days,type    all strategies of the contract in order, type 0 - Linear, 1 - Stepped
+    whitelist:   account
+    allocations: account,amount,strategy         same rows as scripts/merkle.py
+
+Everything is validated before the first transaction: addresses, duplicates, amounts, strategy
+numbers against the strategy list, and the owner's balance against TVL + reward pool. Whitelist
+and allocations are packed into the largest *Bulk batches which fit into the block gas limit.
+
+Transactions are sent with consecutive nonces without waiting for receipts, up to WINDOW of them
+are in flight. The checkpoint file records the nonce before a batch is sent and its hash and
+status after, so an interrupted run can be started again with the same arguments. On resume the
+pipeline waits until the owner's pending transactions are mined, confirms the recorded batches by
+their receipts and checks the rest against the chain. initAllocations adds to TVL even for existing stakeholders,
+so an allocation batch is sent again only when none of its accounts has a position.
+
+Usage:
+    brownie run onboarding main <VestingStaking address> allocations.csv whitelist.csv strategies.csv
+    brownie run onboarding main <VestingStaking address> allocations.csv "" "" 100 1000000000  # and start()
+"""
+
+import csv
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+
+from brownie import VestingStaking, Token, accounts, web3
+from eth_utils import is_address, to_checksum_address
+from web3.exceptions import TransactionNotFound
+
+from scripts.positions import get_positions
+
+DEFAULT_CHECKPOINT = "reports/onboarding.json"
+
+# Upper estimates of *Bulk gas per entry: fresh slots (an allocation takes the account's, its position's and
+# its stakeholders list entry), the event and calldata
+GAS_PER_ALLOCATION = 77_000
+GAS_PER_ALLOCATION_STARTED = GAS_PER_ALLOCATION + 22_100  # after start() the position's unlock times slot is written too
+GAS_PER_WHITELIST = 27_000
+BASE_GAS = 60_000
+BLOCK_FILL = 0.8  # share of the block gas limit one batch may take
+
+WINDOW = 16  # transactions in flight
+RECEIPT_TIMEOUT = 600
+MAX_STAKE = 50_000  # initAllocations accepts 0 < amount < MAX_STAKE
+
+STRATEGY_TYPES = (0, 1)
+
+
+def read_rows(path):
+    if not path:
+        return []
+    with open(path, newline="") as f:
+        return [
+            (number, row) for number, row in enumerate(csv.reader(f), 1)
+            if row and row[0].strip() and not row[0].startswith("#")
+        ]
+
+
+def _fingerprint(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes() if path else b"")
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def validate(strategy_rows, whitelist_rows, allocation_rows, existing_strategies):
+    """Returns (strategies, whitelist, allocations) or raises ValueError listing every invalid row"""
+    errors = []
+
+    strategies = []
+    for number, row in strategy_rows:
+        try:
+            cliff, vesting_time, kind = (int(value) for value in row[:3])
+        except ValueError:
+            errors.append("strategies:{}: expected cliff_days,vesting_days,type".format(number))
+            continue
+        if cliff < 1 or vesting_time <= 1 or kind not in STRATEGY_TYPES:
+            errors.append("strategies:{}: invalid strategy {}".format(number, row))
+        strategies.append((cliff, vesting_time, kind))
+    strategies_amount = max(len(strategies), len(existing_strategies))
+    for number, (expected, actual) in enumerate(zip(strategies, existing_strategies), 1):
+        if expected != actual:
+            errors.append("strategies:{}: strategy {} on chain is {}".format(number, number, actual))
+
+    whitelist = []
+    seen = set()
+    for number, row in whitelist_rows:
+        account = row[0].strip()
+        if not is_address(account):
+            errors.append("whitelist:{}: invalid address {}".format(number, account))
+            continue
+        account = to_checksum_address(account)
+        if account in seen:
+            errors.append("whitelist:{}: duplicate {}".format(number, account))
+        seen.add(account)
+        whitelist.append(account)
+
+    allocations = []
+    seen = set()
+    for number, row in allocation_rows:
+        account = row[0].strip()
+        if not is_address(account) or int(account, 16) == 0:
+            errors.append("allocations:{}: invalid address {}".format(number, account))
+            continue
+        account = to_checksum_address(account)
+        try:
+            amount, strategy = int(row[1]), int(row[2])
+        except (IndexError, ValueError):
+            errors.append("allocations:{}: expected account,amount,strategy".format(number))
+            continue
+        if account in seen:
+            errors.append("allocations:{}: duplicate {}".format(number, account))
+        if not 0 < amount < MAX_STAKE:
+            errors.append("allocations:{}: amount {} is out of (0, {})".format(number, amount, MAX_STAKE))
+        if not 1 <= strategy <= strategies_amount:
+            errors.append("allocations:{}: strategy {} doesn't exist".format(number, strategy))
+        seen.add(account)
+        allocations.append((account, amount, strategy))
+
+    if errors:
+        raise ValueError("{} invalid rows:\n{}".format(len(errors), "\n".join(errors)))
+    return strategies, whitelist, allocations
+
+
+def batch_size(gas_per_entry, gas_limit):
+    return max(1, (int(gas_limit * BLOCK_FILL) - BASE_GAS) // gas_per_entry)
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class Checkpoint:
+    """Progress of every batch in a JSON file, rewritten atomically on every change"""
+
+    def __init__(self, path, fingerprint):
+        self.path = Path(path)
+        if self.path.exists():
+            self.state = json.loads(self.path.read_text())
+            if self.state["fingerprint"] != fingerprint:
+                raise ValueError("{} belongs to other input files, remove it to start over".format(self.path))
+        else:
+            self.state = {"fingerprint": fingerprint, "batches": {}}
+
+    def __getitem__(self, key):
+        return self.state["batches"].get(key, {})
+
+    def get(self, name, default=None):
+        return self.state.get(name, default)
+
+    def set(self, name, value):
+        self.state[name] = value
+        self._save()
+
+    def update(self, key, **fields):
+        self.state["batches"].setdefault(key, {}).update(fields)
+        self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.state, indent=2))
+        os.replace(temporary, self.path)
+
+
+class Pipeline:
+    """Sends transactions with consecutive nonces and confirms them in order, at most WINDOW in flight"""
+
+    def __init__(self, owner, checkpoint, window=WINDOW):
+        self.owner = owner
+        self.checkpoint = checkpoint
+        self.window = window
+        self.pending = deque()
+        self.nonce = web3.eth.get_transaction_count(owner.address, "pending")
+
+    def send(self, key, contract, method, args, gas_limit):
+        while len(self.pending) >= self.window:
+            self._confirm_oldest()
+        self.checkpoint.update(key, status="sending", nonce=self.nonce)
+        tx = getattr(contract, method)(
+            *args, {'from': self.owner, 'nonce': self.nonce, 'gas_limit': gas_limit, 'required_confs': 0}, silent=True
+        )
+        self.checkpoint.update(key, status="sent", tx=tx.txid)
+        self.pending.append((key, tx.txid))
+        self.nonce += 1
+
+    def _confirm_oldest(self):
+        key, txid = self.pending.popleft()
+        receipt = web3.eth.wait_for_transaction_receipt(txid, timeout=RECEIPT_TIMEOUT)
+        if receipt.status != 1:
+            self.checkpoint.update(key, status="failed")
+            raise RuntimeError("{} reverted in {}".format(key, txid))
+        self.checkpoint.update(key, status="confirmed", block=receipt.blockNumber)
+
+    def flush(self):
+        while self.pending:
+            self._confirm_oldest()
+
+
+def wait_for_pending(owner, timeout=RECEIPT_TIMEOUT):
+    """Transactions of a previous run may still be in the mempool, the chain state is final only after them"""
+    deadline = time.time() + timeout
+    while web3.eth.get_transaction_count(owner.address, "pending") != web3.eth.get_transaction_count(owner.address):
+        if time.time() > deadline:
+            raise RuntimeError("Transactions of {} are still pending".format(owner.address))
+        time.sleep(2)
+
+
+def _mined(checkpoint, key):
+    # True when the batch is confirmed or its recorded transaction succeeded, which is then recorded
+    batch = checkpoint[key]
+    if batch.get("status") == "confirmed":
+        return True
+    if not batch.get("tx"):
+        return False
+    try:
+        receipt = web3.eth.get_transaction_receipt(batch["tx"])
+    except TransactionNotFound:  # dropped or replaced
+        return False
+    if receipt.status != 1:
+        return False
+    checkpoint.update(key, status="confirmed", block=receipt.blockNumber)
+    return True
+
+
+def _allocation_done(batch, positions):
+    # True when the batch is on chain, None when it isn't, a conflict raises
+    allocated = [
+        positions[account]["startingTimestamp"] != 0
+        and positions[account]["tokensStaked"] + positions[account]["vestingWithdrawed"] == amount
+        and positions[account]["vestingStrategyNumber"] == strategy
+        for account, amount, strategy in batch
+    ]
+    if all(allocated):
+        return True
+    if any(positions[account]["startingTimestamp"] != 0 for account, _, _ in batch):
+        raise RuntimeError("Some accounts of batch {}...{} have other positions on chain".format(batch[0][0], batch[-1][0]))
+    return None
+
+
+def main(
+    address, allocations_csv="", whitelist_csv="", strategies_csv="", reward_per_hour="", reward_pool="",
+    checkpoint=DEFAULT_CHECKPOINT, sender="",
+):
+    vesting = VestingStaking.at(address)
+    owner = accounts.load(sender) if sender else accounts[0]
+    token = Token.at(vesting.tokenAddress())
+    starting = reward_per_hour != "" and reward_pool != ""
+
+    progress = Checkpoint(checkpoint, _fingerprint(allocations_csv, whitelist_csv, strategies_csv) + ":{}:{}".format(reward_per_hour, reward_pool))
+    wait_for_pending(owner)
+
+    existing = [tuple(vesting.vestingStrategies(n)) for n in range(1, vesting.vestingStrategiesAmount() + 1)]
+    existing = [(cliff // 86400, vesting_time // 86400, kind) for cliff, vesting_time, kind in existing]
+    strategies, whitelist, allocations = validate(
+        read_rows(strategies_csv), read_rows(whitelist_csv), read_rows(allocations_csv), existing
+    )
+
+    # Batch sizes of the first run are kept, so batches are the same on resume
+    gas_limit = web3.eth.get_block("latest").gasLimit
+    gas_per_allocation = GAS_PER_ALLOCATION_STARTED if vesting.status() == 1 else GAS_PER_ALLOCATION
+    sizes = progress.get("sizes") or {
+        "whitelist": batch_size(GAS_PER_WHITELIST, gas_limit),
+        "allocations": batch_size(gas_per_allocation, gas_limit),
+    }
+    progress.set("sizes", sizes)
+    whitelist_batches = _chunks(whitelist, sizes["whitelist"])
+    allocation_batches = _chunks(allocations, sizes["allocations"])
+
+    positions = get_positions(vesting, [account for account, _, _ in allocations])
+    allocated = {i for i, batch in enumerate(allocation_batches) if _allocation_done(batch, positions)}
+    new_stake = sum(amount for i, batch in enumerate(allocation_batches) if i not in allocated for _, amount, _ in batch)
+    pool = int(reward_pool) if starting and vesting.status() == 0 else vesting.rewardPool()
+    required = vesting.totalValueLocked() + new_stake + pool
+    if vesting.escrowEnabled():
+        if vesting.escrowSurplus() + vesting.rewardPool() < new_stake + pool:
+            raise ValueError("Escrow surplus is not enough for {} more tokens".format(new_stake + pool - vesting.rewardPool()))
+    elif token.balanceOf(vesting.contractOwner()) < required:
+        raise ValueError("Owner's balance {} is less than TVL + reward pool {}".format(token.balanceOf(vesting.contractOwner()), required))
+
+    pipeline = Pipeline(owner, progress)
+    started = time.perf_counter()
+
+    missing = strategies[len(existing):]
+    if missing:
+        cliffs, vesting_times, kinds = zip(*missing)
+        pipeline.send("strategies", vesting, "createWestingStrategies", (cliffs, vesting_times, kinds), BASE_GAS + 70_000 * len(missing))
+
+    for i, batch in enumerate(whitelist_batches):
+        key = "whitelist/{}".format(i)
+        if _mined(progress, key) or all(vesting.isWhitelisted(account) for account in batch):
+            continue  # whitelisting twice is harmless, but other batches or the owner may have whitelisted a part of this one
+        pipeline.send(key, vesting, "addToWhitelistBulk", (batch,), BASE_GAS + GAS_PER_WHITELIST * len(batch))
+
+    for i, batch in enumerate(allocation_batches):
+        key = "allocations/{}".format(i)
+        if i in allocated:
+            if progress[key].get("status") != "confirmed":
+                progress.update(key, status="confirmed")  # mined, but the previous run stopped before the receipt
+            continue
+        holders, stakes, strategy_numbers = zip(*batch)
+        pipeline.send(key, vesting, "initAllocationsBulk", (holders, stakes, strategy_numbers), min(gas_limit, BASE_GAS + gas_per_allocation * len(batch)))
+
+    if token.allowance(vesting.contractOwner(), vesting) < required and not vesting.escrowEnabled():
+        pipeline.send("approve", token, "approve", (vesting, required), 100_000)
+
+    if starting and vesting.status() == 0:
+        pipeline.send("start", vesting, "start", (int(reward_per_hour), int(reward_pool)), 200_000)
+
+    pipeline.flush()
+    print("Onboarded {} whitelisted accounts and {} allocations in {:.1f}s, progress in {}".format(
+        len(whitelist), len(allocations), time.perf_counter() - started, checkpoint
+    ))
+    return progress.state
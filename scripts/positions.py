@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+"""
+Reading full positions of many accounts with VestingStaking.getPositions() in a few eth_calls.
+
+All chunks are read at the same block with the node's eth_call gas cap. The first chunk fits under
+the cap even if every account has MAX_POSITIONS positions (about 130 accounts for a 50M cap), and
+the size doubles after every call which fits. So 10k accounts with a few positions each take about
+ten eth_calls. A chunk which runs out of gas is halved and retried, and the size stops growing.
+
+Usage:
+    brownie run positions main <VestingStaking address> addresses.txt [positions.csv]
+"""
+
+import csv
+import sys
+
+try:
+    from brownie import VestingStaking, web3
+    from brownie.exceptions import VirtualMachineError
+except ImportError:  # chunk sizing is shared with scripts/async_client.py, which runs without brownie
+    VirtualMachineError = ValueError
+
+# Default RPCGasCap of geth, ganache and hardhat allow more
+GAS_CAP = 50_000_000
+
+# Upper estimates of getPositions() gas: cold account slot and ABI encoding of an account, cold position slots,
+# strategy slot and checkpoints binary search of a piecewise strategy for each of its positions
+GAS_PER_ACCOUNT_BASE = 5_000
+GAS_PER_POSITION = 15_000
+MAX_POSITIONS = 20  # VestingStaking.MAX_POSITIONS
+GAS_PER_ACCOUNT = GAS_PER_ACCOUNT_BASE + MAX_POSITIONS * GAS_PER_POSITION  # worst case
+
+FIELDS = ("tokensStaked", "vestingWithdrawed", "startingTimestamp", "vestingStrategyNumber", "claimableVesting", "pendingReward")
+
+
+def chunk_size(gas_cap=GAS_CAP):
+    return max(1, int(gas_cap * 0.8) // GAS_PER_ACCOUNT)
+
+
+def get_positions(vesting, accounts, block=None, gas_cap=GAS_CAP):
+    """Returns {account: {field: value}} of all accounts read at the same block (latest by default)"""
+    if block is None:
+        block = web3.eth.block_number
+    accounts = list(accounts)
+    size, growing = chunk_size(gas_cap), True
+
+    positions = {}
+    start = 0
+    while start < len(accounts):
+        chunk = accounts[start:start + size]
+        try:
+            result = vesting.getPositions(chunk, {'gas': gas_cap}, block_identifier=block)
+        except (VirtualMachineError, ValueError):  # out of gas or response too large, brownie raises ValueError without revert data
+            if len(chunk) == 1:
+                raise
+            size, growing = len(chunk) // 2, False
+            continue
+        for account, position in zip(chunk, result):
+            positions[account] = dict(zip(FIELDS, position))
+        start += len(chunk)
+        if growing:
+            size *= 2
+    return positions
+
+
+def main(address, addresses_file, output=None):
+    vesting = VestingStaking.at(address)
+    with open(addresses_file) as f:
+        accounts = [line.strip() for line in f if line.strip()]
+
+    positions = get_positions(vesting, accounts)
+
+    out = open(output, "w", newline="") if output else sys.stdout
+    writer = csv.writer(out)
+    writer.writerow(("account",) + FIELDS)
+    for account, position in positions.items():
+        writer.writerow([account] + [position[field] for field in FIELDS])
+    if output:
+        out.close()
+    return positions
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+
+"""
+Vesting programs created by VestingStakingFactory: deploying the factory, new programs and the registry.
+
+Every program is a minimal-proxy clone of one VestingStaking implementation with its own token,
+owner and strategies, at a small fraction of the gas of VestingStaking.deploy().
+
+Usage:
+    brownie run programs deploy                                   # implementation and factory
+    brownie run programs create <factory> <token> [owner]         # 30/30 days linear and stepped strategies
+    brownie run programs main <factory>                           # registry as CSV
+"""
+
+import csv
+import sys
+
+from brownie import VestingStaking, VestingStakingFactory, accounts
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+PAGE_SIZE = 500
+
+FIELDS = ("index", "program", "token", "owner", "status", "vestingStrategiesAmount", "totalValueLocked", "rewardPool")
+
+
+def deploy(owner=None):
+    owner = owner or accounts[0]
+    implementation = VestingStaking.deploy(ZERO_ADDRESS, {'from': owner})  # initialized by its constructor, never used directly
+    return VestingStakingFactory.deploy(implementation, {'from': owner})
+
+
+def create_program(factory, token, owner, strategies=(), sender=None):
+    """Creates a program with (cliff_days, vesting_days, type) strategies, returns it as VestingStaking"""
+    cliffs, vesting_times, kinds = zip(*strategies) if strategies else ((), (), ())
+    tx = factory.createProgram(token, owner, cliffs, vesting_times, kinds, {'from': sender or accounts[0]})
+    return VestingStaking.at(tx.events["ProgramCreated"]["program"])
+
+
+def list_programs(factory, page_size=PAGE_SIZE):
+    """All programs of the registry in creation order"""
+    programs = []
+    count = factory.programsCount()
+    for offset in range(0, count, page_size):
+        programs += factory.getPrograms(offset, page_size)
+    return programs
+
+
+def describe(program, index):
+    vesting = VestingStaking.at(program)
+    return {
+        "index": index,
+        "program": program,
+        "token": vesting.tokenAddress(),
+        "owner": vesting.owner(),
+        "status": vesting.status(),
+        "vestingStrategiesAmount": vesting.vestingStrategiesAmount(),
+        "totalValueLocked": vesting.totalValueLocked(),
+        "rewardPool": vesting.rewardPool(),
+    }
+
+
+def create(factory, token, owner=None):
+    vesting = create_program(VestingStakingFactory.at(factory), token, owner or accounts[0], [(30, 30, 0), (30, 30, 1)])
+    print("Program {} created".format(vesting.address))
+    return vesting
+
+
+def main(factory, output=None):
+    programs = [describe(program, index) for index, program in enumerate(list_programs(VestingStakingFactory.at(factory)))]
+
+    out = open(output, "w", newline="") if output else sys.stdout
+    writer = csv.DictWriter(out, FIELDS)
+    writer.writeheader()
+    writer.writerows(programs)
+    if output:
+        out.close()
+    return programs
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+
+"""
+Block-keyed cache of VestingStaking (or any contract's) view calls for API servers and dashboards.
+
+State can't change within a block, so a view call is cached under (block number, method, args) and
+repeated reads of the same block cost no RPC calls. Memory is bounded by LRU eviction. A request
+pins "latest" to one block with `pinned()`, so all of its reads are consistent and cost a single
+eth_blockNumber; reads outside of a pin resolve "latest" themselves.
+
+Entries are keyed by block number, after a reorg the replaced blocks are dropped with invalidate().
+
+    reader = CachedReader(VestingStaking.at(address))
+    with reader.pinned():
+        tvl, pool = reader.totalValueLocked(), reader.rewardPool()
+        position = reader.stakes(account)
+    print(reader.stats())
+
+Usage:
+    brownie run read_cache main <VestingStaking address> [requests]    # dashboard-like traffic, prints counters
+"""
+
+import random
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from brownie import VestingStaking, web3
+
+MAX_ENTRIES = 100_000
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    value = getattr(value, "address", value)  # brownie accounts and contracts are passed as their addresses
+    if isinstance(value, str):
+        return value.lower()  # checksum and lowercase addresses are the same argument
+    return value
+
+
+class CachedReader:
+    def __init__(self, contract, max_entries=MAX_ENTRIES):
+        self.contract = contract
+        self.max_entries = max_entries
+        self._views = {
+            item["name"] for item in contract.abi
+            if item["type"] == "function" and item.get("stateMutability") in ("view", "pure")
+        }
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pinned = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._views:
+            raise AttributeError("{} is not a view function of {}".format(name, self.contract._name))
+        return lambda *args: self.call(name, *args)
+
+    @contextmanager
+    def pinned(self, block=None):
+        """Reads of the current thread inside the block go to one block, the latest one by default"""
+        previous = getattr(self._pinned, "block", None)
+        self._pinned.block = web3.eth.block_number if block is None else int(block)
+        try:
+            yield self._pinned.block
+        finally:
+            self._pinned.block = previous
+
+    def call(self, method, *args, block=None):
+        if method not in self._views:
+            raise ValueError("{} is not a view function of {}".format(method, self.contract._name))
+        if block is None:
+            block = getattr(self._pinned, "block", None)
+        if block is None:
+            block = web3.eth.block_number
+        key = (block, method, _hashable(args))
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = getattr(self.contract, method).call(*args, block_identifier=block)  # reverts are not cached
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, from_block=0):
+        """Drops entries of from_block and later blocks, e.g. the ones replaced by a reorg"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] >= from_block]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "hitRate": self.hits / requests if requests else 0.0,
+            }
+
+
+def main(address, requests=1000, seed=0):
+    """Dashboard traffic: every request reads the totals, a strategy and a few positions at the latest block"""
+    vesting = VestingStaking.at(address)
+    reader = CachedReader(vesting)
+    rng = random.Random(int(seed))
+    strategies = vesting.vestingStrategiesAmount()
+    accounts = ["0x{:040x}".format(i) for i in range(1, 101)]
+
+    for _ in range(int(requests)):
+        with reader.pinned():
+            tvl = reader.totalValueLocked()
+            reader.rewardPerHour()
+            reader.rewardPool()
+            if tvl != 0:  # getAPYStaked() reverts while TVL is 0
+                reader.getAPYStaked()
+            if strategies:
+                reader.vestingStrategies(rng.randint(1, strategies))
+            for account in rng.sample(accounts, 3):
+                reader.stakes(account)
+
+    stats = reader.stats()
+    print("{} requests: {} view calls sent to the node, {} served from the cache ({:.1%})".format(
+        requests, stats["misses"], stats["hits"], stats["hitRate"]
+    ))
+    return stats
@@ -0,0 +1,610 @@
+#!/usr/bin/python3
+
+"""
+Pure-Python reference model of VestingStaking.sol.
+
+All arithmetic is exact integer arithmetic with the same rounding as the contract, so results
+(rewards, vesting withdrawals, accumulators) are bit-identical to the chain. Every state
+modifying method takes the block timestamp of the transaction and raises Revert without
+changing the state when the contract would revert.
+
+The reward per token follows the packed contract, not the original one, in two cases:
+- It saturates at 2**128 - 1. The original uint256 accumulator kept growing, so the rewards of a
+  dust TVL stop growing earlier.
+- It keeps its value while TVL is 0. The original one dropped to 0, and the reward updates of
+  earlier stakers then reverted on underflow.
+
+Usage:
+    brownie run reference_model benchmark [operations] [users] [seed]
+"""
+
+import random
+import time
+from bisect import bisect_right
+
+from scripts.merkle import leaf, verify
+
+TOTAL_SUPPLY = 1_000_000_000_000_000  # Token.sol mints it to the deployer
+
+DAY = 86400
+HOUR = 3600
+
+NOT_STARTED = 0
+STARTED = 1
+
+LINEAR = 0
+STEPPED = 1
+PIECEWISE = 2
+
+FULL_SHARE = 10**18
+
+# Indexes of an account, the reward bookkeeping shared by all of its positions
+STAKED, PAID, REWARD = range(3)
+# Indexes of a position, same order as VestingStaking.getAccountPositions(), STAKED is the 1st of both
+WITHDRAWED, START, STRATEGY, CLIFF_END, VESTING_END = range(1, 6)
+
+MAX_POSITIONS = 20
+
+TARGET_OPS_PER_SECOND = 100_000  # of benchmark(), tests/test_reference_model.py fails below it
+
+
+class Revert(Exception):
+    pass
+
+
+def require(condition, message=""):
+    if not condition:
+        raise Revert(message)
+
+
+def _bytes32(value):
+    return bytes.fromhex(value[2:]) if isinstance(value, str) else bytes(value)
+
+
+class VestingStakingModel:
+    __slots__ = (
+        "owner", "balances", "status", "starting_timestamp", "total_value_locked", "reward_per_hour",
+        "reward_per_token_stored", "last_update_time", "reward_pool", "stakes", "strategies",
+        "whitelist", "merkle_root", "merkle_root_timestamp", "activated_merkle_entries", "address", "escrow_enabled",
+        "escrow_surplus", "checkpoints", "operators", "positions", "stake_nonces",
+    )
+
+    def __init__(self, owner, owner_balance=TOTAL_SUPPLY, address="VestingStaking"):
+        self.owner = owner
+        self.address = address
+        self.balances = {owner: owner_balance}
+        self.status = NOT_STARTED
+        self.starting_timestamp = 0
+        self.total_value_locked = 0
+        self.reward_per_hour = 0
+        self.reward_per_token_stored = 0
+        self.last_update_time = 0
+        self.reward_pool = 0
+        self.stakes = {}          # account => [staked, paid, reward], staked is the sum of its positions
+        self.positions = {}       # account => [[staked, withdrawed, start, strategy, cliffEnd, vestingEnd], ...]
+        self.strategies = [None]  # 1-based: (cliffTime, vestingTime, type)
+        self.checkpoints = {}     # piecewise strategy number => ([offsets], [shares])
+        self.whitelist = set()
+        self.merkle_root = bytes(32)
+        self.merkle_root_timestamp = 0
+        self.activated_merkle_entries = set()
+        self.escrow_enabled = False
+        self.escrow_surplus = 0
+        self.operators = set()
+        self.stake_nonces = {}    # account => nonce of its next signed stake intent
+
+    #-------------------------------------------------------------------------
+    # INTERNAL
+    #-------------------------------------------------------------------------
+
+    def _account(self, account):
+        record = self.stakes.get(account)
+        if record is None:
+            record = self.stakes[account] = [0, 0, 0]
+        return record
+
+    def _copy_accounts(self):
+        return {a: list(r) for a, r in self.stakes.items()}, {a: [list(p) for p in ps] for a, ps in self.positions.items()}
+
+    def _reward_per_token(self, now):
+        if self.total_value_locked == 0:
+            return self.reward_per_token_stored
+        reward_per_token = self.reward_per_token_stored + (
+            self.reward_per_hour * (now - self.last_update_time) * 10**18 // self.total_value_locked // HOUR
+        )
+        return min(reward_per_token, 2**128 - 1)  # saturates like the contract
+
+    def _earned(self, account, reward_per_token):
+        record = self.stakes.get(account)
+        if record is None:
+            return 0
+        require(reward_per_token >= record[PAID])  # checked subtraction in _earned()
+        return record[STAKED] * (reward_per_token - record[PAID]) // 10**18 + record[REWARD]
+
+    def _update_reward(self, sender, now):
+        """Returns the values written by the updateReward modifier without applying them"""
+        reward_per_token = self._reward_per_token(now)
+        earned = self._earned(sender, reward_per_token)
+        return reward_per_token, earned
+
+    def _apply_reward(self, sender, now, reward_per_token, earned):
+        self.reward_per_token_stored = reward_per_token
+        self.last_update_time = now
+        record = self._account(sender)
+        record[REWARD] = earned
+        record[PAID] = reward_per_token
+
+    def _new_position(self, account, amount, start, strategy):
+        """Position appended by VestingStaking._addPosition(), reverts without changing the state"""
+        require(len(self.positions.get(account, ())) < MAX_POSITIONS, "Too many positions")
+        require(amount < 2**96 and start < 2**32, "SafeCast")
+        require(self.stakes.get(account, [0])[STAKED] + amount < 2**96)  # checked addition to the account's total
+        position = [amount, 0, start, strategy, 0, 0]
+        if self.status == STARTED:
+            position[CLIFF_END], position[VESTING_END] = self._unlock_times(position)
+        return position
+
+    def _append_position(self, account, position):
+        self.positions.setdefault(account, []).append(position)
+        self._account(account)[STAKED] += position[STAKED]
+
+    def _current_unlock_times(self, position):
+        if position[VESTING_END] == 0:  # unlock times are not fixed yet
+            return self._unlock_times(position)
+        return position[CLIFF_END], position[VESTING_END]
+
+    def _withdraw_vesting(self, account, now, claimable=None):
+        """Moves claimable tokens of the account's positions to withdrawn, unlock times are fixed on the first withdrawal"""
+        positions = self.positions.get(account, ())
+        if claimable is None:
+            claimable = [self._claimable(position, now) for position in positions]
+        total = 0
+        for position, withdraw in zip(positions, claimable):
+            if withdraw != 0:
+                position[CLIFF_END], position[VESTING_END] = self._current_unlock_times(position)
+                position[STAKED] -= withdraw
+                position[WITHDRAWED] += withdraw
+                total += withdraw
+        return total
+
+    def _unlock_times(self, position):
+        cliff_time, vesting_time, _ = self.strategies[position[STRATEGY]]
+        cliff_end = max(position[START], self.starting_timestamp) + cliff_time
+        require(cliff_end + vesting_time < 2**32, "SafeCast")
+        return cliff_end, cliff_end + vesting_time
+
+    def _unlocked_share(self, strategy, elapsed):
+        offsets, shares = self.checkpoints[strategy]
+        low = bisect_right(offsets, elapsed)
+        if low == len(offsets):
+            return shares[-1]
+        previous_offset, previous_share = (offsets[low - 1], shares[low - 1]) if low else (0, 0)
+        return previous_share + (shares[low] - previous_share) * (elapsed - previous_offset) // (offsets[low] - previous_offset)
+
+    def _transfer(self, source, to, amount):
+        balance = self.balances.get(source, 0)
+        require(balance >= amount, "ERC20: transfer amount exceeds balance")
+        self.balances[source] = balance - amount
+        self.balances[to] = self.balances.get(to, 0) + amount
+
+    def _pay_out(self, to, amount):
+        self._transfer(self.address if self.escrow_enabled else self.owner, to, amount)
+
+    def _funds_available(self, reserved_before, reserved_after):
+        if self.escrow_enabled:
+            return self.escrow_surplus + reserved_before >= reserved_after
+        return self.balances[self.owner] >= reserved_after
+
+    def _reserve_funds(self, reserved_before, reserved_after):
+        if self.escrow_enabled:
+            self.escrow_surplus += reserved_before - reserved_after
+
+    def is_stakeholder(self, account):
+        return bool(self.positions.get(account))
+
+    #-------------------------------------------------------------------------
+    # STATE MODIFYING FUNCTIONS
+    #-------------------------------------------------------------------------
+
+    def create_westing_strategy(self, cliff_time_in_days, vesting_time_in_days, strategy_type):
+        require(cliff_time_in_days >= 1)
+        require(vesting_time_in_days > 1)
+        require(strategy_type in (LINEAR, STEPPED))
+        require(cliff_time_in_days * DAY < 2**32 and vesting_time_in_days * DAY < 2**32, "SafeCast")
+        self.strategies.append((cliff_time_in_days * DAY, vesting_time_in_days * DAY, strategy_type))
+
+    def create_westing_strategies(self, cliff_times_in_days, vesting_times_in_days, strategy_types):
+        require(len(cliff_times_in_days) == len(vesting_times_in_days) == len(strategy_types), "Arrays are not the same size")
+        strategies = self.strategies
+        self.strategies = list(strategies)
+        try:
+            for strategy in zip(cliff_times_in_days, vesting_times_in_days, strategy_types):
+                self.create_westing_strategy(*strategy)
+        except Revert:
+            self.strategies = strategies
+            raise
+
+    def create_piecewise_strategy(self, offsets, shares):
+        require(len(offsets) == len(shares) and len(offsets) != 0, "Arrays are not the same size")
+        require(shares[-1] == FULL_SHARE, "The last checkpoint must unlock everything")
+        require(offsets[-1] != 0)
+        for i in range(len(offsets)):
+            require(offsets[i] < 2**32, "SafeCast")
+            if i != 0:
+                require(offsets[i] >= offsets[i - 1] and shares[i] >= shares[i - 1], "Checkpoints are not sorted")
+        self.checkpoints[len(self.strategies)] = (list(offsets), list(shares))
+        self.strategies.append((0, offsets[-1], PIECEWISE))
+
+    def add_to_whitelist(self, accounts, bulk=False):
+        require(bulk or len(accounts) < 10, "It's allowed to add up to 10 accounts at a time")
+        self.whitelist.update(accounts)
+
+    def delete_from_whitelist(self, account):
+        require(account in self.whitelist, "This account is not in the whitelist")
+        self.whitelist.discard(account)
+
+    def init_allocations(self, accounts, stakes, strategies, now, bulk=False):
+        require(len(accounts) == len(stakes) == len(strategies), "Arrays are not the same size")
+        require(bulk or len(accounts) < 10, "It's allowed to add up to 10 accounts at a time")
+        started = self.status == STARTED
+        reward_per_token = self._reward_per_token(now) if started else 0
+
+        accounts_before = self._copy_accounts()
+        tvl = self.total_value_locked
+        try:
+            for account, amount, strategy in zip(accounts, stakes, strategies):
+                require(account != 0 and account != "0x0000000000000000000000000000000000000000")
+                require(0 < amount < 50_000)
+                require(strategy != 0 and strategy < len(self.strategies))
+                if started:  # rewards are brought up to date before the account's total changes
+                    earned = self._earned(account, reward_per_token)
+                    record = self._account(account)
+                    record[PAID], record[REWARD] = reward_per_token, earned
+                self._append_position(account, self._new_position(account, amount, now, strategy))
+                tvl += amount
+            require(self._funds_available(self.total_value_locked, tvl))
+        except Revert:
+            self.stakes, self.positions = accounts_before
+            raise
+
+        self._reserve_funds(self.total_value_locked, tvl)
+        if started:
+            self.reward_per_token_stored = reward_per_token
+            self.last_update_time = now
+        self.total_value_locked = tvl
+
+    def set_merkle_root(self, root, now):
+        self.merkle_root = _bytes32(root)
+        self.merkle_root_timestamp = now
+
+    def activate_merkle_entry(self, sender, index, amount, strategy, proof, now):
+        reward_per_token, earned = self._update_reward(sender, now)
+        require(index not in self.activated_merkle_entries, "Entry is activated already")
+        require(verify([_bytes32(node) for node in proof], self.merkle_root, leaf(index, sender, amount, strategy)), "Invalid Merkle proof")
+        if amount != 0:
+            require(amount < 50_000)
+            require(strategy != 0 and strategy < len(self.strategies), "Wrong strategy number")
+            reserved = self.reward_pool + self.total_value_locked
+            require(self._funds_available(reserved, reserved + amount), "Contract owner doesn't have that many tokens")
+            position = self._new_position(sender, amount, self.merkle_root_timestamp, strategy)
+
+        self._apply_reward(sender, now, reward_per_token, earned)
+        self.activated_merkle_entries.add(index)
+        if amount == 0:
+            self.whitelist.add(sender)
+            return
+        reserved = self.reward_pool + self.total_value_locked
+        self._reserve_funds(reserved, reserved + amount)
+        self._append_position(sender, position)
+        self.total_value_locked += amount
+
+    def start(self, reward_per_hour, reward_pool, now):
+        require(self.status == NOT_STARTED, "Vesting-staking has started already")
+        require(self._funds_available(self.reward_pool + self.total_value_locked, reward_pool + self.total_value_locked))
+        self._reserve_funds(self.reward_pool + self.total_value_locked, reward_pool + self.total_value_locked)
+        self.reward_per_hour = reward_per_hour
+        self.status = STARTED
+        self.starting_timestamp = now
+        self.last_update_time = now
+        self.reward_pool = reward_pool
+
+    def stake(self, sender, amount, strategy, now):
+        reward_per_token, earned = self._update_reward(sender, now)
+        require(self.status == STARTED, "Vesting-staking hasn't started yet")
+        require(sender in self.whitelist, "You are not in the whitelist, ask admin to add you")
+        require(strategy != 0 and strategy < len(self.strategies), "Wrong strategy number")
+        reserved = self.reward_pool + self.total_value_locked
+        require(self._funds_available(reserved, reserved + amount), "Contract owner doesn't have that many tokens")
+        position = self._new_position(sender, amount, now, strategy)
+
+        self._reserve_funds(reserved, reserved + amount)
+        self._apply_reward(sender, now, reward_per_token, earned)
+        self._append_position(sender, position)
+        self.total_value_locked += amount
+
+    def get_reward(self, sender, now):
+        reward_per_token, earned = self._update_reward(sender, now)
+        require(earned != 0)
+        require(self.reward_pool >= earned, "Not enough tokens in reward pool")
+        self._pay_out(sender, earned)  # reverts before anything is applied
+
+        self._apply_reward(sender, now, reward_per_token, earned)
+        self.reward_pool -= earned
+        self.stakes[sender][REWARD] = 0
+        return earned
+
+    def vesting_withdraw(self, sender, now):
+        reward_per_token, earned = self._update_reward(sender, now)
+        claimable = self._vesting_schedule(sender, now)
+        withdraw = sum(claimable)
+        require(withdraw != 0)
+        self._pay_out(sender, withdraw)
+
+        self._apply_reward(sender, now, reward_per_token, earned)
+        self._withdraw_vesting(sender, now, claimable)
+        self.stakes[sender][STAKED] -= withdraw
+        self.total_value_locked -= withdraw
+        return withdraw
+
+    def claim_all(self, sender, now):
+        reward_per_token, earned = self._update_reward(sender, now)
+        claimable = self._vesting_schedule(sender, now)
+        withdraw = sum(claimable)
+        require(withdraw + earned != 0)
+        require(self.reward_pool >= earned, "Not enough tokens in reward pool")
+        self._pay_out(sender, withdraw + earned)
+
+        self._apply_reward(sender, now, reward_per_token, earned)
+        self._withdraw_vesting(sender, now, claimable)
+        record = self.stakes[sender]
+        self.reward_pool -= earned
+        record[REWARD] = 0
+        record[STAKED] -= withdraw
+        self.total_value_locked -= withdraw
+        return earned, withdraw
+
+    def claim_for(self, sender, accounts, now):
+        """Returns {account: (reward, withdraw)} of the accounts which got tokens"""
+        require(sender == self.owner or sender in self.operators, "Caller is not an operator")
+        require(self.status == STARTED, "Vesting-staking hasn't started yet")
+        reward_per_token = self._reward_per_token(now)
+
+        accounts_before = self._copy_accounts()
+        balances = dict(self.balances)
+        paid = {}
+        try:
+            for account in accounts:
+                if not self.is_stakeholder(account):
+                    continue
+                earned = self._earned(account, reward_per_token)
+                withdraw = self._withdraw_vesting(account, now)
+                if earned + withdraw == 0:
+                    continue
+                record = self.stakes[account]
+                record[PAID] = reward_per_token
+                record[REWARD] = 0
+                record[STAKED] -= withdraw
+                self._pay_out(account, withdraw + earned)
+                previous = paid.get(account, (0, 0))
+                paid[account] = (previous[0] + earned, previous[1] + withdraw)
+            total_reward = sum(reward for reward, _ in paid.values())
+            require(self.reward_pool >= total_reward, "Not enough tokens in reward pool")
+        except Revert:
+            (self.stakes, self.positions), self.balances = accounts_before, balances
+            raise
+
+        self.reward_per_token_stored = reward_per_token
+        self.last_update_time = now
+        self.reward_pool -= total_reward
+        self.total_value_locked -= sum(withdraw for _, withdraw in paid.values())
+        return paid
+
+    def stake_for(self, sender, intents, now):
+        """intents are (account, amount, strategy, nonce, deadline, signer), signer is the address recovered
+        from the signature (None for a malformed one). Returns the skipped intents"""
+        require(sender == self.owner or sender in self.operators, "Caller is not an operator")
+        require(self.status == STARTED, "Vesting-staking hasn't started yet")
+        reward_per_token = self._reward_per_token(now)
+
+        accounts_before = self._copy_accounts()
+        nonces_before = dict(self.stake_nonces)
+        skipped = []
+        total = 0
+        try:
+            for intent in intents:
+                account, amount, strategy, nonce, deadline, signer = intent
+                if (now > deadline or nonce != self.stake_nonces.get(account, 0) or nonce == 2**24 - 1
+                        or len(self.positions.get(account, ())) >= MAX_POSITIONS or account not in self.whitelist
+                        or not 0 < strategy < len(self.strategies) or amount >= 2**96 or signer != account):
+                    skipped.append(intent)
+                    continue
+                earned = self._earned(account, reward_per_token)
+                record = self._account(account)
+                record[REWARD], record[PAID] = earned, reward_per_token
+                self._append_position(account, self._new_position(account, amount, now, strategy))
+                self.stake_nonces[account] = nonce + 1
+                total += amount
+            reserved = self.reward_pool + self.total_value_locked
+            require(self._funds_available(reserved, reserved + total), "Contract owner doesn't have that many tokens")
+        except Revert:
+            (self.stakes, self.positions), self.stake_nonces = accounts_before, nonces_before
+            raise
+
+        self._reserve_funds(reserved, reserved + total)
+        self.reward_per_token_stored = reward_per_token
+        self.last_update_time = now
+        self.total_value_locked += total
+        return skipped
+
+    def cancel_stake_intent(self, sender):
+        nonce = self.stake_nonces.get(sender, 0)
+        require(nonce < 2**24 - 1)
+        self.stake_nonces[sender] = nonce + 1
+
+    def set_operator(self, account, is_operator):
+        if is_operator:
+            self.operators.add(account)
+        else:
+            self.operators.discard(account)
+
+    def edit_amount_per_wallet(self, account, amount):
+        self.edit_amounts_per_wallet([account], [amount])
+
+    def edit_amounts_per_wallet(self, accounts, amounts):
+        """Amounts of the accounts' first positions"""
+        require(self.status == NOT_STARTED, "Staking is started already")
+        require(len(accounts) == len(amounts), "Arrays are not the same size")
+        tvl = self.total_value_locked
+        allocations, totals = {}, {}
+        for account, amount in zip(accounts, amounts):
+            require(self.is_stakeholder(account), "This account is not a stakeholder")
+            require(amount > 0)
+            require(amount < 2**96, "SafeCast")
+            previous = allocations.get(account, self.positions[account][0][STAKED])
+            totals[account] = totals.get(account, self.stakes[account][STAKED]) - previous + amount
+            require(totals[account] < 2**96, "SafeCast")
+            tvl = tvl - previous + amount
+            allocations[account] = amount
+        reserved = self.reward_pool + self.total_value_locked
+        require(self._funds_available(reserved, self.reward_pool + tvl), "Contract owner doesn't have that many tokens")
+
+        self._reserve_funds(reserved, self.reward_pool + tvl)
+        for account, amount in allocations.items():
+            self.positions[account][0][STAKED] = amount
+            self.stakes[account][STAKED] = totals[account]
+        self.total_value_locked = tvl
+
+    def add_aditional_reward(self, extra_reward):
+        reserved = self.reward_pool + self.total_value_locked
+        require(self._funds_available(reserved, reserved + extra_reward))
+        self._reserve_funds(reserved, reserved + extra_reward)
+        self.reward_pool += extra_reward
+
+    def enable_escrow(self, amount):
+        require(not self.escrow_enabled, "Escrow is enabled already")
+        reserved = self.reward_pool + self.total_value_locked
+        require(amount >= reserved, "Not enough tokens for TVL and reward pool")
+        self._transfer(self.owner, self.address, amount)
+        self.escrow_enabled = True
+        self.escrow_surplus = amount - reserved
+
+    def deposit_to_escrow(self, amount):
+        require(self.escrow_enabled, "Escrow is not enabled")
+        self._transfer(self.owner, self.address, amount)
+        self.escrow_surplus += amount
+
+    def withdraw_escrow_surplus(self, amount):
+        require(self.escrow_surplus >= amount, "Not enough surplus tokens in escrow")
+        self._transfer(self.address, self.owner, amount)
+        self.escrow_surplus -= amount
+
+    #-------------------------------------------------------------------------
+    # VIEW FUNCTIONS
+    #-------------------------------------------------------------------------
+
+    def _claimable(self, position, now):
+        staked = position[STAKED]
+        if staked == 0:  # withdrawn in full, the unlocked amount never goes down so the contract returns 0 too
+            return 0
+        vesting_end = position[VESTING_END]
+        if vesting_end == 0:
+            cliff_end, vesting_end = self._unlock_times(position)
+        else:
+            cliff_end = position[CLIFF_END]
+        withdrawed = position[WITHDRAWED]
+        strategy_type = self.strategies[position[STRATEGY]][2]
+        vesting_time = vesting_end - cliff_end
+
+        if now > vesting_end:
+            return staked
+        if now <= cliff_end:
+            return 0
+        if strategy_type == LINEAR:
+            withdraw = (now - cliff_end) * (staked + withdrawed) // vesting_time - withdrawed
+        elif strategy_type == PIECEWISE:
+            withdraw = (staked + withdrawed) * self._unlocked_share(position[STRATEGY], now - cliff_end) // FULL_SHARE - withdrawed
+        elif now - cliff_end < vesting_time // 2:
+            withdraw = (staked + withdrawed) // 2 - withdrawed
+        else:
+            withdraw = staked
+        require(withdraw >= 0)  # checked subtraction
+        return withdraw
+
+    def _vesting_schedule(self, account, now):
+        """Claimable tokens of each position of the account"""
+        require(self.status == STARTED, "Vesting-staking hasn't started yet")
+        require(self.is_stakeholder(account), "User is not a stakeholder")
+        return [self._claimable(position, now) for position in self.positions[account]]
+
+    def calculate_vesting_schedule(self, account, now):
+        return sum(self._vesting_schedule(account, now))
+
+    def earned(self, account, now):
+        return self._earned(account, self._reward_per_token(now))
+
+    def get_stakes(self, account):
+        record = self.stakes.get(account, [0, 0, 0])
+        positions = self.positions.get(account, [])
+        first = positions[0] if positions else [0] * 6
+        return (record[STAKED], sum(p[WITHDRAWED] for p in positions), first[START], first[STRATEGY], record[PAID], record[REWARD])
+
+    def unlock_times(self, account):
+        first = self.positions.get(account, [[0] * 6])[0]
+        return first[CLIFF_END], first[VESTING_END]
+
+    def get_account_positions(self, account, now):
+        """Same as VestingStaking.getAccountPositions(), unlock times and claimable tokens are 0 before start()"""
+        positions = []
+        for position in self.positions.get(account, ()):
+            unlock = (0, 0, 0)
+            if self.status == STARTED:
+                unlock = self._current_unlock_times(position) + (self._claimable(position, now),)
+            positions.append(tuple(position[:CLIFF_END]) + unlock)
+        return positions
+
+    def stakeholders_count(self):
+        return len(self.positions)
+
+    def get_stakeholders(self, offset, limit):
+        """Same as VestingStaking.getStakeholders(), positions keep the order of the accounts' first positions"""
+        return list(self.positions)[offset:offset + limit]
+
+    def get_apy_staked(self):
+        require(self.total_value_locked != 0)
+        return self.reward_per_hour * 24 * 365 * 100 // self.total_value_locked
+
+
+def benchmark(operations=1_000_000, users=100, seed=0):
+    """Random stake, getReward, vestingWithdraw and claimAll calls over 3 years, returns operations per second"""
+    rng = random.Random(int(seed))
+    operations, users = int(operations), int(users)
+    owner = "0x{:040x}".format(1)
+    accounts = ["0x{:040x}".format(0x1000 + i) for i in range(users)]
+
+    model = VestingStakingModel(owner)
+    model.create_westing_strategies([1, 30, 90], [30, 180, 365], [LINEAR, LINEAR, STEPPED])
+    model.create_piecewise_strategy([0, 90 * DAY, 365 * DAY], [FULL_SHARE // 10, FULL_SHARE // 2, FULL_SHARE])
+    model.add_to_whitelist(accounts, bulk=True)
+    now = 1_700_000_000
+    model.init_allocations(accounts, [rng.randrange(1_000, 50_000) for _ in accounts], [rng.randrange(1, 5) for _ in accounts], now, bulk=True)
+    model.start(10**6, 10**13, now)
+
+    # Drawn before the clock starts, so only the model is timed
+    calls = [model.stake, model.get_reward, model.vesting_withdraw, model.claim_all]
+    step = 3 * 365 * DAY // operations or 1
+    schedule = [(rng.randrange(4), rng.choice(accounts), rng.randrange(1, 50_000), rng.randrange(1, 5)) for _ in range(operations)]
+
+    started = time.perf_counter()
+    for kind, account, amount, strategy in schedule:
+        now += step
+        try:
+            if kind == 0:
+                model.stake(account, amount, strategy, now)
+            else:
+                calls[kind](account, now)
+        except Revert:
+            pass
+    seconds = time.perf_counter() - started
+    ops_per_second = operations / seconds
+    print("{} operations of {} users in {:.2f}s, {:.0f} ops/s (target {})".format(operations, users, seconds, ops_per_second, TARGET_OPS_PER_SECOND))
+    return ops_per_second
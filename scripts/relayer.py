@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+
+"""
+Signed stake intents: users sign EIP-712 StakeIntent(account, amount, strategyNumber, nonce, deadline)
+off-chain, an operator submits them in batches with StakeRelay.stakeFor(). The relay checks signatures
+and passes the batch to VestingStaking.stakeFor(), the EIP-712 domain is the relay's.
+
+Intents are JSON lines {"account", "amount", "strategyNumber", "nonce", "deadline", "signature"}.
+Nonces of an account are sequential (stakeNonces(account) is the next one), a user cancels an
+unsubmitted intent with cancelStakeIntent(). Before sending, the relayer checks every intent like
+the contract does (deadline, nonce, whitelist, strategy, signature) and drops the ones which would
+be skipped. Intents keep their order, batches are the largest which fit into the block gas limit.
+
+Usage:
+    brownie run relayer deploy <VestingStaking address> [owner account id]
+    brownie run relayer sign <StakeRelay address> <account id> <amount> <strategy> intents.jsonl [nonce]  # user side
+    brownie run relayer main <StakeRelay address> intents.jsonl [operator account id]
+"""
+
+import json
+
+from brownie import StakeRelay, VestingStaking, accounts, chain, web3
+from eth_account import Account
+from eth_utils import to_checksum_address
+
+try:  # eth-account >= 0.6
+    from eth_account.messages import encode_typed_data as _encode_typed_data
+
+    def encode_typed_data(data):
+        return _encode_typed_data(full_message=data)
+except ImportError:
+    from eth_account.messages import encode_structured_data as encode_typed_data
+
+from scripts.onboarding import batch_size, _chunks
+
+# Upper estimate of stakeFor() gas per intent of a new stakeholder: fresh position (two slots), account and stakeholders
+# list entry slots, whitelist read, ecrecover, the event and calldata (passed on once more by the relay)
+GAS_PER_INTENT = 120_000
+
+DEADLINE = 24 * 3600  # default validity of a signed intent, seconds
+
+INTENT_FIELDS = ("account", "amount", "strategyNumber", "nonce", "deadline")
+INTENT_TYPE = [
+    {"name": "account", "type": "address"},
+    {"name": "amount", "type": "uint256"},
+    {"name": "strategyNumber", "type": "uint256"},
+    {"name": "nonce", "type": "uint256"},
+    {"name": "deadline", "type": "uint256"},
+]
+DOMAIN_TYPE = [
+    {"name": "name", "type": "string"},
+    {"name": "version", "type": "string"},
+    {"name": "chainId", "type": "uint256"},
+    {"name": "verifyingContract", "type": "address"},
+]
+
+
+def deploy_relay(vesting, owner):
+    """Deploys a StakeRelay of the VestingStaking and registers it, the owner must be the VestingStaking's"""
+    relay = StakeRelay.deploy(vesting, {'from': owner})
+    vesting.setStakeRelay(relay, {'from': owner})
+    return relay
+
+
+def _vesting(relay):
+    return VestingStaking.at(relay.vestingStaking())
+
+
+def typed_data(relay, intent):
+    """EIP-712 message of an intent {field: value} for eth_signTypedData_v4 and wallets"""
+    return {
+        "types": {"EIP712Domain": DOMAIN_TYPE, "StakeIntent": INTENT_TYPE},
+        "primaryType": "StakeIntent",
+        "domain": {"name": "VestingStaking", "version": "1", "chainId": web3.eth.chain_id, "verifyingContract": relay.address},
+        "message": {field: intent[field] for field in INTENT_FIELDS},
+    }
+
+
+def sign_intent(relay, private_key, amount, strategy, nonce=None, deadline=None):
+    """Returns a signed intent {field: value, "signature": hex} of the key's account, with its next nonce by default"""
+    account = Account.from_key(private_key).address
+    intent = {
+        "account": account,
+        "amount": int(amount),
+        "strategyNumber": int(strategy),
+        "nonce": _vesting(relay).stakeNonces(account) if nonce is None else int(nonce),
+        "deadline": chain.time() + DEADLINE if deadline is None else int(deadline),
+    }
+    signed = Account.sign_message(encode_typed_data(typed_data(relay, intent)), private_key)
+    return dict(intent, signature="0x" + bytes(signed.signature).hex())
+
+
+def recover_signer(relay, intent):
+    try:
+        return Account.recover_message(encode_typed_data(typed_data(relay, intent)), signature=intent["signature"])
+    except Exception:  # malformed signature
+        return None
+
+
+def check_intents(relay, intents, now=None):
+    """Splits intents into (valid, [(intent, reason)]) with the checks of stakeFor() applied in order,
+    so an intent is valid only after the intents of its account with earlier nonces"""
+    now = chain.time() if now is None else now
+    vesting = _vesting(relay)
+    strategies = vesting.vestingStrategiesAmount()
+    max_positions = vesting.MAX_POSITIONS()
+    valid, rejected = [], []
+    nonces, positions = {}, {}
+
+    for intent in intents:
+        account = to_checksum_address(intent["account"])
+        if account not in nonces:
+            nonces[account] = vesting.stakeNonces(account)
+            positions[account] = vesting.positionsCount(account)
+        if int(intent["deadline"]) < now:
+            reason = "expired"
+        elif int(intent["nonce"]) != nonces[account]:
+            reason = "wrong nonce"
+        elif not vesting.isWhitelisted(account):
+            reason = "not whitelisted"
+        elif not 0 < int(intent["strategyNumber"]) <= strategies:
+            reason = "wrong strategy number"
+        elif positions[account] >= max_positions:
+            reason = "too many positions"
+        elif recover_signer(relay, intent) != account:
+            reason = "wrong signature"
+        else:
+            nonces[account] += 1
+            positions[account] += 1
+            valid.append(intent)
+            continue
+        rejected.append((intent, reason))
+    return valid, rejected
+
+
+def submit(relay, intents, operator):
+    """Sends stakeFor() batches of the intents, returns the transactions"""
+    size = batch_size(GAS_PER_INTENT, web3.eth.get_block("latest").gasLimit)
+    txs = []
+    for batch in _chunks(intents, size):
+        args = [tuple(int(intent[field]) if field != "account" else intent[field] for field in INTENT_FIELDS) for intent in batch]
+        txs.append(relay.stakeFor(args, [intent["signature"] for intent in batch], {'from': operator}))
+    return txs
+
+
+def read_intents(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def deploy(address, owner_id=None):
+    vesting = VestingStaking.at(address)
+    relay = deploy_relay(vesting, accounts.load(owner_id) if owner_id else accounts[0])
+    print("StakeRelay of {} deployed at {}".format(vesting.address, relay.address))
+    return relay
+
+
+def sign(address, account_id, amount, strategy, output="intents.jsonl", nonce=None, deadline=None):
+    relay = StakeRelay.at(address)
+    intent = sign_intent(relay, accounts.load(account_id).private_key, amount, strategy, nonce, deadline)
+    with open(output, "a") as f:
+        f.write(json.dumps(intent) + "\n")
+    print("Intent of {} with nonce {} appended to {}".format(intent["account"], intent["nonce"], output))
+    return intent
+
+
+def main(address, intents_file, sender=None):
+    relay = StakeRelay.at(address)
+    operator = accounts.load(sender) if sender else accounts[0]
+
+    valid, rejected = check_intents(relay, read_intents(intents_file))
+    for intent, reason in rejected:
+        print("Dropped intent of {} with nonce {}: {}".format(intent["account"], intent["nonce"], reason))
+
+    txs = submit(relay, valid, operator)
+    staked = sum(len(tx.events["Staked"]) if "Staked" in tx.events else 0 for tx in txs)
+    skipped = sum(len(tx.events["StakeIntentSkipped"]) if "StakeIntentSkipped" in tx.events else 0 for tx in txs)
+    gas = sum(tx.gas_used for tx in txs)
+    print("{} intents staked in {} transactions ({} gas per intent), {} skipped".format(
+        staked, len(txs), gas // staked if staked else 0, skipped
+    ))
+    return txs
@@ -0,0 +1,284 @@
+#!/usr/bin/python3
+
+"""
+Long-horizon load simulation of VestingStaking: thousands of accounts over years of chain time.
+
+Most accounts get their allocation before start() through initAllocationsBulk, the rest are
+whitelisted and stake on a random day. Every simulated day a random mix of getReward,
+vestingWithdraw and claimAll calls is sent at random times of the day. Accounts are derived
+from the seed, so the same arguments always produce the same run.
+
+Every period the report records gas percentiles of every entry point, reverts, the reward
+pool and the rounding dust of rewardPerTokenStored: the exact (rational) reward per token
+which the accumulator should hold minus what it holds. At the end the total dust in tokens,
+emitted reward minus paid and pending reward, and the wall time are reported.
+
+Usage:
+    brownie run simulation                                  # 10k accounts, 2 years
+    brownie run simulation main 1000 365 20                 # accounts, days, actions per day
+    brownie --network anvil-test run simulation             # much faster, see README
+"""
+
+import json
+import random
+import time
+from fractions import Fraction
+from pathlib import Path
+
+from brownie import VestingStaking, Token, accounts, chain, web3
+from brownie.exceptions import VirtualMachineError
+from eth_account import Account
+
+from scripts.onboarding import batch_size, GAS_PER_ALLOCATION, GAS_PER_WHITELIST
+from scripts.positions import get_positions
+
+DEFAULT_OUTPUT = "reports/simulation.json"
+
+DAY = 86400
+HOUR = 3600
+
+LATE_JOINERS = 0.2  # share of accounts which stake after start() instead of getting an allocation
+REWARD_PER_HOUR = 10_000_000
+REWARD_POOL = 150_000_000_000  # runs out after about 21 months of REWARD_PER_HOUR
+FUNDING = "0.005 ether"  # enough for the calls of one account, 10k of them fit into accounts[0] of ganache
+ACTIONS = ("getReward", "vestingWithdraw", "claimAll")
+ACTION_WEIGHTS = (4, 3, 2)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted values"""
+    rank = max(0, -(-len(values) * p // 100) - 1)
+    return values[int(rank)]
+
+
+class Participant:
+    __slots__ = ("key", "address", "strategy", "tokens", "vesting_start", "join_day", "account")
+
+    def __init__(self, key, strategy):
+        self.key = key
+        self.address = Account.from_key(key).address
+        self.strategy = strategy
+        self.tokens = 0
+        self.vesting_start = None
+        self.join_day = None
+        self.account = None  # brownie account, added and funded on the first transaction
+
+
+class Simulation:
+    def __init__(self, accounts_count, days, actions_per_day, strategies, seed):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.actions_per_day = actions_per_day
+        self.owner = accounts[0]
+
+        self.strategies = [None]  # (cliff, vesting) in seconds, numbers start with 1
+        for i in range(strategies):
+            self.strategies.append((self.rng.randint(1, 180) * DAY, self.rng.randint(30, 540) * DAY, i % 2))
+
+        self.participants = [
+            Participant("0x{:064x}".format(seed * 2**32 + 0x10000 + i), self.rng.randint(1, strategies))
+            for i in range(accounts_count)
+        ]
+        late = int(accounts_count * LATE_JOINERS)
+        self.joiners = {}
+        for participant in self.participants[accounts_count - late:]:
+            participant.join_day = self.rng.randint(0, days * 3 // 4)
+            self.joiners.setdefault(participant.join_day, []).append(participant)
+        self.active = []
+
+        # Tracking of the reward accumulator
+        self.total_value_locked = 0
+        self.last_update_time = 0
+        self.reward_per_token = 0  # same integer arithmetic as the contract
+        self.exact_reward_per_token = Fraction(0)
+        self.emitted = Fraction(0)
+        self.paid = 0
+
+        self.gas = {}
+        self.reverts = {}
+        self.depleted_day = None
+
+    def _signer(self, participant):
+        if participant.account is None:
+            participant.account = accounts.add(participant.key)
+            self.owner.transfer(participant.account, FUNDING, silent=True)
+        return participant.account
+
+    def _update_reward(self, timestamp):
+        # updateReward modifier of the contract, with the exact rational value next to it
+        if self.total_value_locked == 0:
+            self.reward_per_token = 0
+            self.exact_reward_per_token = Fraction(0)
+        else:
+            elapsed = timestamp - self.last_update_time
+            self.reward_per_token += REWARD_PER_HOUR * elapsed * 10**18 // self.total_value_locked // HOUR
+            self.exact_reward_per_token += Fraction(REWARD_PER_HOUR * elapsed * 10**18, self.total_value_locked * HOUR)
+            self.emitted += Fraction(REWARD_PER_HOUR * elapsed, HOUR)
+        self.last_update_time = timestamp
+
+    def _send(self, name, participant, *args):
+        try:
+            tx = getattr(self.vesting, name)(*args, {'from': self._signer(participant)}, silent=True)
+        except VirtualMachineError as e:
+            self.reverts.setdefault(name, 0)
+            self.reverts[name] += 1
+            if e.revert_msg == "Not enough tokens in reward pool" and self.depleted_day is None:
+                self.depleted_day = self.day
+            return None
+        self.gas.setdefault(name, []).append(tx.gas_used)
+        self._update_reward(tx.timestamp)
+
+        if "RewardPaid" in tx.events:
+            self.paid += tx.events["RewardPaid"]["reward"]
+        if "VestingWithdrawn" in tx.events:
+            amount = tx.events["VestingWithdrawn"]["amount"]
+            participant.tokens -= amount
+            self.total_value_locked -= amount
+        return tx
+
+    def setup(self):
+        owner = self.owner
+        self.token = Token.deploy({'from': owner})
+        self.vesting = VestingStaking.deploy(self.token, {'from': owner})
+        self.token.approve(self.vesting, self.token.balanceOf(owner), {'from': owner})
+
+        for cliff, vesting_time, vesting_type in self.strategies[1:]:
+            self.vesting.createWestingStrategy(cliff // DAY, vesting_time // DAY, vesting_type, {'from': owner})
+
+        # The largest *Bulk batches which fit into a block
+        gas_limit = web3.eth.get_block("latest").gasLimit
+        allocations_size = batch_size(GAS_PER_ALLOCATION, gas_limit)
+        whitelist_size = batch_size(GAS_PER_WHITELIST, gas_limit)
+
+        allocated = [p for p in self.participants if p.join_day is None]
+        for i in range(0, len(allocated), allocations_size):
+            batch = allocated[i:i + allocations_size]
+            for participant in batch:
+                participant.tokens = self.rng.randint(1_000, 49_999)
+            self.vesting.initAllocationsBulk(
+                [p.address for p in batch], [p.tokens for p in batch], [p.strategy for p in batch], {'from': owner}
+            )
+        self.total_value_locked = sum(p.tokens for p in allocated)
+
+        late = [p.address for p in self.participants if p.join_day is not None]
+        for i in range(0, len(late), whitelist_size):
+            self.vesting.addToWhitelistBulk(late[i:i + whitelist_size], {'from': owner})
+
+        tx = self.vesting.start(REWARD_PER_HOUR, REWARD_POOL, {'from': owner})
+        self.last_update_time = tx.timestamp
+        for participant in allocated:
+            participant.vesting_start = tx.timestamp
+        self.active = list(allocated)
+
+    def _vesting_started(self, participant, now):
+        cliff = self.strategies[participant.strategy][0]
+        return now > participant.vesting_start + cliff
+
+    def simulate_day(self, day):
+        self.day = day
+        operations = [("stake", p) for p in self.joiners.get(day, ())]
+        for _ in range(self.actions_per_day):
+            if self.active:
+                operations.append((self.rng.choices(ACTIONS, ACTION_WEIGHTS)[0], self.rng.choice(self.active)))
+        self.rng.shuffle(operations)
+
+        elapsed = 0
+        for name, participant in operations:
+            # spread the calls over the day
+            gap = self.rng.randint(0, (DAY - elapsed) // (len(operations) + 1))
+            chain.sleep(gap)
+            elapsed += gap
+
+            if name == "stake":
+                amount = self.rng.randint(1_000, 49_999)
+                tx = self._send("stake", participant, amount, participant.strategy)
+                if tx is not None:
+                    participant.tokens = amount
+                    participant.vesting_start = tx.timestamp
+                    self.total_value_locked += amount
+                    self.active.append(participant)
+                continue
+
+            if participant.tokens == 0:
+                name = "claimAll"
+            elif name != "getReward" and not self._vesting_started(participant, chain.time()):
+                name = "getReward"
+            self._send(name, participant)
+            if participant.tokens == 0 and name == "claimAll" and participant in self.active:
+                self.active.remove(participant)  # everything is vested, the last reward is claimed
+        chain.sleep(DAY - elapsed)
+
+    def period_report(self, day, gas_from):
+        stored = self.vesting.rewardPerTokenStored()
+        assert stored == self.reward_per_token, "rewardPerTokenStored {} != {}".format(stored, self.reward_per_token)
+
+        gas = {}
+        for name, values in self.gas.items():
+            values = sorted(values[gas_from.get(name, 0):])
+            if values:
+                gas[name] = {
+                    "count": len(values),
+                    "p50": percentile(values, 50),
+                    "p90": percentile(values, 90),
+                    "p99": percentile(values, 99),
+                    "max": values[-1],
+                }
+        return {
+            "day": day,
+            "gas": gas,
+            "reverts": dict(self.reverts),
+            "rewardPool": self.vesting.rewardPool(),
+            "totalValueLocked": self.vesting.totalValueLocked(),
+            "rewardPerTokenStored": stored,
+            "rewardPerTokenDust": float(self.exact_reward_per_token - stored),  # 1e18 = one token per staked token
+        }
+
+    def final_report(self):
+        pending = sum(
+            position["pendingReward"]
+            for position in get_positions(self.vesting, [p.address for p in self.participants]).values()
+        )
+        return {
+            "emittedReward": float(self.emitted),
+            "paidReward": self.paid,
+            "pendingReward": pending,
+            "rewardDust": float(self.emitted - self.paid - pending),  # rewards nobody can ever claim
+            "rewardPoolDepletedDay": self.depleted_day,
+        }
+
+
+def main(accounts_count=10_000, days=730, actions_per_day=40, strategies=24, seed=0, period_days=30, output=DEFAULT_OUTPUT):
+    started = time.perf_counter()
+    simulation = Simulation(int(accounts_count), int(days), int(actions_per_day), int(strategies), int(seed))
+    simulation.setup()
+    setup_time = time.perf_counter() - started
+    print("Setup of {} accounts and {} strategies took {:.1f}s".format(accounts_count, strategies, setup_time))
+
+    periods = []
+    gas_from = {}
+    for day in range(int(days)):
+        simulation.simulate_day(day)
+        if (day + 1) % int(period_days) == 0 or day + 1 == int(days):
+            periods.append(simulation.period_report(day + 1, gas_from))
+            gas_from = {name: len(values) for name, values in simulation.gas.items()}
+            print("Day {}: reward pool {}, TVL {}, dust {:.3e}".format(
+                day + 1, periods[-1]["rewardPool"], periods[-1]["totalValueLocked"], periods[-1]["rewardPerTokenDust"]
+            ))
+
+    result = {
+        "accounts": int(accounts_count),
+        "days": int(days),
+        "actionsPerDay": int(actions_per_day),
+        "strategies": int(strategies),
+        "seed": int(seed),
+        "periods": periods,
+        "totals": simulation.final_report(),
+        "setupSeconds": round(setup_time, 1),
+        "wallSeconds": round(time.perf_counter() - started, 1),
+    }
+
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2))
+    print("Simulation of {} days took {}s, report written to {}".format(days, result["wallSeconds"], path))
+    return result
@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+
+"""
+Snapshot of every VestingStaking position at one block, streamed into CSV or Parquet.
+
+The contract lists its own stakeholders, so no address list is needed: getPositionsPage() is read
+page by page at the chosen block with the node's eth_call gas cap, pages fit under it even if every
+stakeholder has MAX_POSITIONS positions, and a page which still runs out of gas is split in half. Only one page is held in memory, rows are written as they come.
+Rows are the accounts' positions summed up like in getPositions() (see scripts/positions.py).
+
+Parquet output needs pyarrow, amounts are decimal(38, 0) as they don't fit into int64.
+
+Usage:
+    brownie run snapshot main <VestingStaking address> reports/snapshot.csv
+    brownie run snapshot main <VestingStaking address> reports/snapshot.parquet 14000000    # at a block
+"""
+
+import csv
+from decimal import Decimal
+from pathlib import Path
+
+from brownie import VestingStaking, web3
+from brownie.exceptions import VirtualMachineError
+
+from scripts.positions import FIELDS, GAS_CAP, GAS_PER_ACCOUNT
+
+# getPositionsPage() reads the stakeholders list entry on top of getPositions()
+GAS_PER_PAGE_ACCOUNT = GAS_PER_ACCOUNT + 2_100
+
+INT_FIELDS = ("startingTimestamp", "vestingStrategyNumber")
+
+
+def page_size(gas_cap=GAS_CAP):
+    return max(1, int(gas_cap * 0.8) // GAS_PER_PAGE_ACCOUNT)
+
+
+def _read_page(vesting, offset, limit, block, gas):
+    try:
+        accounts, positions = vesting.getPositionsPage(offset, limit, {'gas': gas}, block_identifier=block)
+        return list(zip(accounts, positions))
+    except (VirtualMachineError, ValueError):  # out of gas or response too large, brownie raises ValueError without revert data
+        if limit == 1:
+            raise
+        half = limit // 2
+        return _read_page(vesting, offset, half, block, gas) + _read_page(vesting, offset + half, limit - half, block, gas)
+
+
+def iter_pages(vesting, block, gas_cap=GAS_CAP):
+    """Yields lists of (account, position) of all stakeholders at the block, one page at a time"""
+    count = vesting.stakeholdersCount(block_identifier=block)
+    size = page_size(gas_cap)
+    for offset in range(0, count, size):
+        yield _read_page(vesting, offset, min(size, count - offset), block, gas_cap)
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(("account",) + FIELDS)
+
+    def write(self, rows):
+        self._writer.writerows([account] + list(position) for account, position in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+        self._pa = pyarrow
+        self._schema = pyarrow.schema(
+            [("account", pyarrow.string())]
+            + [(field, pyarrow.int64() if field in INT_FIELDS else pyarrow.decimal128(38, 0)) for field in FIELDS]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(str(path), self._schema)
+
+    def write(self, rows):
+        columns = [[str(account) for account, _ in rows]]
+        for i, field in enumerate(FIELDS):
+            convert = int if field in INT_FIELDS else Decimal
+            columns.append([convert(position[i]) for _, position in rows])
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(column, type=self._schema.field(i).type) for i, column in enumerate(columns)],
+            schema=self._schema,
+        ))  # one row group per page
+
+    def close(self):
+        self._writer.close()
+
+
+def export(vesting, output, block=None, gas_cap=GAS_CAP):
+    """Writes all positions at the block (latest by default) to output, .parquet or CSV, returns (block, rows)"""
+    if block is None:
+        block = web3.eth.block_number
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = _ParquetWriter(path) if path.suffix == ".parquet" else _CsvWriter(path)
+
+    rows = 0
+    try:
+        for page in iter_pages(vesting, block, gas_cap):
+            writer.write(page)
+            rows += len(page)
+    finally:
+        writer.close()
+    return block, rows
+
+
+def main(address, output, block=None):
+    vesting = VestingStaking.at(address)
+    block, rows = export(vesting, output, None if block is None else int(block))
+    print("{} positions at block {} written to {}".format(rows, block, output))
+    return rows
@@ -1,6 +1,14 @@
 #!/usr/bin/python3
 
 import pytest
+from brownie import chain
+
+LINEAR = 0
+STEPPED = 1
+CLIFF_TIME_IN_DAYS = 30
+VESTING_TIME_IN_DAYS = 30
+REWARD_PER_HOUR = 100
+REWARD_POOL = 1_000_000_000
 
 @pytest.fixture(scope="function", autouse=True)
 def isolate(fn_isolation):
@@ -23,4 +31,65 @@ def token(Token, accounts):
 @pytest.fixture(scope="module")
 def vestingStakingAndToken(VestingStaking, Token, accounts):
     token = Token.deploy({'from': accounts[0]})
-    return [VestingStaking.deploy(token, {'from': accounts[0]}), token]  # for using both contracts in tests
\ No newline at end of file
+    return [VestingStaking.deploy(token, {'from': accounts[0]}), token]  # for using both contracts in tests
+
+
+#-------------------------------------------------------------------------
+# SCENARIOS
+#-------------------------------------------------------------------------
+
+# Scenarios are built once per test module (module-scoped fixtures are set up before the fn_isolation
+# snapshot), every test starts from the same state and its changes are reverted by fn_isolation.
+# Every scenario returns [vestingStaking, token] like vestingStakingAndToken, the owner has approved all tokens.
+# Block time keeps going while a module runs, so started scenarios are good for tests which don't depend on exact seconds since start.
+
+def build_scenario(VestingStaking, Token, accounts, allocations=(), start=False, sleep=0):
+    token = Token.deploy({'from': accounts[0]})
+    vesting = VestingStaking.deploy(token, {'from': accounts[0]})
+    token.approve(vesting, token.balanceOf(accounts[0]), {'from': accounts[0]})
+
+    vesting.createWestingStrategy(CLIFF_TIME_IN_DAYS, VESTING_TIME_IN_DAYS, LINEAR, {'from': accounts[0]})
+    vesting.createWestingStrategy(CLIFF_TIME_IN_DAYS, VESTING_TIME_IN_DAYS, STEPPED, {'from': accounts[0]})
+
+    if allocations:
+        holders, stakes, strategies = zip(*allocations)
+        vesting.initAllocationsBulk(holders, stakes, strategies, {'from': accounts[0]})
+    if start:
+        vesting.start(REWARD_PER_HOUR, REWARD_POOL, {'from': accounts[0]})
+    if sleep:
+        chain.sleep(sleep)
+        chain.mine()
+    return [vesting, token]
+
+
+# Linear (1) and stepped (2) 30/30 days strategies, nothing else
+@pytest.fixture(scope="module")
+def vestingWithStrategies(VestingStaking, Token, accounts):
+    return build_scenario(VestingStaking, Token, accounts)
+
+
+# accounts[1] has 60 tokens on the linear strategy, accounts[2] has 40 tokens on the stepped one, not started
+@pytest.fixture(scope="module")
+def vestingWithAllocations(VestingStaking, Token, accounts):
+    return build_scenario(VestingStaking, Token, accounts, [(accounts[1], 60, 1), (accounts[2], 40, 2)])
+
+
+# vestingWithAllocations started with 100 tokens reward per hour and 1_000_000_000 tokens reward pool
+@pytest.fixture(scope="module")
+def startedVesting(VestingStaking, Token, accounts):
+    return build_scenario(VestingStaking, Token, accounts, [(accounts[1], 60, 1), (accounts[2], 40, 2)], start=True)
+
+
+# startedVesting with 100 more allocations of 100 tokens to addresses without keys (0x...1 - 0x...64)
+@pytest.fixture(scope="module")
+def startedVestingWithManyAllocations(VestingStaking, Token, accounts):
+    allocations = [(accounts[1], 60, 1), (accounts[2], 40, 2)]
+    allocations += [("0x{:040x}".format(i), 100, 1 + i % 2) for i in range(1, 101)]
+    return build_scenario(VestingStaking, Token, accounts, allocations, start=True)
+
+
+# startedVesting 1 day after the cliff time: 1/30 of linear allocations and 50% of stepped ones can be withdrawn
+@pytest.fixture(scope="module")
+def vestingPastCliff(VestingStaking, Token, accounts):
+    allocations = [(accounts[1], 60, 1), (accounts[2], 40, 2)]
+    return build_scenario(VestingStaking, Token, accounts, allocations, start=True, sleep=(CLIFF_TIME_IN_DAYS + 1) * 24 * 3600 + 1)
@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+import asyncio
+
+import pytest
+from brownie import web3
+
+from scripts.async_client import RpcClient, RpcError, AsyncVestingStaking, AsyncToken
+from scripts.positions import get_positions
+
+""" VestingStaking.sol async client tests """
+
+
+def _run(scenario, *args):
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as client:
+            return await scenario(client, *args)
+    return asyncio.run(run())
+
+
+def test_reads_match_brownie(accounts, vestingPastCliff):
+    vesting_contract, token_contract = vestingPastCliff
+
+    async def scenario(client):
+        vesting = AsyncVestingStaking(client, vesting_contract.address)
+        token = AsyncToken(client, token_contract.address)
+        return await asyncio.gather(
+            vesting.totalValueLocked(),
+            vesting.stakes(accounts[1].address),
+            vesting.vestingStrategies(2),
+            vesting.calculateVestingSchedule(accounts[1].address),
+            vesting.getAccountPositions(accounts[2].address),
+            token.balanceOf(accounts[0].address),
+        )
+
+    tvl, stakes, strategy, claimable, positions, balance = _run(scenario)
+
+    assert tvl == vesting_contract.totalValueLocked()
+    assert stakes == vesting_contract.stakes(accounts[1])
+    assert strategy == vesting_contract.vestingStrategies(2)
+    assert claimable == vesting_contract.calculateVestingSchedule(accounts[1]) == 2
+    assert positions == tuple(tuple(position) for position in vesting_contract.getAccountPositions(accounts[2]))
+    assert balance == token_contract.balanceOf(accounts[0])
+
+
+def test_concurrent_calls_are_batched(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    holders = ["0x{:040x}".format(i) for i in range(1, 101)]
+
+    async def scenario(client):
+        vesting = AsyncVestingStaking(client, vesting_contract.address)
+        positions = await vesting.get_account_positions(holders)
+        return positions, client.requests, client.batches
+
+    positions, requests, batches = _run(scenario)
+
+    assert requests == 101  # eth_blockNumber and one eth_call per account
+    assert batches <= 3
+    assert all(len(items) == 1 and items[0]["tokensStaked"] == 100 for items in positions.values())
+
+
+def test_get_positions_match_sync_reader(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    holders = [accounts[1].address, accounts[2].address] + ["0x{:040x}".format(i) for i in range(1, 101)]
+    block = web3.eth.block_number
+
+    async def scenario(client):
+        return await AsyncVestingStaking(client, vesting_contract.address).get_positions(holders, block, chunk_size=7)
+
+    assert _run(scenario) == get_positions(vesting_contract, holders, block)
+
+
+def test_get_positions_chunk_out_of_gas_is_split(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    holders = [accounts[1].address, accounts[2].address] + ["0x{:040x}".format(i) for i in range(1, 101)]
+    block = web3.eth.block_number
+
+    async def scenario(client):
+        # about 12k gas per holder with one position, the whole list doesn't fit into 300k
+        return await AsyncVestingStaking(client, vesting_contract.address).get_positions(holders, block, chunk_size=102, gas_cap=300_000)
+
+    assert _run(scenario) == get_positions(vesting_contract, holders, block)
+
+
+def test_transactions(accounts, startedVesting):
+    vesting_contract, token_contract = startedVesting
+    balance = token_contract.balanceOf(accounts[5])
+
+    async def scenario(client):
+        vesting = AsyncVestingStaking(client, vesting_contract.address)
+        token = AsyncToken(client, token_contract.address)
+        await vesting.addToWhitelist([accounts[3].address], sender=accounts[0].address)
+        receipt = await vesting.stake(50, 1, sender=accounts[3].address)
+        await token.transfer(accounts[5].address, 10, sender=accounts[0].address)
+        with pytest.raises(RpcError):
+            await vesting.stake(50, 1, sender=accounts[4].address)  # not whitelisted
+        return receipt
+
+    receipt = _run(scenario)
+
+    assert int(receipt["status"], 16) == 1
+    assert vesting_contract.totalValueLocked() == 150
+    assert vesting_contract.isStakeholder(accounts[3])
+    assert token_contract.balanceOf(accounts[5]) == balance + 10
+
+
+def test_transactions_signed_with_private_key(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    signer = accounts.add("0x{:064x}".format(0x7000))
+    accounts[0].transfer(signer, "1 ether")
+    vesting_contract.addToWhitelist([signer], {'from': accounts[0]})
+
+    async def scenario(client):
+        vesting = AsyncVestingStaking(client, vesting_contract.address)
+        first = await vesting.stake(50, 1, sender=signer.address, private_key=signer.private_key)
+        second = await vesting.stake(20, 2, sender=signer.address, private_key=signer.private_key)  # next nonce
+        return first, second
+
+    receipts = _run(scenario)
+
+    assert [int(receipt["status"], 16) for receipt in receipts] == [1, 1]
+    assert all(receipt["from"].lower() == signer.address.lower() for receipt in receipts)
+    assert vesting_contract.positionsCount(signer) == 2
+    assert vesting_contract.totalValueLocked() == 170
+
+
+def test_reverting_call(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+
+    async def scenario(client):
+        await AsyncVestingStaking(client, vesting_contract.address).getAPYStaked()  # TVL is 0
+
+    with pytest.raises(RpcError):
+        _run(scenario)
+
+
+def test_only_abi_functions(accounts, vestingWithStrategies):
+    async def scenario(client):
+        return AsyncVestingStaking(client, vestingWithStrategies[0].address)
+
+    vesting = _run(scenario)
+    with pytest.raises(AttributeError):
+        vesting.notAFunction
+    with pytest.raises(ValueError):
+        vesting.encode("stakes", ())
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+import brownie
+
+""" VestingStaking.sol tests """
+
+def _started(accounts, vesting_contract, token_contract):
+    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vesting_contract.initAllocations((accounts[1], accounts[2]), (30, 30), (1, 1))
+    vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
+
+
+def test_claim_all_pays_reward_and_vesting(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started(accounts, vesting_contract, token_contract)
+
+    brownie.chain.sleep(31 * 24 * 3600 + 1)  # 1/30 of stake is vested
+    tx = vesting_contract.claimAll({'from': accounts[1]})
+    reward = tx.events["RewardPaid"]["reward"]
+    withdraw = tx.events["VestingWithdrawn"]["amount"]
+
+    assert withdraw == 1
+    assert reward > 0
+    assert token_contract.balanceOf(accounts[1]) == reward + withdraw
+    assert vesting_contract.stakes(accounts[1])[0] == 29
+    assert vesting_contract.stakes(accounts[1])[1] == 1
+    assert vesting_contract.stakes(accounts[1])[5] == 0
+    assert vesting_contract.rewardPool() == 1_000_000_000 - reward
+    assert vesting_contract.totalValueLocked() == 59
+
+
+def test_claim_all_cheaper_than_separate_calls(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started(accounts, vesting_contract, token_contract)
+
+    brownie.chain.sleep(45 * 24 * 3600)  # a half of stake is vested
+    claim = vesting_contract.claimAll({'from': accounts[1]})
+    reward = vesting_contract.getReward({'from': accounts[2]})
+    withdraw = vesting_contract.vestingWithdraw({'from': accounts[2]})
+
+    assert vesting_contract.stakes(accounts[1])[:2] == vesting_contract.stakes(accounts[2])[:2] == (15, 15)
+    assert claim.gas_used < reward.gas_used + withdraw.gas_used
+
+
+def test_claim_all_before_cliff_only_reward(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started(accounts, vesting_contract, token_contract)
+
+    brownie.chain.sleep(3600)
+    tx = vesting_contract.claimAll({'from': accounts[1]})
+
+    assert "VestingWithdrawn" not in tx.events
+    assert token_contract.balanceOf(accounts[1]) == tx.events["RewardPaid"]["reward"]
+
+
+def test_claim_all_nothing_to_claim(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started(accounts, vesting_contract, token_contract)
+
+    with brownie.reverts():
+        vesting_contract.claimAll({'from': accounts[1]})
+
+    with brownie.reverts("User is not a stakeholder"):
+        vesting_contract.claimAll({'from': accounts[3]})
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+import brownie
+
+""" VestingStaking.sol tests """
+
+SYNTHETIC = ["0x{:040x}".format(i) for i in range(1, 101)]
+
+
+def test_claim_for_pays_accounts(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+    token_contract = vestingPastCliff[1]
+    tvl = vesting_contract.totalValueLocked()
+    pool = vesting_contract.rewardPool()
+
+    tx = vesting_contract.claimFor((accounts[1], accounts[2]), {'from': accounts[0]})
+
+    rewards = {event["account"]: event["reward"] for event in tx.events["RewardPaid"]}
+    withdrawals = {event["account"]: event["amount"] for event in tx.events["VestingWithdrawn"]}
+    assert withdrawals[accounts[2]] == 20  # 50% of the stepped allocation
+    for account in (accounts[1], accounts[2]):
+        assert token_contract.balanceOf(account) == rewards[account] + withdrawals[account]
+        assert vesting_contract.stakes(account)[4:] == (vesting_contract.rewardPerTokenStored(), 0)
+        assert vesting_contract.unlockTimes(account)[0] != 0
+    assert vesting_contract.totalValueLocked() == tvl - sum(withdrawals.values())
+    assert vesting_contract.rewardPool() == pool - sum(rewards.values())
+
+
+def test_claim_for_skips_accounts_without_tokens(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+    vesting_contract.claimAll({'from': accounts[2]})
+
+    # not a stakeholder, nothing claimable yet, duplicate
+    tx = vesting_contract.claimFor((accounts[3], accounts[2], accounts[1], accounts[1]), {'from': accounts[0]})
+
+    assert [event["account"] for event in tx.events["VestingWithdrawn"]] == [accounts[1]]
+    assert vesting_contract.stakes(accounts[3]) == (0, 0, 0, 0, 0, 0)
+
+
+def test_claim_for_operators(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+    token_contract = vestingPastCliff[1]
+
+    with brownie.reverts("Caller is not an operator"):
+        vesting_contract.claimFor((accounts[1],), {'from': accounts[5]})
+    with brownie.reverts("Ownable: caller is not the owner"):
+        vesting_contract.setOperator(accounts[5], True, {'from': accounts[5]})
+
+    tx = vesting_contract.setOperator(accounts[5], True, {'from': accounts[0]})
+    assert tx.events["OperatorUpdated"].values() == [accounts[5], True]
+    vesting_contract.claimFor((accounts[1],), {'from': accounts[5]})
+
+    assert token_contract.balanceOf(accounts[5]) == 0  # tokens go to the position owner
+    assert token_contract.balanceOf(accounts[1]) > 0
+
+    vesting_contract.setOperator(accounts[5], False, {'from': accounts[0]})
+    with brownie.reverts("Caller is not an operator"):
+        vesting_contract.claimFor((accounts[1],), {'from': accounts[5]})
+
+
+def test_claim_for_before_start(accounts, vestingWithAllocations):
+    vesting_contract = vestingWithAllocations[0]
+
+    with brownie.reverts("Vesting-staking hasn't started yet"):
+        vesting_contract.claimFor((accounts[1],), {'from': accounts[0]})
+
+
+def test_claim_for_cheaper_per_account_than_claim_all(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    brownie.chain.sleep(31 * 24 * 3600 + 1)
+
+    single = vesting_contract.claimAll({'from': accounts[1]})
+    batch = vesting_contract.claimFor(SYNTHETIC, {'from': accounts[0]})
+
+    assert len(batch.events["VestingWithdrawn"]) == len(SYNTHETIC)
+    assert batch.gas_used / len(SYNTHETIC) < single.gas_used - 21_000  # at least the base cost is saved
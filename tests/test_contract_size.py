@@ -0,0 +1,15 @@
+#!/usr/bin/python3
+import pytest
+from brownie import StakeRelay, Token, VestingStaking, VestingStakingFactory
+
+""" Deployed code size tests """
+
+# EIP-170, the node refuses to deploy larger contracts
+MAX_CODE_SIZE = 24_576
+
+
+@pytest.mark.parametrize("container", [VestingStaking, VestingStakingFactory, StakeRelay, Token], ids=lambda c: c._name)
+def test_code_size(container):
+    size = len(container._build["deployedBytecode"]) // 2
+
+    assert size <= MAX_CODE_SIZE, "{} is {} bytes".format(container._name, size)
@@ -41,3 +41,26 @@ def test_zero_vesting_time(accounts, vestingStaking):
 
     with brownie.reverts():
         vestingStaking.createWestingStrategy(30, vesting_time, 0, {'from': accounts[0]})
+
+
+def test_create_strategies_in_batch(accounts, vestingStaking):
+    vestingStaking.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+
+    tx = vestingStaking.createWestingStrategies((1, 10, 90), (2, 30, 365), (0, 1, 0), {'from': accounts[0]})
+
+    seconds_in_day = 86400
+    assert vestingStaking.vestingStrategiesAmount() == 4
+    assert vestingStaking.vestingStrategies(2) == (1 * seconds_in_day, 2 * seconds_in_day, 0)
+    assert vestingStaking.vestingStrategies(3) == (10 * seconds_in_day, 30 * seconds_in_day, 1)
+    assert vestingStaking.vestingStrategies(4) == (90 * seconds_in_day, 365 * seconds_in_day, 0)
+    assert [event["strategyNumber"] for event in tx.events["StrategyCreated"]] == [2, 3, 4]
+
+
+def test_create_strategies_in_batch_with_wrong_strategy(accounts, vestingStaking):
+    with brownie.reverts():
+        vestingStaking.createWestingStrategies((30, 0), (30, 30), (0, 0), {'from': accounts[0]})  # zero cliff time of the 2nd one
+
+    with brownie.reverts("Arrays are not the same size"):
+        vestingStaking.createWestingStrategies((30, 30), (30,), (0, 0), {'from': accounts[0]})
+
+    assert vestingStaking.vestingStrategiesAmount() == 0
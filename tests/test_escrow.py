@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+import brownie
+
+""" VestingStaking.sol tests """
+
+def _started_in_escrow(accounts, vesting_contract, token_contract, deposit):
+    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vesting_contract.initAllocations((accounts[1],), (30,), (1,))
+    vesting_contract.start(100, 1_000_000, {'from': accounts[0]})
+    vesting_contract.enableEscrow(deposit, {'from': accounts[0]})
+
+
+def test_enable_escrow(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    owner_balance = token_contract.balanceOf(accounts[0])
+
+    _started_in_escrow(accounts, vesting_contract, token_contract, 1_000_030 + 500)
+
+    assert vesting_contract.escrowEnabled() == True
+    assert vesting_contract.escrowSurplus() == 500
+    assert token_contract.balanceOf(vesting_contract) == 1_000_530
+    assert token_contract.balanceOf(accounts[0]) == owner_balance - 1_000_530
+
+
+def test_enable_escrow_not_enough_for_tvl_and_reward_pool(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vesting_contract.initAllocations((accounts[1],), (30,), (1,))
+    vesting_contract.start(100, 1_000_000, {'from': accounts[0]})
+
+    with brownie.reverts("Not enough tokens for TVL and reward pool"):
+        vesting_contract.enableEscrow(1_000_029, {'from': accounts[0]})
+
+
+def test_payouts_from_escrow(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started_in_escrow(accounts, vesting_contract, token_contract, 1_000_030)
+    token_contract.approve(vesting_contract, 0, {'from': accounts[0]})  # the owner's wallet is not used anymore
+    owner_balance = token_contract.balanceOf(accounts[0])
+
+    brownie.chain.sleep(61 * 24 * 3600)
+    tx = vesting_contract.claimAll({'from': accounts[1]})
+    paid = tx.events["RewardPaid"]["reward"] + tx.events["VestingWithdrawn"]["amount"]
+
+    assert token_contract.balanceOf(accounts[1]) == paid
+    assert token_contract.balanceOf(accounts[0]) == owner_balance
+    assert token_contract.balanceOf(vesting_contract) == 1_000_030 - paid
+    assert token_contract.balanceOf(vesting_contract) == vesting_contract.totalValueLocked() + vesting_contract.rewardPool()
+
+
+def test_stake_reserves_escrow_surplus(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started_in_escrow(accounts, vesting_contract, token_contract, 1_000_030 + 50)
+    vesting_contract.addToWhitelist((accounts[2], accounts[3]))
+
+    vesting_contract.stake(40, 1, {'from': accounts[2]})
+    assert vesting_contract.escrowSurplus() == 10
+
+    with brownie.reverts("Contract owner doesn't have that many tokens"):
+        vesting_contract.stake(11, 1, {'from': accounts[3]})
+
+    vesting_contract.depositToEscrow(1, {'from': accounts[0]})
+    vesting_contract.stake(11, 1, {'from': accounts[3]})
+    assert vesting_contract.escrowSurplus() == 0
+
+
+def test_withdraw_escrow_surplus(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started_in_escrow(accounts, vesting_contract, token_contract, 1_000_030 + 500)
+
+    with brownie.reverts("Not enough surplus tokens in escrow"):
+        vesting_contract.withdrawEscrowSurplus(501, {'from': accounts[0]})
+
+    vesting_contract.withdrawEscrowSurplus(500, {'from': accounts[0]})
+    assert vesting_contract.escrowSurplus() == 0
+    assert token_contract.balanceOf(vesting_contract) == 1_000_030
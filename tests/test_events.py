@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+import json
+import brownie
+
+from scripts.indexer import Indexer
+
+""" VestingStaking.sol tests """
+
+def _started(accounts, vesting_contract, token_contract):
+    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vesting_contract.initAllocations((accounts[1],), (30,), (1,))
+    vesting_contract.addToWhitelist((accounts[2],))
+    return vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
+
+
+def test_onboarding_events(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+
+    tx = vesting_contract.createWestingStrategy(30, 20, 1, {'from': accounts[0]})
+    assert tx.events["StrategyCreated"] == {"strategyNumber": 1, "cliffTime": 30 * 86400, "vestingTime": 20 * 86400, "vestingStrategy": 1}
+
+    tx = vesting_contract.initAllocations((accounts[1], accounts[2]), (30, 40), (1, 1))
+    assert [dict(e) for e in tx.events["Allocated"]] == [
+        {"account": accounts[1], "amount": 30, "strategyNumber": 1},
+        {"account": accounts[2], "amount": 40, "strategyNumber": 1},
+    ]
+
+    tx = vesting_contract.editAmountPerWallet(accounts[1], 50)
+    assert tx.events["AllocationEdited"] == {"account": accounts[1], "amount": 50}
+
+    tx = vesting_contract.addToWhitelist((accounts[3],))
+    assert tx.events["WhitelistUpdated"] == {"account": accounts[3], "isWhitelisted": True}
+
+    tx = vesting_contract.deleteFromWhitelist(accounts[3])
+    assert tx.events["WhitelistUpdated"] == {"account": accounts[3], "isWhitelisted": False}
+
+
+def test_staking_events(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+
+    tx = _started(accounts, vesting_contract, token_contract)
+    assert tx.events["Started"] == {"rewardPerHour": 100, "rewardPool": 1_000_000_000}
+
+    tx = vesting_contract.stake(20, 1, {'from': accounts[2]})
+    assert tx.events["Staked"] == {"account": accounts[2], "amount": 20, "strategyNumber": 1}
+
+    brownie.chain.sleep(3600)
+    tx = vesting_contract.getReward({'from': accounts[1]})
+    assert tx.events["RewardPaid"]["account"] == accounts[1]
+    assert tx.events["RewardPaid"]["reward"] == token_contract.balanceOf(accounts[1])
+
+    brownie.chain.sleep(61 * 86400)
+    tx = vesting_contract.vestingWithdraw({'from': accounts[1]})
+    assert tx.events["VestingWithdrawn"] == {"account": accounts[1], "amount": 30}
+
+    tx = vesting_contract.addAditionalReward(1_000, {'from': accounts[0]})
+    assert tx.events["RewardAdded"] == {"extraReward": 1_000}
+
+
+def test_indexer_resumes_from_cursor(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+
+    from_block = brownie.chain.height + 1
+    _started(accounts, vesting_contract, token_contract)
+    indexer = Indexer(vesting_contract.address, ":memory:", from_block)
+
+    assert indexer.sync() == 4  # StrategyCreated, Allocated, WhitelistUpdated, Started
+    assert indexer.cursor == brownie.chain.height
+
+    vesting_contract.stake(20, 1, {'from': accounts[2]})
+    assert indexer.sync() == 1
+
+    rows = indexer.db.execute("SELECT event, account, args FROM events ORDER BY block_number, log_index").fetchall()
+    assert [row[0] for row in rows] == ["StrategyCreated", "Allocated", "WhitelistUpdated", "Started", "Staked"]
+    assert rows[-1][1] == accounts[2].address
+    assert json.loads(rows[-1][2]) == {"account": accounts[2].address, "amount": 20, "strategyNumber": 1}
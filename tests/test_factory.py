@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+import brownie
+import pytest
+
+from scripts.programs import deploy, create_program, list_programs
+
+""" VestingStakingFactory.sol tests """
+
+STRATEGIES = [(30, 30, 0), (30, 30, 1)]
+
+
+@pytest.fixture(scope="module")
+def factory(accounts):
+    return deploy(accounts[0])
+
+
+def test_create_program(VestingStaking, accounts, factory, token):
+    tx = factory.createProgram(token, accounts[1], (30, 10), (30, 90), (0, 1), {'from': accounts[0]})
+    program = VestingStaking.at(tx.events["ProgramCreated"]["program"])
+
+    assert tx.events["ProgramCreated"].values() == [0, program.address, token.address, accounts[1]]
+    assert program.owner() == program.contractOwner() == accounts[1]
+    assert program.tokenAddress() == token
+    assert program.vestingStrategiesAmount() == 2
+    assert program.vestingStrategies(2) == (10 * 86400, 90 * 86400, 1)
+    assert factory.isProgram(program)
+    assert factory.programsCount() == 1
+    assert factory.programAt(0) == program
+
+
+def test_program_works_as_deployed_contract(accounts, factory, token):
+    token.transfer(accounts[1], 1_000_000, {'from': accounts[0]})
+    program = create_program(factory, token, accounts[1], STRATEGIES)
+    token.approve(program, 1_000_000, {'from': accounts[1]})
+
+    program.initAllocations((accounts[2],), (300,), (1,), {'from': accounts[1]})
+    program.start(100, 10_000, {'from': accounts[1]})
+    brownie.chain.sleep(31 * 86400 + 1)
+    tx = program.claimAll({'from': accounts[2]})
+
+    assert tx.events["VestingWithdrawn"]["amount"] == 10
+    assert token.balanceOf(accounts[2]) == 10 + tx.events["RewardPaid"]["reward"]
+    with brownie.reverts("Ownable: caller is not the owner"):
+        program.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+
+
+def test_programs_can_not_be_initialized_again(VestingStaking, accounts, factory, token):
+    program = create_program(factory, token, accounts[1], STRATEGIES)
+    implementation = VestingStaking.at(factory.implementation())
+
+    with brownie.reverts("Initializable: contract is already initialized"):
+        program.initialize(token, accounts[3], (), (), (), {'from': accounts[3]})
+    with brownie.reverts("Initializable: contract is already initialized"):
+        implementation.initialize(token, accounts[3], (), (), (), {'from': accounts[3]})
+
+
+def test_create_program_only_owner(accounts, factory, token):
+    with brownie.reverts("Ownable: caller is not the owner"):
+        factory.createProgram(token, accounts[1], (), (), (), {'from': accounts[1]})
+    with brownie.reverts():
+        factory.createProgram(token, accounts[1], (30,), (30,), (2,), {'from': accounts[0]})  # piecewise is created separately
+
+
+def test_registry(accounts, factory, token):
+    programs = [create_program(factory, token, accounts[1]).address for _ in range(5)]
+
+    assert list_programs(factory, page_size=2) == programs
+    assert factory.getPrograms(3, 10) == programs[3:]
+    assert factory.getPrograms(5, 10) == []
+    assert factory.getPrograms(1, 2**256 - 1) == programs[1:]
+
+
+def test_program_is_cheap(VestingStaking, accounts, factory, token):
+    deployed = VestingStaking.deploy(token, {'from': accounts[0]})
+    tx = factory.createProgram(token, accounts[1], (30, 30), (30, 30), (0, 1), {'from': accounts[0]})
+
+    assert tx.gas_used < deployed.tx.gas_used / 10
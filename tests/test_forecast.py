@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+import brownie
+
+from scripts.forecast import forecast, load_strategies, position_arrays, read_account_positions, DAY
+
+""" VestingStaking.sol tests """
+
+def test_forecast_matches_vesting_schedule(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    holders = [accounts[1], accounts[2]] + ["0x{:040x}".format(i) for i in range(1, 101)]
+    now = brownie.chain.time()
+
+    cliff, curves = load_strategies(vesting_contract)
+    positions = position_arrays(read_account_positions(vesting_contract, holders), cliff, vesting_contract.startingTimestamp())
+    result = forecast(positions, curves, vesting_contract.rewardPool(), vesting_contract.rewardPerHour(), vesting_contract.lastUpdateTime(), now, 90)
+
+    assert result["totalValueLocked"][0] == vesting_contract.totalValueLocked()
+    assert result["totalValueLocked"][-1] == 0
+    for day in (31, 40, 52):
+        brownie.chain.sleep(int(result["times"][day]) - brownie.chain.time())
+        brownie.chain.mine()
+        claimable = sum(vesting_contract.calculateVestingSchedule(holder) for holder in holders)
+        # unlocked tokens aren't rounded down in the forecast
+        assert abs(vesting_contract.totalValueLocked() - claimable - result["totalValueLocked"][day]) < len(holders)
+
+
+def test_forecast_reward_pool_runway(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    now = brownie.chain.time()
+
+    cliff, curves = load_strategies(vesting_contract)
+    positions = position_arrays(read_account_positions(vesting_contract, (accounts[1], accounts[2])), cliff, vesting_contract.startingTimestamp())
+    result = forecast(positions, curves, 10_000, 100, now, now, 30)
+
+    # 2400 tokens a day
+    assert result["rewardRunwayDays"] == 10_000 / 2400
+    assert result["rewardPoolDepletedDay"] == 5
+    assert result["requiredBalance"][1] == vesting_contract.totalValueLocked() + 10_000 - 2400
+    assert result["rewardPool"][0] == 10_000 and result["times"][1] - result["times"][0] == DAY
+
+
+def test_forecast_of_multiple_positions(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    vesting_contract.addToWhitelist((accounts[1],), {'from': accounts[0]})
+    vesting_contract.stake(50, 2, {'from': accounts[1]})  # stepped, the allocation of accounts[1] is linear
+    now = brownie.chain.time()
+
+    cliff, curves = load_strategies(vesting_contract)
+    rows = read_account_positions(vesting_contract, (accounts[1], accounts[2]))
+    positions = position_arrays(rows, cliff, vesting_contract.startingTimestamp())
+    result = forecast(positions, curves, vesting_contract.rewardPool(), vesting_contract.rewardPerHour(), vesting_contract.lastUpdateTime(), now, 90)
+
+    assert [(row["tokensStaked"], row["vestingStrategyNumber"]) for row in rows] == [(60, 1), (50, 2), (40, 2)]
+    assert list(positions["strategy"]) == [1, 2, 2]
+    assert result["totalValueLocked"][0] == 150
+    for day in (32, 40, 52):
+        brownie.chain.sleep(int(result["times"][day]) - brownie.chain.time())
+        brownie.chain.mine()
+        claimable = sum(vesting_contract.calculateVestingSchedule(holder) for holder in (accounts[1], accounts[2]))
+        assert abs(vesting_contract.totalValueLocked() - claimable - result["totalValueLocked"][day]) < len(rows)
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+
+from scripts.gas_profile import profile, by_line, by_category, write_folded, SourceLines, INTRINSIC
+
+""" VestingStaking.sol gas profile tests """
+
+
+def test_profile_adds_up_to_gas_used(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+    tx = vesting_contract.claimAll({'from': accounts[1]})
+
+    stacks = profile(tx)
+
+    assert sum(stacks.values()) == tx.gas_used
+    assert 0 < stacks[(INTRINSIC,)] <= 21_000 + 16 * len(tx.input) // 2
+
+
+def test_profile_categories_and_lines(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+    tx = vesting_contract.claimAll({'from': accounts[1]})
+    lines = SourceLines()
+
+    stacks = profile(tx, lines)
+    categories = by_category(stacks)
+
+    assert categories["SLOAD cold"] >= 2100
+    assert categories["SSTORE cold"] > 0
+    assert categories["CALL"] > 0
+    assert any(line.startswith("VestingStaking.sol:") for line in by_line(stacks))
+    # the token transfer runs the inherited ERC20.transferFrom, its lines are below the call in _payOut()
+    assert any("ERC20.sol" in frame for frames in stacks for frame in frames[2:])
+    assert any(frame == "ERC20.transferFrom" for frames in stacks for frame in frames[2:])
+    assert any("transferFrom" in lines.text(line) for line in by_line(stacks))
+
+
+def test_warm_slots(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+    tx = vesting_contract.claimAll({'from': accounts[1]})
+
+    categories = by_category(profile(tx))
+
+    # the reward accumulator and the account are read again after the first access
+    assert categories["SLOAD warm"] > 0
+    assert categories["SLOAD warm"] % 100 == 0
+
+
+def test_folded_output(accounts, vestingPastCliff, tmp_path):
+    vesting_contract = vestingPastCliff[0]
+    tx = vesting_contract.vestingWithdraw({'from': accounts[1]})
+    stacks = profile(tx)
+
+    path = write_folded(stacks, tmp_path / "profile.folded")
+
+    rows = path.read_text().splitlines()
+    assert sum(int(row.rsplit(" ", 1)[1]) for row in rows) == tx.gas_used
+    assert all(";" in row or row.startswith(INTRINSIC) for row in rows)
@@ -4,18 +4,9 @@ import brownie
 
 """ VestingStaking.sol tests """
 
-def test_correct_reward(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
-
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_correct_reward(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    token_contract = vestingWithStrategies[1]
 
     first_acc = accounts[1]
     first_stake = 60
@@ -50,18 +41,8 @@ def test_correct_reward(accounts, vestingStakingAndToken):
     assert token_contract.balanceOf(first_acc) == balance_of_first_acc_before_reward + (first_stake * reward_per_hour * hours_passed // total_value_locked)
 
 
-def test_get_reward_before_at_least_one_token_earned(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
-
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_get_reward_before_at_least_one_token_earned(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
 
     stake = 60
     strategy = 1  # linear
@@ -75,18 +56,8 @@ def test_get_reward_before_at_least_one_token_earned(accounts, vestingStakingAnd
         vesting_contract.getReward({"from": accounts[1]})
 
 
-def test_get_reward_by_non_stakeholder(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
-
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_get_reward_by_non_stakeholder(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
 
     stake = 60
     strategy = 1  # linear
@@ -103,18 +74,9 @@ def test_get_reward_by_non_stakeholder(accounts, vestingStakingAndToken):
         vesting_contract.getReward({"from": accounts[2]})  # only account[1] is stakeholder
 
 
-def test_get_reward_by_whitelisted_stakeholder(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
-
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_get_reward_by_whitelisted_stakeholder(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    token_contract = vestingWithStrategies[1]
 
     first_acc_stake = 60
     first_acc_strategy = 1  # linear
@@ -141,18 +103,8 @@ def test_get_reward_by_whitelisted_stakeholder(accounts, vestingStakingAndToken)
     assert token_contract.balanceOf(accounts[2]) == balance_before_reward + (second_acc_stake * reward_per_hour * hours_passed // tvl)
 
 
-def test_add_aditional_reward(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
-
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_add_aditional_reward(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
 
     stake = 30
     strategy = 1  # linear
@@ -166,3 +118,34 @@ def test_add_aditional_reward(accounts, vestingStakingAndToken):
     vesting_contract.addAditionalReward(additional_reward, {"from": accounts[0]})
 
     assert vesting_contract.rewardPool() == reward_pool + additional_reward
+
+
+def test_dust_stake_does_not_lock_rewards(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    token_contract = vestingWithStrategies[1]
+    max_reward_per_token = 2**128 - 1
+
+    vesting_contract.addToWhitelist((accounts[1], accounts[2]), {"from": accounts[0]})
+    vesting_contract.start(10**18, 1_000_000_000, {"from": accounts[0]})
+    vesting_contract.stake(1, 1, {"from": accounts[1]})  # TVL is 1 token unit
+
+    # ~2.8e32 reward per token a second, type(uint104).max was passed in the first second, type(uint128).max in 14 days
+    brownie.chain.sleep(30 * 24 * 3600)
+    vesting_contract.stake(100, 1, {"from": accounts[2]})
+
+    assert vesting_contract.rewardPerTokenStored() == max_reward_per_token
+    assert vesting_contract.stakes(accounts[2])[4] == max_reward_per_token
+    assert vesting_contract.earned(accounts[1]) == max_reward_per_token // 10**18
+
+    brownie.chain.sleep(61 * 24 * 3600)  # past cliff and vesting
+    for account, stake in ((accounts[1], 1), (accounts[2], 100)):
+        balance_before_withdraw = token_contract.balanceOf(account)
+        vesting_contract.vestingWithdraw({"from": account})
+        assert token_contract.balanceOf(account) == balance_before_withdraw + stake
+    assert vesting_contract.totalValueLocked() == 0
+    assert vesting_contract.rewardPerTokenStored() == max_reward_per_token  # not reset while TVL is 0
+    assert vesting_contract.earned(accounts[2]) == 0
+
+    vesting_contract.stake(10, 1, {"from": accounts[2]})  # reward updates of earlier stakers keep working
+    assert vesting_contract.stakes(accounts[2])[4] == max_reward_per_token
+    assert vesting_contract.earned(accounts[2]) == 0
@@ -3,14 +3,8 @@ import brownie
 
 """ VestingStaking.sol tests """
 
-def test_correct_init_allocations(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_correct_init_allocations(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
 
     first_acc = accounts[1]
     first_stake = 60
@@ -39,14 +33,8 @@ def test_correct_init_allocations(accounts, vestingStaking):
     assert vestingStaking.totalValueLocked() == first_stake + second_stake
 
 
-def test_wrong_stake_array_size(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_wrong_stake_array_size(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
 
     with brownie.reverts():
         vestingStaking.initAllocations((accounts[1], accounts[2]), (60,), (1, 2))  # two accounts, but 1 stake
@@ -55,14 +43,8 @@ def test_wrong_stake_array_size(accounts, vestingStaking):
         vestingStaking.initAllocations((accounts[1], accounts[2]), (60, 40, 20), (1, 2))  # two accounts, but 3 stakes
 
 
-def test_stake_more_than_limit(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_stake_more_than_limit(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
 
     stake_limit = 49999
 
@@ -70,14 +52,8 @@ def test_stake_more_than_limit(accounts, vestingStaking):
         vestingStaking.initAllocations((accounts[1], accounts[2]), (60, stake_limit + 1), (1, 2))  # stake 50000 tokens for 2nd account
 
 
-def test_wrong_strategy_for_init_allocations(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_wrong_strategy_for_init_allocations(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
 
     vesting_strategies = 2
 
@@ -85,14 +61,8 @@ def test_wrong_strategy_for_init_allocations(accounts, vestingStaking):
         vestingStaking.initAllocations((accounts[1], accounts[2]), (60, 20), (vesting_strategies + 1, 2))  # 3rd vesting strat for 1st acc
 
 
-def test_edit_amount_per_wallet(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_edit_amount_per_wallet(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
 
     stake = 30
     strategy = 1  # linear
@@ -104,3 +74,57 @@ def test_edit_amount_per_wallet(accounts, vestingStaking):
     new_stake_in_contract = vestingStaking.stakes(accounts[1])[0]
 
     assert new_stake_in_contract == new_stake
+
+
+def test_is_stakeholder_after_init_allocations(accounts, vestingStaking):
+    vestingStaking.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+
+    assert vestingStaking.isStakeholder(accounts[1]) == False
+
+    vestingStaking.initAllocations((accounts[1],), (30,), (1,))
+
+    assert vestingStaking.isStakeholder(accounts[1]) == True
+    assert vestingStaking.isStakeholder(accounts[2]) == False
+    assert vestingStaking.getAllUserInfo(accounts[1]) == vestingStaking.stakes(accounts[1])[:4]
+
+
+def test_init_allocations_bulk(accounts, vestingStaking):
+    vestingStaking.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vestingStaking.createWestingStrategy(30, 30, 1, {'from': accounts[0]})
+
+    many_accounts = ["0x{:040x}".format(i) for i in range(1, 31)]  # more than 10 accounts at a time
+    stakes = [10 + i for i in range(len(many_accounts))]
+    strategies = [1 + i % 2 for i in range(len(many_accounts))]
+
+    vestingStaking.initAllocationsBulk(many_accounts, stakes, strategies)
+
+    for account, stake, strategy in zip(many_accounts, stakes, strategies):
+        assert vestingStaking.stakes(account)[0] == stake
+        assert vestingStaking.stakes(account)[3] == strategy
+    assert vestingStaking.totalValueLocked() == sum(stakes)
+
+
+def test_init_allocations_bulk_wrong_strategy(accounts, vestingStaking):
+    vestingStaking.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+
+    with brownie.reverts():
+        vestingStaking.initAllocationsBulk((accounts[1], accounts[2]), (60, 20), (1, 2))
+
+
+def test_edit_amounts_per_wallet(accounts, vestingStaking):
+    vestingStaking.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vestingStaking.initAllocations((accounts[1], accounts[2]), (30, 40), (1, 1))
+
+    vestingStaking.editAmountsPerWallet((accounts[1], accounts[2]), (60, 20))
+
+    assert vestingStaking.stakes(accounts[1])[0] == 60
+    assert vestingStaking.stakes(accounts[2])[0] == 20
+    assert vestingStaking.totalValueLocked() == 80
+
+
+def test_edit_amounts_per_wallet_not_stakeholder(accounts, vestingStaking):
+    vestingStaking.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vestingStaking.initAllocations((accounts[1],), (30,), (1,))
+
+    with brownie.reverts("This account is not a stakeholder"):
+        vestingStaking.editAmountsPerWallet((accounts[1], accounts[2]), (60, 20))
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+import brownie
+
+from scripts.merkle import build
+
+""" VestingStaking.sol tests """
+
+def _publish(vesting_contract, accounts, entries):
+    tree = build(entries)
+    vesting_contract.setMerkleRoot(tree["root"], {'from': accounts[0]})
+    return tree["entries"]
+
+
+def test_activate_merkle_allocation(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vesting_contract.createWestingStrategy(30, 30, 1, {'from': accounts[0]})
+
+    entries = _publish(vesting_contract, accounts, [(accounts[1].address, 60, 1), (accounts[2].address, 40, 2)])
+    root_time = vesting_contract.merkleRootTimestamp()
+
+    entry = entries[accounts[2].address.lower()]
+    vesting_contract.activateMerkleEntry(entry["index"], entry["amount"], entry["strategy"], entry["proof"], {'from': accounts[2]})
+
+    assert vesting_contract.isStakeholder(accounts[2]) == True
+    assert vesting_contract.isStakeholder(accounts[1]) == False
+    assert vesting_contract.stakes(accounts[2])[:4] == (40, 0, root_time, 2)
+    assert vesting_contract.totalValueLocked() == 40
+    assert vesting_contract.isMerkleEntryActivated(entry["index"]) == True
+
+
+def test_activate_merkle_whitelist_entry_and_stake(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+
+    entries = _publish(vesting_contract, accounts, [(accounts[1].address, 0, 0), (accounts[2].address, 40, 1)])
+    vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
+
+    entry = entries[accounts[1].address.lower()]
+    vesting_contract.activateMerkleEntry(entry["index"], 0, 0, entry["proof"], {'from': accounts[1]})
+    assert vesting_contract.isWhitelisted(accounts[1]) == True
+
+    vesting_contract.stake(60, 1, {'from': accounts[1]})
+    assert vesting_contract.totalValueLocked() == 60
+
+
+def test_activate_merkle_entry_twice(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+
+    entries = _publish(vesting_contract, accounts, [(accounts[1].address, 0, 0), (accounts[2].address, 40, 1)])
+    entry = entries[accounts[1].address.lower()]
+    vesting_contract.activateMerkleEntry(entry["index"], 0, 0, entry["proof"], {'from': accounts[1]})
+    vesting_contract.deleteFromWhitelist(accounts[1], {'from': accounts[0]})
+
+    with brownie.reverts("Entry is activated already"):
+        vesting_contract.activateMerkleEntry(entry["index"], 0, 0, entry["proof"], {'from': accounts[1]})
+
+
+def test_activate_merkle_entry_wrong_proof(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+
+    entries = _publish(vesting_contract, accounts, [(accounts[1].address, 60, 1), (accounts[2].address, 40, 1)])
+    entry = entries[accounts[1].address.lower()]
+
+    with brownie.reverts("Invalid Merkle proof"):
+        vesting_contract.activateMerkleEntry(entry["index"], 49_999, 1, entry["proof"], {'from': accounts[1]})  # other amount
+
+    with brownie.reverts("Invalid Merkle proof"):
+        vesting_contract.activateMerkleEntry(entry["index"], 60, 1, entry["proof"], {'from': accounts[3]})  # other account
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+import brownie
+
+""" VestingStaking.sol tests """
+
+DAY = 24 * 3600
+
+
+def test_stake_several_positions(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    vesting_contract.addToWhitelist((accounts[1], accounts[3]), {'from': accounts[0]})
+
+    first = vesting_contract.stake(1000, 1, {'from': accounts[3]})
+    second = vesting_contract.stake(500, 2, {'from': accounts[3]})
+    vesting_contract.stake(10, 2, {'from': accounts[1]})  # next to the allocation
+
+    assert vesting_contract.positionsCount(accounts[3]) == 2
+    assert vesting_contract.positionsCount(accounts[1]) == 2
+    assert vesting_contract.getAccountPositions(accounts[3]) == [
+        (1000, 0, first.timestamp, 1, first.timestamp + 30 * DAY, first.timestamp + 60 * DAY, 0),
+        (500, 0, second.timestamp, 2, second.timestamp + 30 * DAY, second.timestamp + 60 * DAY, 0),
+    ]
+    assert vesting_contract.stakes(accounts[3])[:4] == (1500, 0, first.timestamp, 1)  # totals, the 1st position's start
+    assert vesting_contract.stakes(accounts[1])[0] == 70
+    assert vesting_contract.totalValueLocked() == 60 + 40 + 1500 + 10
+
+
+def test_allocations_before_start(accounts, vestingWithAllocations):
+    vesting_contract = vestingWithAllocations[0]
+
+    vesting_contract.initAllocations((accounts[1],), (30,), (2,), {'from': accounts[0]})
+    vesting_contract.editAmountPerWallet(accounts[1], 80, {'from': accounts[0]})  # the 1st position
+
+    positions = vesting_contract.getAccountPositions(accounts[1])
+    assert [position[0] for position in positions] == [80, 30]
+    assert [position[4:] for position in positions] == [(0, 0, 0), (0, 0, 0)]  # nothing is known before start
+    assert vesting_contract.stakes(accounts[1])[0] == 110
+    assert vesting_contract.totalValueLocked() == 80 + 30 + 40
+
+
+def test_withdraw_from_all_positions(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+    token_contract = vestingPastCliff[1]
+    vesting_contract.initAllocations((accounts[1],), (40,), (2,), {'from': accounts[0]})  # vests from now on
+
+    tx = vesting_contract.vestingWithdraw({'from': accounts[1]})
+    assert tx.events["VestingWithdrawn"]["amount"] == 2  # 1/30 of the 1st position only
+
+    brownie.chain.sleep(61 * DAY)
+    tx = vesting_contract.claimAll({'from': accounts[1]})
+
+    assert tx.events["VestingWithdrawn"]["amount"] == 58 + 40
+    assert [position[:2] for position in vesting_contract.getAccountPositions(accounts[1])] == [(0, 60), (0, 40)]
+    assert vesting_contract.stakes(accounts[1])[:2] == (0, 100)
+    assert token_contract.balanceOf(accounts[1]) == 100 + tx.events["RewardPaid"]["reward"]  # the reward is paid once
+
+
+def test_reward_update_cost_does_not_depend_on_positions(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    vesting_contract.addToWhitelist((accounts[3], accounts[4]), {'from': accounts[0]})
+
+    vesting_contract.stake(1000, 1, {'from': accounts[3]})
+    for _ in range(vesting_contract.MAX_POSITIONS()):
+        vesting_contract.stake(50, 1, {'from': accounts[4]})
+    brownie.chain.sleep(3600)
+
+    one = vesting_contract.getReward({'from': accounts[3]})
+    twenty = vesting_contract.getReward({'from': accounts[4]})
+
+    assert abs(one.gas_used - twenty.gas_used) < 1000  # less than a single cold slot read
+
+
+def test_too_many_positions(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    vesting_contract.addToWhitelist((accounts[3],), {'from': accounts[0]})
+
+    for _ in range(vesting_contract.MAX_POSITIONS()):
+        vesting_contract.stake(10, 1, {'from': accounts[3]})
+
+    with brownie.reverts("Too many positions"):
+        vesting_contract.stake(10, 1, {'from': accounts[3]})
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+import json
+import pytest
+from brownie import web3
+
+from scripts import onboarding
+
+""" VestingStaking.sol tests """
+
+HOLDERS = ["0x{:040x}".format(i) for i in range(1, 31)]
+
+
+def _write(path, rows):
+    path.write_text("\n".join(",".join(str(value) for value in row) for row in rows) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def inputs(tmp_path, accounts):
+    return {
+        "allocations_csv": _write(tmp_path / "allocations.csv", [(holder, 100 + i, 1 + i % 3) for i, holder in enumerate(HOLDERS)]),
+        "whitelist_csv": _write(tmp_path / "whitelist.csv", [(account.address,) for account in accounts[3:6]]),
+        "strategies_csv": _write(tmp_path / "strategies.csv", [(30, 30, 0), (30, 30, 1), (10, 90, 0)]),
+        "checkpoint": str(tmp_path / "onboarding.json"),
+    }
+
+
+def test_onboarding(accounts, vestingWithStrategies, inputs, monkeypatch):
+    vesting_contract = vestingWithStrategies[0]
+    monkeypatch.setattr(onboarding, "BLOCK_FILL", 0.03)  # several small batches
+
+    state = onboarding.main(vesting_contract.address, reward_per_hour=100, reward_pool=1_000_000, **inputs)
+
+    assert vesting_contract.vestingStrategiesAmount() == 3
+    assert vesting_contract.vestingStrategies(3) == (10 * 86400, 90 * 86400, 0)
+    assert all(vesting_contract.isWhitelisted(account) for account in accounts[3:6])
+    assert vesting_contract.totalValueLocked() == sum(100 + i for i in range(30))
+    assert vesting_contract.stakes(HOLDERS[4])[0] == 104
+    assert vesting_contract.status() == 1
+    assert len([key for key in state["batches"] if key.startswith("allocations/")]) > 1
+    assert all(batch["status"] == "confirmed" for batch in state["batches"].values())
+
+
+def test_onboarding_after_start(accounts, startedVesting, inputs, monkeypatch):
+    vesting_contract = startedVesting[0]
+    monkeypatch.setattr(onboarding, "BLOCK_FILL", 0.03)
+
+    state = onboarding.main(vesting_contract.address, **inputs)
+
+    # allocations after start() also write the unlock times, the batches are sized for that
+    gas_limit = web3.eth.get_block("latest").gasLimit
+    assert state["sizes"]["allocations"] == onboarding.batch_size(onboarding.GAS_PER_ALLOCATION_STARTED, gas_limit)
+    assert vesting_contract.totalValueLocked() == 100 + sum(100 + i for i in range(30))
+    assert vesting_contract.unlockTimes(HOLDERS[-1])[0] != 0
+
+
+def test_onboarding_resumes_without_double_allocation(accounts, vestingWithStrategies, inputs, monkeypatch):
+    vesting_contract = vestingWithStrategies[0]
+    monkeypatch.setattr(onboarding, "BLOCK_FILL", 0.03)
+    onboarding.main(vesting_contract.address, **inputs)
+    tvl = vesting_contract.totalValueLocked()
+
+    # The run stopped after sending the batches, before any receipt was recorded
+    with open(inputs["checkpoint"]) as f:
+        state = json.load(f)
+    for batch in state["batches"].values():
+        batch["status"] = "sent"
+    with open(inputs["checkpoint"], "w") as f:
+        json.dump(state, f)
+    nonce = accounts[0].nonce
+
+    onboarding.main(vesting_contract.address, **inputs)
+
+    assert vesting_contract.totalValueLocked() == tvl
+    assert accounts[0].nonce == nonce  # nothing is sent again
+
+
+def test_onboarding_resends_partly_whitelisted_batch(accounts, vestingWithStrategies, inputs):
+    vesting_contract = vestingWithStrategies[0]
+    onboarding.main(vesting_contract.address, **inputs)
+    vesting_contract.deleteFromWhitelist(accounts[4], {'from': accounts[0]})
+
+    # The batch was never mined, only its first and last accounts are whitelisted by someone else
+    with open(inputs["checkpoint"]) as f:
+        state = json.load(f)
+    state["batches"]["whitelist/0"] = {"status": "sent", "tx": "0x" + "00" * 32}
+    with open(inputs["checkpoint"], "w") as f:
+        json.dump(state, f)
+
+    state = onboarding.main(vesting_contract.address, **inputs)
+
+    assert vesting_contract.isWhitelisted(accounts[4])
+    assert state["batches"]["whitelist/0"]["status"] == "confirmed"
+
+
+def test_onboarding_validation(accounts, vestingWithStrategies, inputs, tmp_path):
+    vesting_contract = vestingWithStrategies[0]
+    inputs["allocations_csv"] = _write(tmp_path / "allocations.csv", [
+        (HOLDERS[0], 100, 1),
+        (HOLDERS[0], 100, 1),    # duplicate
+        (HOLDERS[1], 50_000, 1), # too much
+        (HOLDERS[2], 100, 4),    # no such strategy
+        ("0x1234", 100, 1),      # invalid address
+    ])
+    nonce = accounts[0].nonce
+
+    with pytest.raises(ValueError, match="4 invalid rows"):
+        onboarding.main(vesting_contract.address, **inputs)
+    assert accounts[0].nonce == nonce
+
+    inputs["strategies_csv"] = _write(tmp_path / "strategies.csv", [(30, 30, 1)])  # strategy 1 is linear on chain
+    with pytest.raises(ValueError, match="strategy 1 on chain"):
+        onboarding.main(vesting_contract.address, **inputs)
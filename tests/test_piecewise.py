@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+import brownie
+
+""" VestingStaking.sol tests """
+
+DAY = 24 * 3600
+FULL_SHARE = 10**18
+PIECEWISE = 2
+
+
+def test_create_piecewise_strategy(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    offsets = [0, 30 * DAY, 60 * DAY, 90 * DAY]
+    shares = [FULL_SHARE // 10, FULL_SHARE // 10, FULL_SHARE // 2, FULL_SHARE]
+
+    tx = vesting_contract.createPiecewiseStrategy(offsets, shares, {'from': accounts[0]})
+
+    assert tx.events["StrategyCreated"]["strategyNumber"] == 3
+    assert vesting_contract.vestingStrategies(3) == (0, 90 * DAY, PIECEWISE)
+    assert vesting_contract.getStrategyCheckpoints(3) == (offsets, shares)
+
+
+def test_create_piecewise_strategy_wrong_checkpoints(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+
+    with brownie.reverts("Arrays are not the same size"):
+        vesting_contract.createPiecewiseStrategy([DAY, 2 * DAY], [FULL_SHARE], {'from': accounts[0]})
+    with brownie.reverts("Arrays are not the same size"):
+        vesting_contract.createPiecewiseStrategy([], [], {'from': accounts[0]})
+    with brownie.reverts("The last checkpoint must unlock everything"):
+        vesting_contract.createPiecewiseStrategy([DAY, 2 * DAY], [FULL_SHARE // 2, FULL_SHARE - 1], {'from': accounts[0]})
+    with brownie.reverts("Checkpoints are not sorted"):
+        vesting_contract.createPiecewiseStrategy([2 * DAY, DAY, 3 * DAY], [1, 2, FULL_SHARE], {'from': accounts[0]})
+    with brownie.reverts("Checkpoints are not sorted"):
+        vesting_contract.createPiecewiseStrategy([DAY, 2 * DAY, 3 * DAY], [2, 1, FULL_SHARE], {'from': accounts[0]})
+    with brownie.reverts():
+        vesting_contract.createPiecewiseStrategy([0], [FULL_SHARE], {'from': accounts[0]})
+    with brownie.reverts():
+        vesting_contract.createWestingStrategy(30, 30, PIECEWISE, {'from': accounts[0]})
+    with brownie.reverts("Ownable: caller is not the owner"):
+        vesting_contract.createPiecewiseStrategy([DAY], [FULL_SHARE], {'from': accounts[1]})
+
+
+def test_piecewise_vesting_schedule(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    # 10% at the vesting start, then linear up to 50% in 10 days, then 50% more in one step at 20 days
+    vesting_contract.createPiecewiseStrategy(
+        [0, 10 * DAY, 20 * DAY, 20 * DAY], [FULL_SHARE // 10, FULL_SHARE // 2, FULL_SHARE // 2, FULL_SHARE], {'from': accounts[0]}
+    )
+    vesting_contract.addToWhitelist((accounts[3],), {'from': accounts[0]})
+    vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
+    tx = vesting_contract.stake(1000, 3, {'from': accounts[3]})
+
+    assert vesting_contract.unlockTimes(accounts[3]) == (tx.timestamp, tx.timestamp + 20 * DAY)
+
+    brownie.chain.sleep(5 * DAY)
+    tx = vesting_contract.vestingWithdraw({'from': accounts[3]})
+    elapsed = tx.timestamp - vesting_contract.unlockTimes(accounts[3])[0]
+    assert tx.events["VestingWithdrawn"]["amount"] == 1000 * (FULL_SHARE // 10 + 4 * FULL_SHARE // 10 * elapsed // (10 * DAY)) // FULL_SHARE
+
+    brownie.chain.sleep(10 * DAY)
+    tx = vesting_contract.vestingWithdraw({'from': accounts[3]})
+    assert vesting_contract.getWithdrawedVestingTokens(accounts[3]) == 500
+
+    brownie.chain.sleep(5 * DAY)
+    brownie.chain.mine()
+    assert vesting_contract.calculateVestingSchedule(accounts[3]) == 500
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+import brownie
+import pytest
+from brownie import web3
+from brownie.exceptions import VirtualMachineError
+
+from scripts.positions import get_positions, FIELDS, GAS_PER_ACCOUNT
+
+""" VestingStaking.sol tests """
+
+def _started(accounts, vesting_contract, token_contract):
+    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vesting_contract.createWestingStrategy(30, 30, 1, {'from': accounts[0]})
+    vesting_contract.initAllocations((accounts[1], accounts[2]), (60, 40), (1, 2))
+    vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
+
+
+def test_get_positions_before_start(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    vesting_contract.createWestingStrategy(30, 30, 0, {'from': accounts[0]})
+    vesting_contract.initAllocations((accounts[1],), (60,), (1,))
+
+    positions = vesting_contract.getPositions((accounts[1], accounts[3]))
+
+    assert positions[0][:4] == vesting_contract.getAllUserInfo(accounts[1])
+    assert positions[0][4:] == (0, 0)  # nothing to claim before start
+    assert positions[1] == (0, 0, 0, 0, 0, 0)  # not a stakeholder
+
+
+def test_get_positions_match_single_account_views(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started(accounts, vesting_contract, token_contract)
+
+    brownie.chain.sleep(40 * 86400)
+    brownie.chain.mine()
+    positions = vesting_contract.getPositions((accounts[1], accounts[2]))
+
+    for account, position in zip((accounts[1], accounts[2]), positions):
+        assert position[:4] == vesting_contract.getAllUserInfo(account)
+        assert position[4] == vesting_contract.calculateVestingSchedule(account, {'from': account})
+        assert position[5] == vesting_contract.earned(account)
+    assert positions[1][4] == 20  # stepped strategy, 1st half of vesting time
+
+
+def test_pending_reward_is_paid_by_get_reward(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started(accounts, vesting_contract, token_contract)
+
+    brownie.chain.sleep(5 * 3600)
+    brownie.chain.mine()
+    pending = vesting_contract.getPositions((accounts[1],))[0][5]
+    assert pending == 60 * 100 * 5 // 100
+
+    vesting_contract.getReward({'from': accounts[1]})
+    assert token_contract.balanceOf(accounts[1]) >= pending  # a second may pass before the transaction
+
+
+def test_get_positions_client_in_chunks(accounts, vestingStakingAndToken):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    _started(accounts, vesting_contract, token_contract)
+
+    positions = get_positions(vesting_contract, list(accounts), gas_cap=GAS_PER_ACCOUNT * 3)  # two accounts in the first chunk
+
+    assert len(positions) == len(accounts)
+    assert positions[accounts[1]]["tokensStaked"] == 60
+    assert positions[accounts[2]]["vestingStrategyNumber"] == 2
+    assert positions[accounts[3]]["tokensStaked"] == 0
+
+
+def test_chunk_out_of_gas_is_split(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    holders = list(vesting_contract.getStakeholders(0, 102))
+    block = web3.eth.block_number
+    gas = 300_000  # about 10k gas per holder with one position, enough for a quarter of them
+
+    with pytest.raises((VirtualMachineError, ValueError)):
+        vesting_contract.getPositions(holders[:32], {'gas': gas}, block_identifier=block)
+    positions = get_positions(vesting_contract, holders, block, gas_cap=gas)  # 1, 2, 4, 8, 16, 32 runs out of gas
+
+    expected = vesting_contract.getPositions(holders, block_identifier=block)
+    assert positions == {account: dict(zip(FIELDS, position)) for account, position in zip(holders, expected)}
+
+
+class _CountingReader:
+    def __init__(self, contract):
+        self.contract = contract
+        self.calls = 0
+
+    def getPositions(self, *args, **kwargs):
+        self.calls += 1
+        return self.contract.getPositions(*args, **kwargs)
+
+
+def test_chunks_grow_after_calls_which_fit(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    holders = list(vesting_contract.getStakeholders(0, 102))
+    reader = _CountingReader(vesting_contract)
+
+    positions = get_positions(reader, holders, gas_cap=GAS_PER_ACCOUNT * 3)
+
+    assert reader.calls == 6  # 2, 4, 8, 16, 32 and the last 40 accounts instead of 51 worst-case chunks
+    assert positions == get_positions(vesting_contract, holders, gas_cap=GAS_PER_ACCOUNT * 3)
+
+
+def test_gas_per_account_covers_max_positions(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    for _ in range(2):
+        vesting_contract.initAllocations([accounts[3]] * 9, [10] * 9, [1, 2] * 4 + [1], {'from': accounts[0]})
+    vesting_contract.initAllocations([accounts[3]] * 2, [10] * 2, [1, 2], {'from': accounts[0]})
+    assert vesting_contract.positionsCount(accounts[3]) == vesting_contract.MAX_POSITIONS()
+    brownie.chain.sleep(40 * 86400)  # claimable vesting is calculated for every position
+    brownie.chain.mine()
+
+    data = vesting_contract.getPositions.encode_input([accounts[3]])
+    gas = web3.eth.estimate_gas({"to": vesting_contract.address, "data": data}) - 21_000
+
+    assert gas <= GAS_PER_ACCOUNT
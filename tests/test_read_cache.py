@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+import brownie
+import pytest
+
+from scripts.read_cache import CachedReader
+
+""" VestingStaking.sol cached reads tests """
+
+
+def test_repeated_reads_of_a_block_are_hits(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    reader = CachedReader(vesting_contract)
+
+    with reader.pinned():
+        for _ in range(5):
+            assert reader.totalValueLocked() == 100
+            assert reader.stakes(accounts[1]) == vesting_contract.stakes(accounts[1])
+        assert reader.stakes(accounts[1].address.lower()) == vesting_contract.stakes(accounts[1])
+
+    assert reader.stats()["misses"] == 2
+    assert reader.stats()["hits"] == 9
+
+
+def test_new_block_is_read_again(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    reader = CachedReader(vesting_contract)
+
+    with reader.pinned() as block:
+        assert reader.totalValueLocked() == 100
+    vesting_contract.addToWhitelist((accounts[3],), {'from': accounts[0]})
+    vesting_contract.stake(50, 1, {'from': accounts[3]})
+
+    with reader.pinned():
+        assert reader.totalValueLocked() == 150
+    assert reader.call("totalValueLocked", block=block) == 100  # older blocks stay available
+    assert reader.stats()["misses"] == 2
+
+
+def test_lru_eviction(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    reader = CachedReader(vesting_contract, max_entries=2)
+
+    with reader.pinned():
+        reader.stakes(accounts[1])
+        reader.stakes(accounts[2])
+        reader.stakes(accounts[1])  # accounts[2] is the least recently used now
+        reader.stakes(accounts[3])
+        reader.stakes(accounts[1])
+        reader.stakes(accounts[2])
+
+    assert reader.stats() == {"hits": 2, "misses": 4, "evictions": 2, "entries": 2, "hitRate": 2 / 6}
+
+
+def test_reverts_are_not_cached(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    reader = CachedReader(vesting_contract)
+
+    with reader.pinned():
+        for _ in range(2):
+            with brownie.reverts():
+                reader.getAPYStaked()  # TVL is 0
+
+    assert reader.stats()["entries"] == 0
+    assert reader.stats()["misses"] == 2
+
+
+def test_only_view_functions(accounts, startedVesting):
+    reader = CachedReader(startedVesting[0])
+
+    with pytest.raises(AttributeError):
+        reader.stake
+    with pytest.raises(ValueError):
+        reader.call("claimAll")
+
+
+def test_invalidate(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    reader = CachedReader(vesting_contract)
+
+    with reader.pinned() as block:
+        reader.rewardPool()
+    reader.invalidate(block)
+    with reader.pinned(block):
+        reader.rewardPool()
+
+    assert reader.stats()["misses"] == 2
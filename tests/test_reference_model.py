@@ -0,0 +1,20 @@
+#!/usr/bin/python3
+import random
+import pytest
+
+from scripts.differential import run_sequence, local_users, MAX_UINT256
+from scripts.reference_model import benchmark, TARGET_OPS_PER_SECOND
+
+""" VestingStaking.sol against the reference model (scripts/reference_model.py) """
+
+@pytest.mark.parametrize("seed", range(3))
+def test_random_operations_match_model(accounts, vestingStakingAndToken, seed):
+    vesting_contract = vestingStakingAndToken[0]
+    token_contract = vestingStakingAndToken[1]
+    token_contract.approve(vesting_contract, MAX_UINT256, {'from': accounts[0]})
+
+    run_sequence(vesting_contract, token_contract, accounts[0], local_users(accounts[0], 4), 25, random.Random(seed))
+
+
+def test_model_throughput():
+    assert benchmark(100_000) >= TARGET_OPS_PER_SECOND
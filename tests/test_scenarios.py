@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+import brownie
+
+""" VestingStaking.sol tests """
+
+def test_vesting_with_allocations(accounts, vestingWithAllocations):
+    vesting_contract = vestingWithAllocations[0]
+
+    assert vesting_contract.status() == 0
+    assert vesting_contract.vestingStrategiesAmount() == 2
+    assert vesting_contract.totalValueLocked() == 100
+    assert vesting_contract.stakes(accounts[1])[0] == 60
+    assert vesting_contract.stakes(accounts[2])[3] == 2
+
+
+def test_started_vesting_changes(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+
+    brownie.chain.sleep(3600)
+    vesting_contract.getReward({"from": accounts[1]})
+    vesting_contract.addToWhitelist((accounts[3],), {"from": accounts[0]})
+    vesting_contract.stake(1000, 1, {"from": accounts[3]})
+
+    assert vesting_contract.totalValueLocked() == 1100
+
+
+def test_started_vesting_is_restored(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    token_contract = startedVesting[1]
+
+    # changes of the previous test are reverted
+    assert vesting_contract.status() == 1
+    assert vesting_contract.totalValueLocked() == 100
+    assert vesting_contract.rewardPool() == 1_000_000_000
+    assert vesting_contract.isStakeholder(accounts[3]) == False
+    assert token_contract.balanceOf(accounts[1]) == 0
+
+
+def test_started_vesting_with_many_allocations(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+
+    assert vesting_contract.totalValueLocked() == 100 + 100 * 100
+    assert vesting_contract.isStakeholder("0x{:040x}".format(100)) == True
+
+
+def test_vesting_past_cliff(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+
+    assert vesting_contract.calculateVestingSchedule(accounts[1]) == 60 // 30  # 1 day of linear vesting
+    assert vesting_contract.calculateVestingSchedule(accounts[2]) == 40 // 2  # 1st half of stepped vesting
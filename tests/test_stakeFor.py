@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+import brownie
+import pytest
+from brownie import chain
+
+from scripts.relayer import deploy_relay, sign_intent, check_intents, recover_signer, submit, INTENT_FIELDS
+
+""" VestingStaking.sol stakeFor() tests """
+
+
+@pytest.fixture(scope="module")
+def signers(accounts):
+    return [accounts.add("0x{:064x}".format(0x5000 + i)) for i in range(3)]
+
+
+def _args(intents):
+    return [tuple(intent[field] for field in INTENT_FIELDS) for intent in intents], [intent["signature"] for intent in intents]
+
+
+def _whitelist(vesting_contract, accounts, signers):
+    vesting_contract.addToWhitelist(signers, {'from': accounts[0]})
+
+
+def test_stake_for_batch(accounts, startedVesting, signers):
+    vesting_contract = startedVesting[0]
+    relay = deploy_relay(vesting_contract, accounts[0])
+    _whitelist(vesting_contract, accounts, signers)
+    intents = [sign_intent(relay, signer.private_key, 10 * (i + 1), 1 + i % 2) for i, signer in enumerate(signers)]
+
+    tx = relay.stakeFor(*_args(intents), {'from': accounts[0]})
+
+    assert vesting_contract.totalValueLocked() == 100 + 60
+    assert [(e["account"], e["amount"], e["strategyNumber"]) for e in tx.events["Staked"]] == [
+        (signers[0], 10, 1), (signers[1], 20, 2), (signers[2], 30, 1)
+    ]
+    for i, signer in enumerate(signers):
+        assert vesting_contract.getAccountPositions(signer)[0][:4] == (10 * (i + 1), 0, tx.timestamp, 1 + i % 2)
+        assert vesting_contract.stakeNonces(signer) == 1
+        assert vesting_contract.stakes(signer)[4] == vesting_contract.rewardPerTokenStored()  # reward settled
+    assert "StakeIntentSkipped" not in tx.events
+
+
+def test_nonces_are_sequential(accounts, startedVesting, signers):
+    vesting_contract = startedVesting[0]
+    relay = deploy_relay(vesting_contract, accounts[0])
+    _whitelist(vesting_contract, accounts, signers)
+    first = sign_intent(relay, signers[0].private_key, 10, 1)
+    second = sign_intent(relay, signers[0].private_key, 20, 2, nonce=1)
+
+    tx = relay.stakeFor(*_args([second, first, second]), {'from': accounts[0]})
+
+    assert len(tx.events["StakeIntentSkipped"]) == 1  # the second one before the first
+    assert len(tx.events["Staked"]) == 2
+    assert vesting_contract.positionsCount(signers[0]) == 2
+    assert vesting_contract.stakeNonces(signers[0]) == 2
+
+    tx = relay.stakeFor(*_args([first, second]), {'from': accounts[0]})  # replay
+    assert len(tx.events["StakeIntentSkipped"]) == 2
+    assert vesting_contract.totalValueLocked() == 130
+
+
+def test_invalid_intents_are_skipped(accounts, startedVesting, signers):
+    vesting_contract = startedVesting[0]
+    relay = deploy_relay(vesting_contract, accounts[0])
+    vesting_contract.addToWhitelist(signers[:2], {'from': accounts[0]})
+    expired = sign_intent(relay, signers[0].private_key, 10, 1, deadline=chain.time() - 1)
+    wrong_strategy = sign_intent(relay, signers[1].private_key, 10, 3)
+    not_whitelisted = sign_intent(relay, signers[2].private_key, 10, 1)
+    forged = dict(sign_intent(relay, signers[1].private_key, 10, 1), account=signers[0].address)
+    malformed = dict(sign_intent(relay, signers[1].private_key, 10, 1), signature="0x1234")
+    intents = [expired, wrong_strategy, not_whitelisted, forged, malformed]
+
+    tx = relay.stakeFor(*_args(intents), {'from': accounts[0]})
+
+    assert [(e["account"], e["nonce"]) for e in tx.events["StakeIntentSkipped"]] == [(i["account"], 0) for i in intents]
+    assert "Staked" not in tx.events
+    assert vesting_contract.totalValueLocked() == 100
+    assert vesting_contract.stakeNonces(signers[0]) == vesting_contract.stakeNonces(signers[1]) == 0
+
+
+def test_cancel_stake_intent(accounts, startedVesting, signers):
+    vesting_contract = startedVesting[0]
+    relay = deploy_relay(vesting_contract, accounts[0])
+    _whitelist(vesting_contract, accounts, signers)
+    accounts[0].transfer(signers[0], "1 ether")
+    intent = sign_intent(relay, signers[0].private_key, 10, 1)
+
+    tx = vesting_contract.cancelStakeIntent({'from': signers[0]})
+    assert tx.events["StakeIntentCancelled"]["nonce"] == 0
+
+    tx = relay.stakeFor(*_args([intent]), {'from': accounts[0]})
+    assert "Staked" not in tx.events
+
+
+def test_stake_for_restrictions(accounts, vestingWithAllocations, signers):
+    vesting_contract = vestingWithAllocations[0]
+    relay = deploy_relay(vesting_contract, accounts[0])
+    _whitelist(vesting_contract, accounts, signers)
+    intents = [sign_intent(relay, signers[0].private_key, 10, 1)]
+
+    with brownie.reverts("Vesting-staking hasn't started yet"):
+        relay.stakeFor(*_args(intents), {'from': accounts[0]})
+    vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
+    with brownie.reverts("Caller is not an operator"):
+        relay.stakeFor(*_args(intents), {'from': accounts[1]})
+    with brownie.reverts("Arrays are not the same size"):
+        relay.stakeFor(_args(intents)[0], [], {'from': accounts[0]})
+    with brownie.reverts("Caller is not the stake relay"):
+        vesting_contract.stakeFor(_args(intents)[0], [True], {'from': accounts[0]})
+    with brownie.reverts("Ownable: caller is not the owner"):
+        vesting_contract.setStakeRelay(accounts[1], {'from': accounts[1]})
+
+    vesting_contract.setOperator(accounts[1], True, {'from': accounts[0]})
+    relay.stakeFor(*_args(intents), {'from': accounts[1]})
+    assert vesting_contract.positionsCount(signers[0]) == 1
+
+
+def test_batch_is_cheaper_per_user(accounts, startedVesting, signers):
+    vesting_contract = startedVesting[0]
+    relay = deploy_relay(vesting_contract, accounts[0])
+    _whitelist(vesting_contract, accounts, signers)
+    accounts[0].transfer(signers[0], "1 ether")
+
+    single = vesting_contract.stake(50, 1, {'from': signers[0]})
+    intents = [sign_intent(relay, signer.private_key, 50, 1) for signer in signers[1:]]
+    batch = relay.stakeFor(*_args(intents), {'from': accounts[0]})
+
+    assert len(batch.events["Staked"]) == 2
+    assert batch.gas_used / len(intents) < single.gas_used
+
+
+def test_relayer_checks(accounts, startedVesting, signers):
+    vesting_contract = startedVesting[0]
+    relay = deploy_relay(vesting_contract, accounts[0])
+    vesting_contract.addToWhitelist(signers[:2], {'from': accounts[0]})
+    first = sign_intent(relay, signers[0].private_key, 10, 1)
+    second = sign_intent(relay, signers[0].private_key, 20, 2, nonce=1)
+    stranger = sign_intent(relay, signers[2].private_key, 10, 1)
+    forged = dict(sign_intent(relay, signers[0].private_key, 10, 1), account=signers[1].address)
+
+    valid, rejected = check_intents(relay, [second, first, second, stranger, forged])
+
+    assert recover_signer(relay, first) == signers[0].address
+    assert valid == [first, second]
+    assert [reason for _, reason in rejected] == ["wrong nonce", "not whitelisted", "wrong signature"]
+    txs = submit(relay, valid, accounts[0])
+    assert len(txs) == 1
+    assert len(txs[0].events["Staked"]) == 2
+    assert "StakeIntentSkipped" not in txs[0].events
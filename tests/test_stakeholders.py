@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+import csv
+
+import pytest
+from brownie import web3
+from brownie.exceptions import VirtualMachineError
+
+from scripts.positions import get_positions, FIELDS
+from scripts.snapshot import export, iter_pages, _read_page, GAS_PER_PAGE_ACCOUNT
+
+""" VestingStaking.sol stakeholders registry and snapshot tests """
+
+HOLDERS = ["0x{:040x}".format(i) for i in range(1, 101)]
+
+
+def test_stakeholders_in_order_of_first_positions(accounts, vestingWithAllocations):
+    vesting_contract = vestingWithAllocations[0]
+    vesting_contract.initAllocations((accounts[2], accounts[3]), (10, 20), (1, 1), {'from': accounts[0]})
+    vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
+    vesting_contract.addToWhitelist((accounts[1], accounts[4]), {'from': accounts[0]})
+    vesting_contract.stake(50, 1, {'from': accounts[4]})
+    vesting_contract.stake(50, 2, {'from': accounts[1]})  # another position, not another stakeholder
+
+    assert vesting_contract.stakeholdersCount() == 4
+    assert vesting_contract.getStakeholders(0, 10) == [accounts[1], accounts[2], accounts[3], accounts[4]]
+
+
+def test_stakeholders_pages(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    everyone = [accounts[1].address, accounts[2].address] + HOLDERS
+
+    assert vesting_contract.stakeholdersCount() == 102
+    assert [a.lower() for a in vesting_contract.getStakeholders(0, 102)] == [a.lower() for a in everyone]
+    assert [a.lower() for a in vesting_contract.getStakeholders(100, 10)] == HOLDERS[98:]
+    assert vesting_contract.getStakeholders(102, 10) == []
+    assert vesting_contract.getStakeholders(200, 2 ** 256 - 1) == []
+    assert len(vesting_contract.getStakeholders(1, 2 ** 256 - 1)) == 101
+
+
+def test_positions_page_matches_get_positions(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+
+    stakeholders, positions = vesting_contract.getPositionsPage(0, 5)
+
+    assert stakeholders == vesting_contract.getStakeholders(0, 5)
+    assert positions == vesting_contract.getPositions(stakeholders)
+
+
+def test_pages_cover_every_stakeholder_once(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    block = web3.eth.block_number
+
+    pages = list(iter_pages(vesting_contract, block, gas_cap=GAS_PER_PAGE_ACCOUNT * 10))
+
+    assert len(pages) == 13  # 8 accounts per page
+    accounts_read = [account for page in pages for account, _ in page]
+    assert accounts_read == list(vesting_contract.getStakeholders(0, 102))
+
+
+def test_page_out_of_gas_is_split(accounts, startedVestingWithManyAllocations):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    block = web3.eth.block_number
+    gas = 300_000  # about 12k gas per stakeholder with one position, enough for a quarter of them
+
+    with pytest.raises((VirtualMachineError, ValueError)):
+        vesting_contract.getPositionsPage(0, 102, {'gas': gas}, block_identifier=block)
+    rows = _read_page(vesting_contract, 0, 102, block, gas)
+
+    accounts_read, positions = vesting_contract.getPositionsPage(0, 102, block_identifier=block)
+    assert rows == list(zip(accounts_read, positions))
+
+
+def test_csv_export(accounts, startedVestingWithManyAllocations, tmp_path):
+    vesting_contract = startedVestingWithManyAllocations[0]
+    block = web3.eth.block_number
+
+    block, rows = export(vesting_contract, tmp_path / "snapshot.csv", block, gas_cap=GAS_PER_PAGE_ACCOUNT * 40)
+
+    with open(tmp_path / "snapshot.csv") as f:
+        exported = list(csv.DictReader(f))
+    expected = get_positions(vesting_contract, vesting_contract.getStakeholders(0, 102), block)
+    assert rows == len(exported) == 102
+    assert {row["account"]: {field: int(row[field]) for field in FIELDS} for row in exported} == expected
+
+
+def test_parquet_export(accounts, startedVesting, tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    vesting_contract = startedVesting[0]
+
+    block, rows = export(vesting_contract, tmp_path / "snapshot.parquet")
+
+    table = parquet.read_table(tmp_path / "snapshot.parquet").to_pydict()
+    assert rows == 2
+    assert table["account"] == [accounts[1].address, accounts[2].address]
+    assert [int(value) for value in table["tokensStaked"]] == [60, 40]
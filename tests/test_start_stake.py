@@ -3,17 +3,12 @@ import brownie
 
 """ VestingStaking.sol tests """
 
-def test_start(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
+def test_start(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
+
     reward_per_hour = 100
     reward_pool = 1_000_000_000
 
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
-
     start_time = brownie.chain.time()
     vestingStaking.start(reward_per_hour, reward_pool, {'from': accounts[0]})
 
@@ -22,45 +17,31 @@ def test_start(accounts, vestingStaking):
     assert vestingStaking.startingTimestamp() in range(start_time, start_time + 2)  # # start time (operations from above will take no more than a second)
 
 
-def test_stake_before_start(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_stake_before_start(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
 
     with brownie.reverts():
         vestingStaking.stake(60, 1, {"from": accounts[1]})
 
 
-def test_stake_not_whitelisted(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
+def test_stake_not_whitelisted(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
+
     reward_per_hour = 100
     reward_pool = 1_000_000_000
 
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
     vestingStaking.start(reward_per_hour, reward_pool, {'from': accounts[0]})
 
     with brownie.reverts():
         vestingStaking.stake(60, 1, {"from": accounts[1]})
 
 
-def test_stake_wrong_strategy(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
+def test_stake_wrong_strategy(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
+
     reward_per_hour = 100
     reward_pool = 1_000_000_000
 
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
     vestingStaking.start(reward_per_hour, reward_pool, {'from': accounts[0]})
     vestingStaking.addToWhitelist((accounts[1],), {"from": accounts[0]})
 
@@ -69,16 +50,12 @@ def test_stake_wrong_strategy(accounts, vestingStaking):
         vestingStaking.stake(60, strategy_num, {"from": accounts[1]})
 
 
-def test_correct_stake_from_whitelist(accounts, vestingStaking):
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
+def test_correct_stake_from_whitelist(accounts, vestingWithStrategies):
+    vestingStaking = vestingWithStrategies[0]
+
     reward_per_hour = 100
     reward_pool = 1_000_000_000
 
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vestingStaking.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
     vestingStaking.start(reward_per_hour, reward_pool, {'from': accounts[0]})
     vestingStaking.addToWhitelist((accounts[1],), {"from": accounts[0]})
 
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+import brownie
+
+""" VestingStaking.sol tests """
+
+DAY = 24 * 3600
+
+
+def test_unlock_times_are_fixed_on_the_first_withdrawal_after_start(accounts, vestingWithAllocations):
+    vesting_contract = vestingWithAllocations[0]
+
+    assert vesting_contract.unlockTimes(accounts[1]) == (0, 0)
+    tx = vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
+    assert vesting_contract.unlockTimes(accounts[1]) == (0, 0)
+
+    brownie.chain.sleep(3600)
+    vesting_contract.getReward({'from': accounts[1]})  # positions are not touched by reward updates
+    assert vesting_contract.unlockTimes(accounts[1]) == (0, 0)
+
+    brownie.chain.sleep(31 * DAY)
+    vesting_contract.vestingWithdraw({'from': accounts[1]})
+
+    # vesting of allocations starts with start()
+    assert vesting_contract.unlockTimes(accounts[1]) == (tx.timestamp + 30 * DAY, tx.timestamp + 60 * DAY)
+    assert vesting_contract.unlockTimes(accounts[2]) == (0, 0)
+
+
+def test_unlock_times_are_fixed_at_stake(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+    vesting_contract.addToWhitelist((accounts[3],), {'from': accounts[0]})
+
+    tx = vesting_contract.stake(1000, 2, {'from': accounts[3]})
+
+    assert vesting_contract.unlockTimes(accounts[3]) == (tx.timestamp + 30 * DAY, tx.timestamp + 60 * DAY)
+
+
+def test_vesting_schedule_is_the_same_before_and_after_fixing(accounts, vestingPastCliff):
+    vesting_contract = vestingPastCliff[0]
+
+    claimable = vesting_contract.calculateVestingSchedule(accounts[1])  # computed from the strategy
+    tx = vesting_contract.vestingWithdraw({'from': accounts[1]})  # fixes unlock times first
+
+    assert tx.events["VestingWithdrawn"]["amount"] == claimable
+    assert vesting_contract.unlockTimes(accounts[1])[0] != 0
+
+
+def test_start_only_once(accounts, startedVesting):
+    vesting_contract = startedVesting[0]
+
+    with brownie.reverts("Vesting-staking has started already"):
+        vesting_contract.start(100, 1_000_000_000, {'from': accounts[0]})
@@ -3,18 +3,12 @@ import brownie
 
 """ VestingStaking.sol tests """
 
-def test_correct_linear_strategy_vesting_withdraw(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
+def test_correct_linear_strategy_vesting_withdraw(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    token_contract = vestingWithStrategies[1]
 
     cliff_time_in_days = 30
     vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
 
     stake = 30
     strategy = 1  # linear
@@ -51,20 +45,12 @@ def test_correct_linear_strategy_vesting_withdraw(accounts, vestingStakingAndTok
     assert vesting_contract.stakes(accounts[1])[1] == withdrawed_tokens + new_withdraw  # withdraw
 
 
-def test_correct_stepped_strategy_vesting_withdraw(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
+def test_correct_stepped_strategy_vesting_withdraw(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    token_contract = vestingWithStrategies[1]
 
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
     percent_in_first_half_of_vesting_time = 50
 
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
-
     stake = 30
     strategy = 2  # stepped
     reward_per_hour = 100
@@ -101,20 +87,11 @@ def test_correct_stepped_strategy_vesting_withdraw(accounts, vestingStakingAndTo
     assert vesting_contract.stakes(accounts[1])[1] == withdrawed_tokens + new_withdraw  # withdraw
 
 
-def test_vesting_withdraw_correct_tvl(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
+def test_vesting_withdraw_correct_tvl(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
 
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
     percent_in_first_half_of_vesting_time = 50
 
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
-
     stake = 30
     strategy = 2  # stepped
     reward_per_hour = 100
@@ -134,18 +111,8 @@ def test_vesting_withdraw_correct_tvl(accounts, vestingStakingAndToken):
     assert vesting_contract.totalValueLocked() == tvl_before_withdraw - withdrawed_tokens
 
 
-def test_vesting_withdraw_before_clifftime(accounts, vestingStakingAndToken):
-    vesting_contract = vestingStakingAndToken[0]
-    token_contract = vestingStakingAndToken[1]
-    token_contract.approve(vesting_contract, token_contract.balanceOf(vesting_contract.contractOwner()))  # approve to vesting contract to spend tokens from owner
-
-    cliff_time_in_days = 30
-    vesting_time_in_days = 30
-    linear = 0
-    stepped = 1
-
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, linear, {'from': accounts[0]})
-    vesting_contract.createWestingStrategy(cliff_time_in_days, vesting_time_in_days, stepped, {'from': accounts[0]})
+def test_vesting_withdraw_before_clifftime(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
 
     stake = 30
     strategy = 1  # linear
@@ -158,3 +125,20 @@ def test_vesting_withdraw_before_clifftime(accounts, vestingStakingAndToken):
     # Trying to withdraw before cliff time
     with brownie.reverts():
         vesting_contract.vestingWithdraw({"from": accounts[1]})
+
+
+def test_reward_beyond_uint88_does_not_lock_withdrawals(accounts, vestingWithStrategies):
+    vesting_contract = vestingWithStrategies[0]
+    token_contract = vestingWithStrategies[1]
+    stake = 10**9
+
+    vesting_contract.addToWhitelist((accounts[1],), {"from": accounts[0]})
+    vesting_contract.start(10**27, 0, {"from": accounts[0]})
+    vesting_contract.stake(stake, 1, {"from": accounts[1]})
+
+    brownie.chain.sleep(61 * 24 * 3600)  # past cliff and vesting, the reward is far above type(uint88).max
+    balance_before_withdraw = token_contract.balanceOf(accounts[1])
+    vesting_contract.vestingWithdraw({"from": accounts[1]})
+
+    assert token_contract.balanceOf(accounts[1]) == balance_before_withdraw + stake
+    assert vesting_contract.earned(accounts[1]) > 2**88
@@ -23,3 +23,12 @@ def test_delete_not_whitelisted_from_whitelist(accounts, vestingStaking):
 
     with brownie.reverts():
         vestingStaking.deleteFromWhitelist(accounts[3])
+
+
+def test_add_to_whitelist_bulk(accounts, vestingStaking):
+    many_accounts = ["0x{:040x}".format(i) for i in range(1, 31)]  # more than 10 accounts at a time
+
+    vestingStaking.addToWhitelistBulk(many_accounts)
+
+    for account in many_accounts:
+        assert vestingStaking.isWhitelisted(account) == True